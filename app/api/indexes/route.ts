@@ -1,6 +1,7 @@
 import { NextResponse } from 'next/server';
 import { getAllStoriesFromCollection } from '@/lib/weaviate/search';
 import { SchemaTypes } from '@/types/weaviate';
+import { decodeTranscription } from '@/app/utils/decodeTranscription';
 
 const INDEXES_STORIES_LIMIT = 500;
 const STORIES_RETURN_PROPERTIES = [
@@ -101,7 +102,7 @@ export async function GET() {
         continue;
       }
       try {
-        const parsed = JSON.parse(raw) as {
+        const parsed = (await decodeTranscription(raw)) as {
           sections?: Array<{
             title?: string;
             start?: number;
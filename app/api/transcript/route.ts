@@ -1,5 +1,5 @@
 import { fetchStoryTranscriptByUuid } from '@/lib/weaviate/search';
-import { Transcription } from '@/types/transcription';
+import { StoredTranscription } from '@/app/utils/decodeTranscription';
 
 export async function GET(request: Request) {
   const { searchParams } = new URL(request.url);
@@ -16,7 +16,8 @@ export async function GET(request: Request) {
     }
 
     const props = response.properties;
-    const transcription: Transcription = JSON.parse(props.transcription);
+    // Sent as stored (compact and possibly gzipped); the client expands it with decodeTranscription().
+    const transcription: StoredTranscription = JSON.parse(props.transcription);
     const videoUrl: string = props.video_url;
     const isAudioFile: boolean = props.isAudioFile;
     const interviewTitle: string = props.interview_title;
@@ -22,7 +22,8 @@ import { muxPlayerThemeProps } from '@/lib/theme/muxPlayerTheme';
 import { TextSelectionPopover } from './TextSelectionPopover';
 import { TranscriptSection } from './transcript/TranscriptSection';
 import { TranscriptSearchBar } from './transcript/TranscriptSearchBar';
-import { SearchMode, ThematicMatch, TranscriptData } from './transcript/transcriptTypes';
+import { SearchMode, ThematicMatch, TranscriptData, TranscriptResponse } from './transcript/transcriptTypes';
+import { decodeTranscription } from '@/app/utils/decodeTranscription';
 
 /** Merge overlapping / near-adjacent thematic matches so researchers see distinct passages. */
 function mergeThematicMatches(matches: ThematicMatch[], gapSeconds = 2): ThematicMatch[] {
@@ -98,7 +99,8 @@ export const SidePanelTranscriptView = () => {
         if (!res.ok) throw new Error('Failed to fetch transcript');
         return res.json();
       })
-      .then((d: TranscriptData) => {
+      .then(async (response: TranscriptResponse) => {
+        const d: TranscriptData = { ...response, transcription: await decodeTranscription(response.transcription) };
         setData(d);
         const allSections = new Set<number>(d.transcription.sections.map((_, i) => i));
         setExpandedSections(allSections);
@@ -1,4 +1,5 @@
 import { Transcription } from '@/types/transcription';
+import { StoredTranscription } from '@/app/utils/decodeTranscription';
 
 export type TranscriptData = {
   transcription: Transcription;
@@ -7,6 +8,11 @@ export type TranscriptData = {
   interviewTitle: string;
 };
 
+/** `/api/transcript` response: the transcription as stored, before `decodeTranscription()`. */
+export type TranscriptResponse = Omit<TranscriptData, 'transcription'> & {
+  transcription: StoredTranscription;
+};
+
 export type ThematicMatch = {
   transcription: string;
   speaker: string;
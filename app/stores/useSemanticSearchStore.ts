@@ -20,6 +20,7 @@ import { Chunks, Testimonies, SchemaMap, SchemaTypes } from '@/types/weaviate';
 import { NerLabel } from '@/types/ner';
 import { SearchType } from '@/types/searchType';
 import { Transcription, Word } from '@/types/transcription';
+import { decodeTranscription } from '@/app/utils/decodeTranscription';
 
 type SemanticSearchStore = {
   hasSearched: boolean;
@@ -323,7 +324,7 @@ export const useSemanticSearchStore = create<SemanticSearchStore>()(
           let parsedTranscript: Transcription | null = null;
 
           if (transcriptionJson) {
-            parsedTranscript = JSON.parse(transcriptionJson);
+            parsedTranscript = await decodeTranscription(transcriptionJson);
           } else {
             parsedTranscript = null;
           }
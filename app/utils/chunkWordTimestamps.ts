@@ -0,0 +1,74 @@
+/**
+ * Decode the word timings stored on Chunks objects.
+ *
+ * The NLP processor writes them in one of three encodings (CHUNK_WORD_TIMESTAMPS):
+ * - full: `word_timestamps` is a list of { text, start, end }
+ * - range: `word_index_start`/`word_index_end` is a half-open range into the
+ *   testimony's words (sections -> paragraphs -> words, flattened in order)
+ * - packed: `word_timestamps_packed` is JSON with word texts, delta-coded start
+ *   times and durations in milliseconds
+ */
+
+import { Chunks } from '@/types/weaviate';
+import { Transcription } from '@/types/transcription';
+
+export type ChunkWordTimestamp = {
+  text: string;
+  start: number; // in seconds
+  end: number; // in seconds
+};
+
+type PackedWordTimestamps = {
+  v: number;
+  w: string[];
+  s: number[];
+  d: number[];
+};
+
+const PACKED_VERSION = 1;
+
+export type ChunkWordTimingFields = Partial<
+  Pick<Chunks, 'word_timestamps' | 'word_timestamps_packed' | 'word_index_start' | 'word_index_end'>
+>;
+
+export function unpackWordTimestamps(packed: string): ChunkWordTimestamp[] {
+  const data = JSON.parse(packed) as PackedWordTimestamps;
+  if (data.v !== PACKED_VERSION) {
+    throw new Error(`Unsupported packed word timestamps version: ${data.v}`);
+  }
+
+  const words: ChunkWordTimestamp[] = [];
+  let startMs = 0;
+  for (let i = 0; i < data.w.length; i++) {
+    startMs += data.s[i];
+    words.push({ text: data.w[i], start: startMs / 1000, end: (startMs + data.d[i]) / 1000 });
+  }
+  return words;
+}
+
+/** Flatten a testimony's words in the order `word_index_start`/`word_index_end` refer to. */
+export function transcriptionWords(transcription: Transcription): ChunkWordTimestamp[] {
+  return transcription.sections.flatMap((section) =>
+    section.paragraphs.flatMap((paragraph) =>
+      paragraph.words.map(({ text, start, end }) => ({ text, start, end })),
+    ),
+  );
+}
+
+/**
+ * Return a chunk's words with timings, whichever encoding it was stored with.
+ * Range-encoded chunks need the testimony's words (see `transcriptionWords`);
+ * without them an empty list is returned.
+ */
+export function decodeChunkWordTimestamps(
+  chunk: ChunkWordTimingFields,
+  testimonyWords?: ChunkWordTimestamp[],
+): ChunkWordTimestamp[] {
+  if (chunk.word_timestamps_packed) {
+    return unpackWordTimestamps(chunk.word_timestamps_packed);
+  }
+  if (chunk.word_index_start != null && chunk.word_index_end != null) {
+    return testimonyWords ? testimonyWords.slice(chunk.word_index_start, chunk.word_index_end) : [];
+  }
+  return Array.isArray(chunk.word_timestamps) ? chunk.word_timestamps : [];
+}
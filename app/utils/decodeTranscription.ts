@@ -0,0 +1,103 @@
+/**
+ * Decode the `Testimonies.transcription` blob into the nested `Transcription` shape.
+ *
+ * Readers pick the decoder from `format_version`:
+ * - missing or 1: the nested section/paragraph/word JSON, returned as is
+ * - 2 (compact): speakers are interned in `speakers`, paragraph `words` are a
+ *   [start, end) range into the columnar `words` ({ text, start, duration }),
+ *   and `start` holds the first start and then the difference to the previous
+ *   start, both in milliseconds
+ * - { compression: 'gzip', data }: gzipped compact JSON, base64-encoded
+ */
+
+import { Paragraph, Section, Transcription, Word } from '@/types/transcription';
+
+const COMPACT_FORMAT_VERSION = 2;
+
+type CompactParagraph = Omit<Paragraph, 'speaker' | 'words'> & {
+  speaker: number;
+  words: [number, number];
+};
+
+type CompactSection = Omit<Section, 'speaker' | 'paragraphs'> & {
+  speaker: number;
+  paragraphs: CompactParagraph[];
+};
+
+type CompactTranscription = Omit<Transcription, 'sections'> & {
+  format_version: number;
+  speakers: string[];
+  sections: CompactSection[];
+  words: { text: string[]; start: number[]; duration: number[] };
+};
+
+/** A stored transcription as parsed from JSON, in any format. */
+export type StoredTranscription = {
+  format_version?: number;
+  compression?: string;
+  data?: string;
+};
+
+async function gunzipBase64(data: string): Promise<string> {
+  const bytes = Uint8Array.from(atob(data), (char) => char.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text();
+}
+
+function expandCompact(compact: CompactTranscription): Transcription {
+  const { format_version: _formatVersion, speakers, words, sections, ...testimony } = compact;
+
+  const starts: number[] = new Array(words.start.length);
+  let startMs = 0;
+  for (let i = 0; i < words.start.length; i++) {
+    startMs += words.start[i];
+    starts[i] = startMs;
+  }
+
+  return {
+    ...testimony,
+    sections: sections.map((section, sectionIdx) => ({
+      ...section,
+      speaker: speakers[section.speaker],
+      paragraphs: section.paragraphs.map((paragraph, paraIdx) => {
+        const [first, last] = paragraph.words;
+        const paragraphWords: Word[] = [];
+        for (let position = first; position < last; position++) {
+          paragraphWords.push({
+            text: words.text[position],
+            start: starts[position] / 1000,
+            end: (starts[position] + words.duration[position]) / 1000,
+            section_idx: sectionIdx,
+            para_idx: paraIdx,
+            word_idx: position - first,
+          });
+        }
+        return { ...paragraph, speaker: speakers[paragraph.speaker], words: paragraphWords };
+      }),
+    })),
+  };
+}
+
+/**
+ * Accepts the stored string or the same value already parsed, so an API can pass
+ * the compact payload through unchanged and let the browser expand it.
+ */
+export async function decodeTranscription(raw: string | StoredTranscription): Promise<Transcription> {
+  let parsed = (typeof raw === 'string' ? JSON.parse(raw) : raw) as StoredTranscription;
+
+  if (parsed.compression !== undefined) {
+    if (parsed.compression !== 'gzip' || typeof parsed.data !== 'string') {
+      throw new Error(`Unsupported transcription compression: ${parsed.compression}`);
+    }
+    parsed = JSON.parse(await gunzipBase64(parsed.data)) as StoredTranscription;
+  }
+
+  const version = parsed.format_version ?? 1;
+  if (version === 1) {
+    return parsed as unknown as Transcription;
+  }
+  if (version !== COMPACT_FORMAT_VERSION) {
+    throw new Error(`Unsupported transcription format version: ${version}`);
+  }
+  return expandCompact(parsed as unknown as CompactTranscription);
+}
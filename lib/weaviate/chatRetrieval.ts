@@ -5,6 +5,7 @@ import { Citation } from '@/types/chat';
 import { initWeaviateClient } from './client';
 import { getLocalEmbedding, bm25Search, vectorSearch, hybridSearch, getAllStoriesFromCollection } from './search';
 import { QueryProperty } from 'weaviate-client';
+import { decodeTranscription } from '@/app/utils/decodeTranscription';
 
 const CHAT_RETURN_PROPS: QueryProperty<Chunks>[] = [
   'transcription',
@@ -205,7 +206,7 @@ export async function retrieveAllChapterSynopses(): Promise<ChapterSynopsis[]> {
     if (typeof raw !== 'string' || !raw) continue;
 
     try {
-      const parsed = JSON.parse(raw) as {
+      const parsed = (await decodeTranscription(raw)) as {
         sections?: Array<{ title?: string; synopsis?: string; start?: number; end?: number }>;
       };
       for (const section of parsed?.sections ?? []) {
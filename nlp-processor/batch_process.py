@@ -1,6 +1,7 @@
 # nlp-processor/batch_process.py
 import json
 import os
+import time
 from pathlib import Path
 
 import httpx
@@ -8,6 +9,40 @@ import httpx
 API_URL = os.getenv("NLP_PROCESSOR_URL", "http://localhost:8000")
 INTERVIEWS_DIR = Path(os.getenv("INTERVIEWS_DIR", "../json/interviews")).resolve()
 IGNORED_FILENAME = "example-minimum-interview.json"
+POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "2"))
+PARAMS = {
+    "write_to_weaviate": "true",
+    "run_ner": "true",
+    "force": os.getenv("BATCH_FORCE", "false"),
+}
+
+
+def submit(client: httpx.Client, f: Path):
+    """Queue one file. Returns the job id, None on failure, or "" when the queue is full."""
+    payload = json.loads(f.read_text(encoding="utf-8"))
+
+    # Tu endpoint espera {"payload": ...}
+    res = client.post(f"{API_URL}/jobs", params=PARAMS, json={"payload": payload})
+
+    if res.status_code == 503:
+        return ""
+    if res.status_code >= 300:
+        print(f"❌ {f.name}: {res.status_code} {res.text[:200]}")
+        return None
+    return res.json()["job_id"]
+
+
+def report(name: str, job: dict) -> None:
+    if job["status"] == "failed":
+        errors = job.get("errors") or ["unknown error"]
+        print(f"❌ {name}: failed in stage '{job.get('stage')}': {errors[0][:200]}")
+        return
+    if job.get("skipped"):
+        print(f"⏭️  {name}: unchanged, skipped in {job.get('elapsed_seconds')}s")
+        return
+    chunks = job.get("counts", {}).get("chunks", "?")
+    print(f"✅ {name}: chunks={chunks} in {job.get('elapsed_seconds')}s")
+
 
 def main():
     files = sorted(
@@ -19,24 +54,35 @@ def main():
         return
 
     print(f"Found {len(files)} files in {INTERVIEWS_DIR}")
-    with httpx.Client(timeout=300) as client:
-        for f in files:
-            payload = json.loads(f.read_text(encoding="utf-8"))
-
-            # Tu endpoint espera {"payload": ...}
-            res = client.post(
-                f"{API_URL}/process-story",
-                params={"write_to_weaviate": "true", "run_ner": "true"},
-                json={"payload": payload},
-            )
-
-            if res.status_code >= 300:
-                print(f"❌ {f.name}: {res.status_code} {res.text[:200]}")
-                continue
-
-            data = res.json()
-            chunks = data.get("counts", {}).get("chunks", "?")
-            print(f"✅ {f.name}: chunks={chunks}")
+    pending = list(files)
+    active = {}
+
+    # Jobs return immediately, so a slow story never holds a connection open.
+    with httpx.Client(timeout=60) as client:
+        while pending or active:
+            while pending:
+                job_id = submit(client, pending[0])
+                if job_id == "":
+                    break  # Queue full: poll running jobs and retry later
+                f = pending.pop(0)
+                if job_id:
+                    active[job_id] = f
+
+            for job_id, f in list(active.items()):
+                res = client.get(f"{API_URL}/jobs/{job_id}")
+                if res.status_code == 404:
+                    print(f"❌ {f.name}: job {job_id} no longer known to the processor")
+                    del active[job_id]
+                    continue
+                res.raise_for_status()
+                job = res.json()
+                if job["status"] in ("completed", "failed"):
+                    report(f.name, job)
+                    del active[job_id]
+
+            if pending or active:
+                time.sleep(POLL_SECONDS)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+"""Compare the stored size of chunk word timings per `CHUNK_WORD_TIMESTAMPS` mode.
+
+Builds a synthetic transcript (`--hours` long, ~2.5 words/second), cuts it
+into sentence-window chunks with the default size and overlap, encodes every
+chunk's word timings as `full`, `range` and `packed`, and reports the JSON
+bytes each mode adds to the Chunks objects (and so to batch-insert payloads).
+Packed timings must decode to the original times within a millisecond.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.chunk_word_timestamps --hours 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from typing import List, Tuple
+
+from word_timestamps import WORD_TIMESTAMP_MODES, encode_word_timing, unpack_word_timestamps
+
+WORDS_PER_SECOND = 2.5
+WORDS_PER_SENTENCE = 15
+WORDS = ("the", "interview", "remember", "we", "moved", "to", "Chicago", "in", "nineteen", "sixty")
+
+
+def _synthetic_words(hours: float, seed: int) -> Tuple[List[str], List[float], List[float]]:
+    rng = random.Random(seed)
+    total = int(hours * 3600 * WORDS_PER_SECOND)
+    texts = [rng.choice(WORDS) for _ in range(total)]
+    starts = [round(i / WORDS_PER_SECOND + rng.uniform(0, 0.1), 3) for i in range(total)]
+    ends = [round(start + rng.uniform(0.1, 0.35), 3) for start in starts]
+    return texts, starts, ends
+
+
+def _windows(total_words: int, chunk_sentences: int, overlap: int) -> List[Tuple[int, int]]:
+    step = max(1, chunk_sentences - overlap) * WORDS_PER_SENTENCE
+    size = chunk_sentences * WORDS_PER_SENTENCE
+    return [(start, min(start + size, total_words)) for start in range(0, total_words, step)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--chunk-size", type=int, default=10, help="Sentences per chunk")
+    parser.add_argument("--overlap", type=int, default=5, help="Sentences shared by consecutive chunks")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts, starts, ends = _synthetic_words(args.hours, args.seed)
+    windows = _windows(len(texts), args.chunk_size, args.overlap)
+    print(f"{args.hours:g}h transcript: {len(texts)} words in {len(windows)} chunks")
+
+    sizes = {}
+    for mode in WORD_TIMESTAMP_MODES:
+        total = 0
+        for lo, hi in windows:
+            properties = encode_word_timing(mode, texts[lo:hi], starts[lo:hi], ends[lo:hi], lo)
+            total += len(json.dumps(properties, ensure_ascii=False).encode("utf-8"))
+            if mode == "packed":
+                decoded = unpack_word_timestamps(properties["word_timestamps_packed"])
+                if [w["text"] for w in decoded] != texts[lo:hi] or any(
+                    abs(w["start"] - s) > 5e-4 or abs(w["end"] - e) > 5e-4
+                    for w, s, e in zip(decoded, starts[lo:hi], ends[lo:hi])
+                ):
+                    raise SystemExit(f"Packed timings do not round-trip for chunk {lo}-{hi}")
+        sizes[mode] = total
+
+    for mode in WORD_TIMESTAMP_MODES:
+        print(
+            f"{mode:>7}: {sizes[mode] / 1024 / 1024:8.2f} MB word timings, "
+            f"{sizes[mode] / len(windows):9.0f} B/chunk, x{sizes['full'] / sizes[mode]:.1f} smaller than full"
+        )
+
+
+if __name__ == "__main__":
+    main()
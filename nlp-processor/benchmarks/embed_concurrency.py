@@ -0,0 +1,57 @@
+"""Measure /embed throughput and latency under concurrent search load.
+
+Runs `--users` concurrent clients, each sending `--requests` distinct queries,
+and reports requests/second with latency percentiles. Compare runs with
+`EMBED_BATCH_MAX_SIZE=1` (no coalescing) against the default.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.embed_concurrency --users 50 --requests 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.embed_latency import API_URL, QUERIES, _percentiles
+
+
+async def _user(client: httpx.AsyncClient, user: int, requests: int, latencies: List[float]) -> None:
+    for i in range(requests):
+        # Unique per user and request so the query cache does not answer.
+        text = f"{QUERIES[(user + i) % len(QUERIES)]} {user}-{i}-{time.time_ns()}"
+        started = time.perf_counter()
+        res = await client.post(f"{API_URL}/embed", json={"text": text})
+        res.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(users: int, requests: int) -> None:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        (await client.post(f"{API_URL}/embed", json={"text": "warm up"})).raise_for_status()
+
+        latencies: List[float] = []
+        started = time.perf_counter()
+        await asyncio.gather(*(_user(client, u, requests, latencies) for u in range(users)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{len(latencies)} requests from {users} users in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} req/s)")
+    print(f"/embed latency: {_percentiles(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per user")
+    args = parser.parse_args()
+    asyncio.run(_run(args.users, args.requests))
+
+
+if __name__ == "__main__":
+    main()
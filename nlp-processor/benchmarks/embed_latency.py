@@ -0,0 +1,115 @@
+"""Measure /embed latency while a story is being ingested.
+
+Fires `/embed` requests at a fixed rate, first against an idle service and then
+while `/process-story` runs, and reports latency percentiles for both phases
+together with the event-loop lag reported by `/health`.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.embed_latency ../json/interviews/<story>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+API_URL = os.getenv("NLP_PROCESSOR_URL", "http://localhost:7070")
+QUERIES = [
+    "childhood memories of the war",
+    "moving to a new country",
+    "working in the factory",
+    "family traditions and holidays",
+    "first day at school",
+]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pick(0.50) * 1000, 1),
+        "p95_ms": round(pick(0.95) * 1000, 1),
+        "p99_ms": round(pick(0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+    }
+
+
+def _probe_embed(client: httpx.Client, stop: threading.Event, interval: float) -> List[float]:
+    latencies: List[float] = []
+    i = 0
+    while not stop.is_set():
+        # Vary the text so the query embedding cache does not hide model work.
+        text = f"{QUERIES[i % len(QUERIES)]} {i}"
+        started = time.perf_counter()
+        res = client.post(f"{API_URL}/embed", json={"text": text})
+        res.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        i += 1
+        stop.wait(interval)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("story", type=Path, help="Interview JSON file to ingest")
+    parser.add_argument("--baseline-seconds", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between /embed probes")
+    parser.add_argument("--write-to-weaviate", action="store_true")
+    args = parser.parse_args()
+
+    payload = json.loads(args.story.read_text(encoding="utf-8"))
+
+    with httpx.Client(timeout=600) as client:
+        # Warm the model so the first probe does not measure model loading.
+        client.post(f"{API_URL}/embed", json={"text": "warm up"}).raise_for_status()
+
+        stop = threading.Event()
+        timer = threading.Timer(args.baseline_seconds, stop.set)
+        timer.start()
+        idle = _probe_embed(client, stop, args.interval)
+
+        stop = threading.Event()
+        ingest_result: Dict[str, float] = {}
+
+        def ingest() -> None:
+            started = time.perf_counter()
+            with httpx.Client(timeout=3600) as ingest_client:
+                res = ingest_client.post(
+                    f"{API_URL}/process-story",
+                    params={"write_to_weaviate": str(args.write_to_weaviate).lower()},
+                    json={"payload": payload},
+                )
+            ingest_result["status"] = res.status_code
+            ingest_result["seconds"] = time.perf_counter() - started
+            stop.set()
+
+        worker = threading.Thread(target=ingest)
+        worker.start()
+        busy = _probe_embed(client, stop, args.interval)
+        worker.join()
+
+        health = client.get(f"{API_URL}/health").json()
+
+    print(f"Ingestion: HTTP {ingest_result.get('status')} in {ingest_result.get('seconds', 0):.2f}s")
+    print(f"/embed idle:      {_percentiles(idle)}")
+    print(f"/embed ingesting: {_percentiles(busy)}")
+    print(f"Event loop lag:   {health.get('event_loop_lag_ms')}")
+
+
+if __name__ == "__main__":
+    main()
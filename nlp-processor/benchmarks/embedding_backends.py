@@ -0,0 +1,96 @@
+"""Compare embedding backends: throughput and cosine drift against torch.
+
+Builds chunk-sized texts from an interview transcript, encodes them with the
+torch model and each requested backend, and reports texts/second, speedup
+over torch and the cosine similarity between each backend's vectors and the
+torch vectors (1.0 means identical).
+
+Usage (from nlp-processor/):
+    python -m benchmarks.embedding_backends ../json/interviews/<collection>/<story>.json \\
+        --backends onnx onnx-int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from config import Config
+from embedding_service import EMBEDDING_BACKENDS, build_sentence_transformer
+
+# Window sizes (in words) cycled through to mimic the chunk length spread.
+WINDOW_SIZES = (15, 40, 80, 150)
+
+
+def _chunk_texts(payload: Dict, limit: int) -> List[str]:
+    words = [
+        (word.get("text") or "").strip()
+        for word in (payload.get("transcript") or {}).get("words") or []
+        if isinstance(word, dict)
+    ]
+    words = [word for word in words if word]
+    texts: List[str] = []
+    pos = 0
+    while words and len(texts) < limit:
+        size = WINDOW_SIZES[len(texts) % len(WINDOW_SIZES)]
+        window = [words[(pos + i) % len(words)] for i in range(size)]
+        texts.append(" ".join(window))
+        pos = (pos + size) % len(words)
+    return texts
+
+
+def _encode(model, texts: List[str], batch_size: int, repeats: int) -> Dict:
+    model.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)  # warm up
+    best = float("inf")
+    vectors = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        vectors = model.encode(texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": best, "vectors": np.asarray(vectors, dtype=np.float32)}
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("story", type=Path, help="Interview JSON file used for chunk texts")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"], choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = _chunk_texts(json.loads(args.story.read_text(encoding="utf-8")), args.texts)
+    if not texts:
+        raise SystemExit(f"No transcript words in {args.story}")
+    print(f"Model {Config.EMBEDDING_MODEL}, {len(texts)} texts, batch size {args.batch_size}")
+
+    torch_model = build_sentence_transformer(Config.EMBEDDING_MODEL, "cpu", "torch")
+    baseline = _encode(torch_model, texts, args.batch_size, args.repeats)
+    print(f"{'torch':>10}: {len(texts) / baseline['seconds']:8.1f} texts/s")
+
+    for backend in args.backends:
+        if backend == "torch":
+            continue
+        model = build_sentence_transformer(Config.EMBEDDING_MODEL, "cpu", backend)
+        result = _encode(model, texts, args.batch_size, args.repeats)
+        cosine = _cosine_rows(baseline["vectors"], result["vectors"])
+        print(
+            f"{backend:>10}: {len(texts) / result['seconds']:8.1f} texts/s, "
+            f"speedup x{baseline['seconds'] / result['seconds']:.2f}, "
+            f"cosine vs torch mean {cosine.mean():.5f} min {cosine.min():.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
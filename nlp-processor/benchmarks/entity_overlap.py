@@ -0,0 +1,112 @@
+"""Compare entity-to-chunk assignment: linear scan vs EntityIntervalIndex.
+
+Builds a synthetic transcript (`--hours` long, ~2.5 words/second), cuts it into
+overlapping sentence-window chunks like `chunk_doc_sections`, places an entity
+every `--entity-every` seconds, and times assigning entities to every chunk
+with the former per-chunk scan and with the interval index. Both must return
+the same entities.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.entity_overlap --hours 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from sentence_chunker import EntityIntervalIndex
+
+WORDS_PER_SECOND = 2.5
+WORDS_PER_SENTENCE = 15
+LABELS = ("person", "organization", "location", "date", "event", "technology")
+
+
+def _synthetic_story(hours: float, entity_every: float, seed: int) -> Tuple[List[Tuple[float, float]], List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    total_words = int(hours * 3600 * WORDS_PER_SECOND)
+    word_seconds = 1 / WORDS_PER_SECOND
+    sentences = [
+        (start * word_seconds, min(start + WORDS_PER_SENTENCE, total_words) * word_seconds)
+        for start in range(0, total_words, WORDS_PER_SENTENCE)
+    ]
+
+    # Three-sentence windows with one sentence of overlap, as with the defaults.
+    windows = [
+        (sentences[i][0], sentences[min(i + 3, len(sentences)) - 1][1])
+        for i in range(0, len(sentences), 2)
+    ]
+
+    entities: List[Dict[str, Any]] = []
+    t = 0.0
+    while t < hours * 3600:
+        duration = word_seconds * rng.randint(1, 4)
+        entities.append(
+            {
+                "text": f"entity {len(entities)}",
+                "label": rng.choice(LABELS),
+                "start_time": t,
+                "end_time": t + duration,
+            }
+        )
+        t += rng.expovariate(1 / entity_every)
+    return windows, entities
+
+
+def _linear(windows: List[Tuple[float, float]], entities: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    results = []
+    for start_time, end_time in windows:
+        results.append(
+            [
+                {
+                    "text": entity["text"],
+                    "label": entity["label"],
+                    "start_time": float(entity["start_time"]),
+                    "end_time": float(entity["end_time"]),
+                }
+                for entity in entities
+                if entity.get("start_time") is not None
+                and entity.get("end_time") is not None
+                and float(entity["start_time"]) < end_time
+                and float(entity["end_time"]) > start_time
+            ]
+        )
+    return results
+
+
+def _indexed(windows: List[Tuple[float, float]], entities: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    index = EntityIntervalIndex(entities)
+    return [index.overlapping(start_time, end_time) for start_time, end_time in windows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=5.0)
+    parser.add_argument("--entity-every", type=float, default=3.0, help="Mean seconds between entities")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    windows, entities = _synthetic_story(args.hours, args.entity_every, args.seed)
+    print(f"{args.hours:g}h transcript: {len(windows)} chunks, {len(entities)} entities")
+
+    started = time.perf_counter()
+    expected = _linear(windows, entities)
+    linear_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = _indexed(windows, entities)
+    indexed_seconds = time.perf_counter() - started
+
+    if actual != expected:
+        raise SystemExit("Interval index returned different entities than the linear scan")
+
+    assigned = sum(len(chunk) for chunk in actual)
+    print(f"{assigned} entity-chunk assignments")
+    print(f"linear scan:    {linear_seconds * 1000:9.1f} ms")
+    print(f"interval index: {indexed_seconds * 1000:9.1f} ms (incl. build), x{linear_seconds / indexed_seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
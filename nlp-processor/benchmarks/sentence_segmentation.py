@@ -0,0 +1,100 @@
+"""Compare spaCy sentence profiles: speed, load time and boundary agreement.
+
+Parses an interview transcript the way ingestion does (`from_transcript`,
+which marks sentence starts on the transcript tokens) with the `full`
+en_core_web_sm pipeline (the parser) and with each requested profile, and
+reports paragraphs/second, load time, sentences found and precision/recall/F1
+of each profile's sentence starts against the parser's. These are the
+boundaries the chunker receives.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.sentence_segmentation ../json/interviews/<collection>/<story>.json \\
+        --profiles senter sentencizer
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from spacy.tokens import Doc
+
+from config import Config
+from data_transformers import convert_api_format_to_transcript
+from pipeline import from_transcript, paragraph_sentences
+from spacy_models import PROFILES, load_pipeline
+from transcript import Transcript
+
+
+def _segment(profile: str, transcript: Transcript, repeats: int) -> Dict:
+    started = time.perf_counter()
+    nlp = load_pipeline(profile)
+    load_seconds = time.perf_counter() - started
+
+    best = float("inf")
+    boundaries: Set[int] = set()
+    for _ in range(repeats):
+        started = time.perf_counter()
+        doc = from_transcript(Doc(nlp.vocab, words=[]), transcript, nlp=nlp)
+        best = min(best, time.perf_counter() - started)
+        # Sentence starts inside each paragraph; the paragraph start is not a decision.
+        boundaries = {
+            paragraph.start + start
+            for section in doc._.sections
+            for paragraph in section._.paragraphs
+            for start, _ in paragraph_sentences(paragraph)
+            if start > 0
+        }
+    return {"load_seconds": load_seconds, "seconds": best, "boundaries": boundaries, "pipes": nlp.pipe_names}
+
+
+def _agreement(reference: Set[int], candidate: Set[int]) -> Tuple[float, float, float]:
+    matched = len(reference & candidate)
+    predicted = len(candidate)
+    expected = len(reference)
+    precision = matched / predicted if predicted else 1.0
+    recall = matched / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("story", type=Path, help="Interview JSON file")
+    parser.add_argument("--profiles", nargs="+", default=["senter", "sentencizer"], choices=PROFILES)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    Config.SENTENCE_PIPE_BATCH_SIZE = args.batch_size
+    transcript = convert_api_format_to_transcript(json.loads(args.story.read_text(encoding="utf-8")))
+    paragraphs = sum(1 for _, _, paragraph in transcript.paragraphs() if paragraph["words"])
+    if not paragraphs:
+        raise SystemExit(f"No transcript paragraphs in {args.story}")
+    print(f"{paragraphs} paragraphs, {len(transcript.words)} words, batch size {args.batch_size}")
+
+    baseline = _segment("full", transcript, args.repeats)
+    print(
+        f"{'full':>12}: {paragraphs / baseline['seconds']:8.1f} paragraphs/s, "
+        f"load {baseline['load_seconds']:.2f}s, {paragraphs + len(baseline['boundaries'])} sentences, "
+        f"pipes {baseline['pipes']}"
+    )
+
+    for profile in args.profiles:
+        if profile == "full":
+            continue
+        result = _segment(profile, transcript, args.repeats)
+        precision, recall, f1 = _agreement(baseline["boundaries"], result["boundaries"])
+        print(
+            f"{profile:>12}: {paragraphs / result['seconds']:8.1f} paragraphs/s, "
+            f"speedup x{baseline['seconds'] / result['seconds']:.2f}, "
+            f"load {result['load_seconds']:.2f}s, {paragraphs + len(result['boundaries'])} sentences, "
+            f"boundaries vs parser P {precision:.3f} R {recall:.3f} F1 {f1:.3f}, pipes {result['pipes']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare transcript memory: nested word dicts vs the columnar `Transcript`.
+
+Builds synthetic transcripts (`--hours` long, ~2.5 words/second) and measures
+with `tracemalloc` the peak allocation while transforming the payload and the
+memory the result keeps alive, for the nested section/paragraph/word dicts
+(`convert_api_format_to_sections`, the former transform output) and for the
+columnar `convert_api_format_to_transcript`. The payload itself is excluded.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.transcript_memory --hours 1 3 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+from benchmarks.transform_partition import WORDS_PER_SECOND, _synthetic_payload
+from data_transformers import convert_api_format_to_sections, convert_api_format_to_transcript
+
+MB = 1024 * 1024
+
+
+def _measure(convert: Callable[[Dict[str, Any]], Any], payload: Dict[str, Any]) -> Tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # Silence the per-section progress output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = convert(payload)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained / MB, peak / MB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1.0, 3.0, 5.0])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for hours in args.hours:
+        words = int(hours * 3600 * WORDS_PER_SECOND)
+        payload = _synthetic_payload(words, True, args.seed)
+        dict_retained, dict_peak = _measure(convert_api_format_to_sections, payload)
+        col_retained, col_peak = _measure(convert_api_format_to_transcript, payload)
+        print(
+            f"{hours:g}h ({words} words): dicts retain {dict_retained:7.1f} MB (peak {dict_peak:7.1f} MB), "
+            f"columnar retains {col_retained:7.1f} MB (peak {col_peak:7.1f} MB), "
+            f"x{dict_retained / col_retained:.1f} less retained"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare `Testimonies.transcription` encodings: size, encode and decode time.
+
+Builds a synthetic indexed transcript (`--hours` long, ~2.5 words/second),
+encodes it as `legacy`, `compact` and gzip-compressed `compact`, and reports
+the stored size, the encode time and the decode time. Every encoding must
+decode to the legacy sections, with times equal to the millisecond.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.transcription_format --hours 1 3 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.transform_partition import WORDS_PER_SECOND, _synthetic_payload
+from data_transformers import convert_api_format_to_transcript
+from transcription_format import decode_transcription, encode_transcription
+
+ENCODINGS: List[Tuple[str, str]] = [("legacy", "none"), ("compact", "none"), ("compact", "gzip")]
+TESTIMONY = {"id": "story", "weaviate_uuid": "uuid", "title": "Synthetic interview", "sections": []}
+
+
+def _check(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]], name: str) -> None:
+    for section, decoded in zip(expected, actual, strict=True):
+        if {k: v for k, v in section.items() if k != "paragraphs"} != {
+            k: v for k, v in decoded.items() if k != "paragraphs"
+        }:
+            raise SystemExit(f"{name}: section metadata differs")
+        for paragraph, decoded_paragraph in zip(section["paragraphs"], decoded["paragraphs"], strict=True):
+            for word, decoded_word in zip(paragraph["words"], decoded_paragraph["words"], strict=True):
+                if (
+                    word["text"] != decoded_word["text"]
+                    or abs(word["start"] - decoded_word["start"]) > 5e-4
+                    or abs(word["end"] - decoded_word["end"]) > 5e-4
+                    or any(word[key] != decoded_word[key] for key in ("section_idx", "para_idx", "word_idx"))
+                ):
+                    raise SystemExit(f"{name}: words differ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1.0, 3.0, 5.0])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for hours in args.hours:
+        words = int(hours * 3600 * WORDS_PER_SECOND)
+        # Silence the per-section progress output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            transcript = convert_api_format_to_transcript(_synthetic_payload(words, True, args.seed))
+        expected = transcript.to_sections()
+        print(f"{hours:g}h transcript ({words} words):")
+
+        baseline = 0
+        for fmt, compression in ENCODINGS:
+            name = fmt if compression == "none" else f"{fmt}+{compression}"
+            started = time.perf_counter()
+            encoded = encode_transcription(dict(TESTIMONY), transcript, fmt, compression)
+            encode_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            decoded = decode_transcription(encoded)
+            decode_seconds = time.perf_counter() - started
+            _check(expected, decoded["sections"], name)
+
+            size = len(encoded.encode("utf-8"))
+            baseline = baseline or size
+            print(
+                f"  {name:>13}: {size / 1024 / 1024:7.2f} MB (x{baseline / size:5.1f} smaller), "
+                f"encode {encode_seconds * 1000:7.1f} ms, decode {decode_seconds * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare word-to-section/paragraph partitioning: linear scans vs WordStartIndex.
+
+Builds synthetic indexed and non-indexed transcripts of 10k-200k words, runs
+`convert_api_format_to_transcript` with the sorted `WordStartIndex` and with a
+drop-in that scans every word per query (the previous behaviour), checks both
+produce identical sections, and reports the timings. The linear scan is
+quadratic, so it only runs up to `--reference-max` words.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.transform_partition --sizes 10000 50000 100000 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import data_transformers
+from data_transformers import WordStartIndex, convert_api_format_to_transcript
+
+WORDS_PER_SECOND = 2.5
+WORDS_PER_PARAGRAPH = 40
+SECTION_SECONDS = 300
+
+
+class LinearWordStarts:
+    """Previous behaviour: scan every word for each range query."""
+
+    def __init__(self, words: List[Dict[str, Any]]) -> None:
+        self.starts = [float(w.get("start", 0) or 0) for w in words]
+
+    def select(self, low: float, high: float, high_exclusive: Optional[float] = None) -> List[int]:
+        return [
+            i for i, start in enumerate(self.starts)
+            if low <= start <= high and (high_exclusive is None or start < high_exclusive)
+        ]
+
+
+def _synthetic_payload(words: int, indexed: bool, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    word_seconds = 1 / WORDS_PER_SECOND
+    all_words = []
+    for i in range(words):
+        start = round(i * word_seconds + rng.uniform(0, 0.1), 3)
+        all_words.append({"text": f"w{i}", "start": start, "end": round(start + word_seconds * 0.8, 3)})
+
+    paragraphs = []
+    for start in range(0, words, WORDS_PER_PARAGRAPH):
+        chunk = all_words[start:start + WORDS_PER_PARAGRAPH]
+        paragraphs.append(
+            {
+                "speaker": f"Speaker {len(paragraphs) % 2}",
+                "start": chunk[0]["start"],
+                "end": chunk[-1]["end"],
+                # Non-indexed transcripts often carry words only at the top level.
+                "words": chunk if indexed else [],
+            }
+        )
+
+    story: Dict[str, Any] = {"indexes": []}
+    if indexed:
+        total = all_words[-1]["end"]
+        metadata = [
+            {
+                "title": f"Section {n}",
+                "timecode": "00:00:00",
+                "synopsis": "",
+                "keywords": "",
+                # Every fifth section has no end so the next start is used.
+                "time": {"start": n * SECTION_SECONDS + 7, "end": None if n % 5 == 0 else (n + 1) * SECTION_SECONDS + 7},
+            }
+            for n in range(int(total // SECTION_SECONDS) + 1)
+        ]
+        story["indexes"] = [{"title": "Index", "updated_at": "2024-01-01", "metadata": metadata}]
+    return {"story": story, "transcript": {"words": all_words, "paragraphs": paragraphs}}
+
+
+def _run(payload: Dict[str, Any], index_cls) -> Dict[str, Any]:
+    original = data_transformers.WordStartIndex
+    data_transformers.WordStartIndex = index_cls
+    try:
+        started = time.perf_counter()
+        # Silence the per-section progress output.
+        with contextlib.redirect_stdout(io.StringIO()):
+            transcript = convert_api_format_to_transcript(payload)
+        return {"seconds": time.perf_counter() - started, "sections": transcript.to_sections()}
+    finally:
+        data_transformers.WordStartIndex = original
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000, 200_000])
+    parser.add_argument("--reference-max", type=int, default=50_000, help="Largest size to run the linear scan on")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for words in args.sizes:
+        for indexed in (True, False):
+            payload = _synthetic_payload(words, indexed, args.seed)
+            kind = "indexed" if indexed else "single"
+            fast = _run(payload, WordStartIndex)
+            line = f"{words:>7} words {kind:>7}: index {fast['seconds'] * 1000:9.1f} ms"
+            if words <= args.reference_max:
+                slow = _run(payload, LinearWordStarts)
+                if slow["sections"] != fast["sections"]:
+                    raise SystemExit(f"Sections differ for {words} words ({kind})")
+                line += f", linear {slow['seconds'] * 1000:9.1f} ms, x{slow['seconds'] / fast['seconds']:.1f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
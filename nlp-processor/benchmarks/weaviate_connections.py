@@ -0,0 +1,81 @@
+"""Compare a client per Weaviate call with the shared pooled client.
+
+Runs `--stories` simulated story writes, `--concurrency` at a time, against
+the Weaviate at `WEAVIATE_URL`. Each story makes the three calls an import
+makes (the fingerprint lookup, the testimony upsert and the chunk cleanup),
+here as read-only object lookups. Reports stories/second and per-call
+latency for a fresh `httpx.AsyncClient` per call (the previous behaviour)
+and for `get_weaviate_http_client()`, plus calls that failed to connect.
+
+Usage (from nlp-processor/):
+    python -m benchmarks.weaviate_connections --stories 500 --concurrency 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+import httpx
+
+from benchmarks.embed_latency import _percentiles
+from config import Config
+from weaviate_client import close_weaviate_http_client, get_weaviate_http_client
+
+CALLS_PER_STORY = 3
+
+
+async def _lookup(client: httpx.AsyncClient) -> float:
+    started = time.perf_counter()
+    response = await client.get(f"{Config.WEAVIATE_URL}/v1/objects/Testimonies/{uuid.uuid4()}")
+    if response.status_code != 404:
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def _run(name: str, pooled: bool, stories: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def story() -> None:
+        nonlocal failures
+        async with semaphore:
+            for _ in range(CALLS_PER_STORY):
+                try:
+                    if pooled:
+                        latencies.append(await _lookup(get_weaviate_http_client()))
+                    else:
+                        async with httpx.AsyncClient(timeout=60) as client:
+                            latencies.append(await _lookup(client))
+                except httpx.TransportError:
+                    failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(story() for _ in range(stories)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:>8}: {stories / elapsed:7.1f} stories/s, {failures} failed calls, latency {_percentiles(latencies)}")
+
+
+async def _main(stories: int, concurrency: int) -> None:
+    print(f"{stories} stories x {CALLS_PER_STORY} calls, {concurrency} concurrent, against {Config.WEAVIATE_URL}")
+    await _run("per-call", False, stories, concurrency)
+    try:
+        await _run("pooled", True, stories, concurrency)
+    finally:
+        await close_weaviate_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16, help="Stories written at the same time")
+    args = parser.parse_args()
+    asyncio.run(_main(args.stories, max(1, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
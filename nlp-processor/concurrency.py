@@ -0,0 +1,123 @@
+"""Executors and event-loop instrumentation for CPU-bound processing stages."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_processing_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_processing_executor() -> ThreadPoolExecutor:
+    """Return the shared executor used for CPU-bound processing stages."""
+    global _processing_executor
+    with _executor_lock:
+        if _processing_executor is None:
+            workers = max(1, int(Config.PROCESSING_WORKERS))
+            logger.info("[Concurrency] Starting processing executor with %s worker(s)", workers)
+            _processing_executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="nlp-processing",
+            )
+    return _processing_executor
+
+
+async def run_in_processing_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the processing executor and await its result.
+
+    Args:
+        func: Blocking callable to run
+        *args: Positional arguments for `func`
+        **kwargs: Keyword arguments for `func`
+
+    Returns:
+        The value returned by `func`
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_processing_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+
+
+def shutdown_processing_executor() -> None:
+    """Stop the processing executor, waiting for running stages to finish."""
+    global _processing_executor
+    with _executor_lock:
+        executor = _processing_executor
+        _processing_executor = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up from a fixed-interval sleep.
+
+    A healthy loop wakes up within a millisecond or two. Sustained lag means
+    something is blocking the loop and every endpoint (including `/embed` and
+    `/health`) is waiting behind it.
+    """
+
+    def __init__(self, interval_seconds: float, window: int = 120) -> None:
+        self.interval_seconds = max(0.01, float(interval_seconds))
+        self._samples: Deque[float] = deque(maxlen=max(1, window))
+        self._max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(0.0, loop.time() - expected)
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+
+    @property
+    def last_lag(self) -> float:
+        """Most recent lag sample in seconds."""
+        return self._samples[-1] if self._samples else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return lag statistics in milliseconds for the recent sample window."""
+        samples = list(self._samples)
+        if not samples:
+            return {"last_ms": 0.0, "avg_ms": 0.0, "max_ms": 0.0, "max_all_time_ms": 0.0, "samples": 0}
+        return {
+            "last_ms": round(samples[-1] * 1000, 2),
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "max_ms": round(max(samples) * 1000, 2),
+            "max_all_time_ms": round(self._max_lag * 1000, 2),
+            "samples": len(samples),
+        }
+
+
+event_loop_lag_monitor = EventLoopLagMonitor(Config.EVENT_LOOP_LAG_INTERVAL_SECONDS)
@@ -14,15 +14,45 @@ class Config:
     WEAVIATE_PORT = os.getenv("WEAVIATE_PORT", "8080")
     WEAVIATE_SECURE = os.getenv("WEAVIATE_SECURE", "false").lower() == "true"
     WEAVIATE_URL = f"{'https' if WEAVIATE_SECURE else 'http'}://{WEAVIATE_HOST_URL}:{WEAVIATE_PORT}"
+    # Shared HTTP client: connection pool size, idle keep-alive connections and
+    # how long they are kept; HTTP/2 needs httpx[http2]
+    WEAVIATE_MAX_CONNECTIONS = int(os.getenv("WEAVIATE_MAX_CONNECTIONS", "100"))
+    WEAVIATE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("WEAVIATE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    WEAVIATE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("WEAVIATE_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    WEAVIATE_HTTP2 = os.getenv("WEAVIATE_HTTP2", "false").lower() == "true"
+    # Timeouts: connecting, waiting for a free pooled connection, single-object
+    # requests and batch insert/delete requests
+    WEAVIATE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("WEAVIATE_CONNECT_TIMEOUT_SECONDS", "10"))
+    WEAVIATE_POOL_TIMEOUT_SECONDS = float(os.getenv("WEAVIATE_POOL_TIMEOUT_SECONDS", "30"))
+    WEAVIATE_TIMEOUT_SECONDS = float(os.getenv("WEAVIATE_TIMEOUT_SECONDS", "60"))
+    WEAVIATE_BATCH_TIMEOUT_SECONDS = float(os.getenv("WEAVIATE_BATCH_TIMEOUT_SECONDS", "120"))
+    # Weaviate's QUERY_MAXIMUM_RESULTS: the deepest limit/offset page it serves
+    WEAVIATE_QUERY_MAXIMUM_RESULTS = int(os.getenv("WEAVIATE_QUERY_MAXIMUM_RESULTS", "10000"))
     
     # Chunking Configuration
     MIN_WORDS_PER_CHUNK = int(os.getenv("MIN_WORDS_PER_CHUNK", "10"))
     MIN_CHARS_PER_CHUNK = int(os.getenv("MIN_CHARS_PER_CHUNK", "50"))
     MAX_WORDS_PER_CHUNK = int(os.getenv("MAX_WORDS_PER_CHUNK", "200"))
+    # How chunks store word timings: full ({text,start,end} list), range (word
+    # index range into the testimony transcript) or packed (delta-coded string)
+    CHUNK_WORD_TIMESTAMPS = os.getenv("CHUNK_WORD_TIMESTAMPS", "full").strip().lower()
+    # Testimonies.transcription encoding: compact (format_version 2) or legacy
+    # nested word JSON; compact output can additionally be gzip-compressed
+    TRANSCRIPTION_FORMAT = os.getenv("TRANSCRIPTION_FORMAT", "compact").strip().lower()
+    TRANSCRIPTION_COMPRESSION = os.getenv("TRANSCRIPTION_COMPRESSION", "none").strip().lower()
 
     # Sentence-based chunking configuration
     DEFAULT_SENTENCE_CHUNK_SIZE = int(os.getenv("SENTENCE_CHUNK_SIZE", "10"))
     DEFAULT_SENTENCE_OVERLAP = int(os.getenv("SENTENCE_OVERLAP", "5"))
+    # Paragraphs per spaCy nlp.pipe batch and worker processes for sentence splitting
+    SENTENCE_PIPE_BATCH_SIZE = int(os.getenv("SENTENCE_PIPE_BATCH_SIZE", "64"))
+    SENTENCE_PIPE_N_PROCESS = int(os.getenv("SENTENCE_PIPE_N_PROCESS", "1"))
+    # spaCy pipeline used for sentence splitting: full (parser), senter or sentencizer
+    SPACY_SENTENCE_PROFILE = os.getenv("SPACY_SENTENCE_PROFILE", "full").strip().lower()
+    # Persistent cache of parsed transcript Docs (spaCy DocBin), keyed by transcript hash
+    DOC_CACHE_ENABLED = os.getenv("DOC_CACHE_ENABLED", "true").lower() == "true"
+    DOC_CACHE_DIR = os.getenv("DOC_CACHE_DIR", "~/.cache/nlp-processor/docs")
+    DOC_CACHE_MAX_MB = int(os.getenv("DOC_CACHE_MAX_MB", "512"))
     
     # NER Configuration
     CONFIG_PATH = os.getenv("CONFIG_PATH", "../config.json")
@@ -39,6 +69,12 @@ class Config:
         os.getenv("GLINER_LOAD_TIMEOUT_SECONDS", "500")
     )
     MIN_TEXT_LENGTH_FOR_NER = int(os.getenv("MIN_TEXT_LENGTH_FOR_NER", "50"))
+    # Texts per GLiNER forward pass when NER batches are predicted together
+    NER_PREDICT_BATCH_SIZE = int(os.getenv("NER_PREDICT_BATCH_SIZE", "8"))
+    # Persistent GLiNER result cache, keyed by model, threshold, labels and text
+    NER_CACHE_ENABLED = os.getenv("NER_CACHE_ENABLED", "true").lower() == "true"
+    NER_CACHE_DIR = os.getenv("NER_CACHE_DIR", "~/.cache/nlp-processor/ner")
+    NER_CACHE_MAX_MB = int(os.getenv("NER_CACHE_MAX_MB", "256"))
     
     # HuggingFace Local Embeddings Configuration
     EMBEDDING_MODEL = os.getenv(
@@ -46,11 +82,55 @@ class Config:
         "sentence-transformers/LaBSE",
     )
     USE_GPU = os.getenv("USE_GPU", "false").lower() == "true"
+    # torch (default), onnx, or onnx-int8 (dynamically quantized ONNX, CPU only)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").strip().lower()
+    # Exported ONNX models are saved here per model and reused on later starts
+    EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "~/.cache/huggingface/onnx")
+    # Instruction set targeted by int8 quantization: avx2, avx512, avx512_vnni or arm64
+    EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2").strip().lower()
+    # Identifies the vectors a model/backend (and, for onnx-int8, quantization
+    # config) produces: cache keys, chunk ids and story fingerprints
+    if EMBEDDING_BACKEND == "torch":
+        EMBEDDING_VARIANT = EMBEDDING_MODEL
+    elif EMBEDDING_BACKEND == "onnx-int8":
+        EMBEDDING_VARIANT = f"{EMBEDDING_MODEL}#{EMBEDDING_BACKEND}:{EMBEDDING_ONNX_QUANTIZATION}"
+    else:
+        EMBEDDING_VARIANT = f"{EMBEDDING_MODEL}#{EMBEDDING_BACKEND}"
     EMBEDDING_LOAD_TIMEOUT_SECONDS = int(
         os.getenv("EMBEDDING_LOAD_TIMEOUT_SECONDS", "180")
     )
-    
-   
+    # Padded tokens per embedding forward pass (texts are length-bucketed to fit)
+    EMBEDDING_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "8192"))
+    # Persistent chunk embedding cache (memory-mapped vectors + SQLite index)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "~/.cache/nlp-processor/embeddings")
+    EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))
+    # /embed micro-batching: concurrent queries are encoded together
+    EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+    EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+    # Shared on-disk /embed query cache (under EMBEDDING_CACHE_DIR/queries)
+    QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+    QUERY_CACHE_MAX_MB = int(os.getenv("QUERY_CACHE_MAX_MB", "64"))
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    # Optional file with one query per line, embedded in the background at startup
+    QUERY_CACHE_PREWARM_FILE = os.getenv("QUERY_CACHE_PREWARM_FILE", "")
+
+    # Concurrency Configuration
+    # Threads available for CPU-bound processing stages (transform, parse, NER,
+    # chunking, embeddings). Keeps the event loop free for /embed and /health.
+    PROCESSING_WORKERS = int(os.getenv("PROCESSING_WORKERS", "1"))
+    EVENT_LOOP_LAG_INTERVAL_SECONDS = float(
+        os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", "0.5")
+    )
+
+    # Ingestion Job Queue Configuration (POST /jobs)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+    # Finished jobs kept in memory for status polling
+    JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))
+
+    # Multi-story batching (POST /process-stories)
+    MAX_STORIES_PER_BATCH = int(os.getenv("MAX_STORIES_PER_BATCH", "50"))
     
     @classmethod
     def load_ner_labels(cls) -> List[str]:
@@ -88,10 +168,34 @@ class Config:
         print(f"[Config] GLiNER threshold: {cls.GLINER_THRESHOLD}")
         print(f"[Config] GLiNER load timeout (s): {cls.GLINER_LOAD_TIMEOUT_SECONDS}")
         print(f"[Config] Min text length for NER: {cls.MIN_TEXT_LENGTH_FOR_NER}")
+        print(
+            f"[Config] NER cache: {'on' if cls.NER_CACHE_ENABLED else 'off'} "
+            f"({cls.NER_CACHE_DIR}, {cls.NER_CACHE_MAX_MB} MB)"
+        )
         print(f"[Config] Weaviate URL: {cls.WEAVIATE_URL}")
+        print(
+            f"[Config] Weaviate HTTP client: {cls.WEAVIATE_MAX_CONNECTIONS} connections "
+            f"({cls.WEAVIATE_MAX_KEEPALIVE_CONNECTIONS} keep-alive, {cls.WEAVIATE_KEEPALIVE_EXPIRY_SECONDS:g}s), "
+            f"HTTP/2 {'on' if cls.WEAVIATE_HTTP2 else 'off'}, timeouts (s) "
+            f"{cls.WEAVIATE_TIMEOUT_SECONDS:g}/{cls.WEAVIATE_BATCH_TIMEOUT_SECONDS:g} batch, "
+            f"max query results {cls.WEAVIATE_QUERY_MAXIMUM_RESULTS}"
+        )
         print(f"[Config] Embedding model: {cls.EMBEDDING_MODEL}")
+        print(f"[Config] Embedding backend: {cls.EMBEDDING_BACKEND}")
         print(f"[Config] Use GPU: {cls.USE_GPU}")
         print(f"[Config] Embedding load timeout (s): {cls.EMBEDDING_LOAD_TIMEOUT_SECONDS}")
+        print(
+            f"[Config] Embedding cache: {'on' if cls.EMBEDDING_CACHE_ENABLED else 'off'} "
+            f"({cls.EMBEDDING_CACHE_DIR}, {cls.EMBEDDING_CACHE_MAX_MB} MB)"
+        )
+        print(
+            f"[Config] Parsed doc cache: {'on' if cls.DOC_CACHE_ENABLED else 'off'} "
+            f"({cls.DOC_CACHE_DIR}, {cls.DOC_CACHE_MAX_MB} MB)"
+        )
+        print(f"[Config] Chunk word timestamps: {cls.CHUNK_WORD_TIMESTAMPS}")
+        print(f"[Config] Transcription format: {cls.TRANSCRIPTION_FORMAT} (compression {cls.TRANSCRIPTION_COMPRESSION})")
+        print(f"[Config] Processing workers: {cls.PROCESSING_WORKERS}")
+        print(f"[Config] Job workers: {cls.JOB_WORKERS} (queue size {cls.JOB_QUEUE_MAX_SIZE})")
 
 
 # Initialize NER labels on module import
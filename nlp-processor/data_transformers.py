@@ -1,47 +1,86 @@
 """Data transformation utilities for API format conversion."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 
-def convert_api_format_to_sections(parsed_api_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Convert API format to internal sections structure.
+from transcript import Transcript, TranscriptWordsBuilder
+
+
+def convert_api_format_to_transcript(parsed_api_data: Dict[str, Any]) -> Transcript:
+    """Convert API format to the columnar transcript model.
     
-    Transforms the incoming API payload into a structured format with sections,
-    paragraphs, and words. Handles both indexed and non-indexed transcripts.
+    Transforms the incoming API payload into sections and paragraphs over a
+    columnar word store. Handles both indexed and non-indexed transcripts.
+    Payload word dicts are referenced, not copied.
     
     Args:
         parsed_api_data: Raw API payload with transcript and story data
         
     Returns:
-        List of section dictionaries with nested paragraphs and words
+        `Transcript` with section/paragraph metadata and word arrays
     """
     transcript_data = parsed_api_data.get("transcript", {})
-    story_data = parsed_api_data.get("story", {})
-    indexes = story_data.get("indexes")
+    most_recent_index = select_story_index(parsed_api_data)
+    builder = TranscriptWordsBuilder()
     
     # If no indexes, create a single section with all paragraphs
-    if not indexes:
+    if most_recent_index is None:
         print("[Transform] No indexes found, creating single section with all paragraphs")
-        return _create_single_section(transcript_data)
+        sections = _create_single_section(transcript_data, builder)
+    else:
+        # Use the most recent index
+        print(f"[Transform] Using index: {most_recent_index['title']}")
+        print(f"[Transform] Last updated: {most_recent_index['updated_at']}")
+        sections = _create_indexed_sections(transcript_data, most_recent_index, builder)
     
-    # Use the most recent index
-    most_recent_index = max(indexes, key=lambda x: x.get("updated_at", ""))
-    print(f"[Transform] Using index: {most_recent_index['title']}")
-    print(f"[Transform] Last updated: {most_recent_index['updated_at']}")
+    return Transcript(sections, builder.build())
+
+
+def convert_api_format_to_sections(parsed_api_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert API format to nested section/paragraph/word dictionaries.
+    
+    Materializes `convert_api_format_to_transcript` as plain dicts, for
+    callers that need the JSON shape.
+    
+    Args:
+        parsed_api_data: Raw API payload with transcript and story data
+        
+    Returns:
+        List of section dictionaries with nested paragraphs and words
+    """
+    return convert_api_format_to_transcript(parsed_api_data).to_sections()
+
+
+def select_story_index(parsed_api_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the index used to section the transcript (most recently updated), if any.
     
-    return _create_indexed_sections(transcript_data, most_recent_index)
+    Args:
+        parsed_api_data: Raw API payload with transcript and story data
+        
+    Returns:
+        The most recent index dictionary, or None when the story has no indexes
+    """
+    indexes = (parsed_api_data.get("story") or {}).get("indexes")
+    if not indexes:
+        return None
+    return max(indexes, key=lambda x: x.get("updated_at", ""))
 
 
-def _create_single_section(transcript_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _create_single_section(
+    transcript_data: Dict[str, Any],
+    builder: TranscriptWordsBuilder
+) -> List[Dict[str, Any]]:
     """Create a single section containing all paragraphs.
     
     Used when no index information is available.
     
     Args:
         transcript_data: Transcript data with paragraphs and words
+        builder: Word store the paragraph words are appended to
         
     Returns:
-        List with single section dictionary
+        List with single section dictionary; paragraph `words` are ranges into `builder`
     """
     words = transcript_data.get("words", [])
     section = {
@@ -53,6 +92,7 @@ def _create_single_section(transcript_data: Dict[str, Any]) -> List[Dict[str, An
         "end": words[-1].get("end", 0) if words else 0,
         "paragraphs": []
     }
+    word_starts: Optional[WordStartIndex] = None
     
     # Add all paragraphs with word indices
     for para_idx, para in enumerate(transcript_data.get("paragraphs", [])):
@@ -64,24 +104,15 @@ def _create_single_section(transcript_data: Dict[str, Any]) -> List[Dict[str, An
         if raw_para_words:
             source_words = raw_para_words
         else:
-            source_words = [
-                word for word in words
-                if para_start <= float(word.get("start", 0) or 0) <= para_end
-            ]
-        
-        para_words = []
-        for word_idx, word in enumerate(source_words):
-            word_copy = word.copy()
-            word_copy["section_idx"] = 0
-            word_copy["para_idx"] = para_idx
-            word_copy["word_idx"] = word_idx
-            para_words.append(word_copy)
+            if word_starts is None:
+                word_starts = WordStartIndex(words)
+            source_words = [words[i] for i in word_starts.select(para_start, para_end)]
         
         section_para = {
             "speaker": para.get("speaker", "Unknown"),
             "start": para_start,
             "end": para_end,
-            "words": para_words,
+            "words": builder.add_paragraph(source_words, 0, para_idx),
             "ner": []
         }
         section["paragraphs"].append(section_para)
@@ -97,21 +128,26 @@ def _create_single_section(transcript_data: Dict[str, Any]) -> List[Dict[str, An
 
 def _create_indexed_sections(
     transcript_data: Dict[str, Any],
-    index: Dict[str, Any]
+    index: Dict[str, Any],
+    builder: TranscriptWordsBuilder
 ) -> List[Dict[str, Any]]:
     """Create sections based on index metadata.
     
     Args:
         transcript_data: Transcript data with paragraphs and words
         index: Index metadata with section information
+        builder: Word store the section words are appended to
         
     Returns:
-        List of section dictionaries
+        List of section dictionaries; paragraph `words` are ranges into `builder`
     """
     sections = []
     all_words = transcript_data.get("words", [])
     all_paragraphs = transcript_data.get("paragraphs", [])
     section_metas = _prepare_section_metadata(index.get("metadata", []), all_words)
+    word_starts = WordStartIndex(all_words)
+    para_starts = np.array([p.get("start", 0) for p in all_paragraphs], dtype=np.float64)
+    para_ends = np.array([p.get("end", 0) for p in all_paragraphs], dtype=np.float64)
     
     for section_idx, section_meta in enumerate(section_metas):
         section = {
@@ -137,38 +173,42 @@ def _create_indexed_sections(
         
         print(f"[Transform] Section time range: {section_start}s - {section['end']}s")
         
-        # Find paragraphs within this section's time range
+        # Find paragraphs overlapping this section's time range
         para_idx = 0
-        for para in all_paragraphs:
+        first_word: Optional[Dict[str, Any]] = None
+        last_word: Optional[Dict[str, Any]] = None
+        overlapping = np.flatnonzero((para_starts < section["end"]) & (para_ends > section_start))
+        for position in overlapping:
+            para = all_paragraphs[position]
             para_start = para.get("start", 0)
             para_end = para.get("end", 0)
             
-            # Check if paragraph overlaps with this section
-            if para_start < section["end"] and para_end > section_start:
-                para_words = _extract_section_words(
-                    all_words,
-                    para_start,
-                    para_end,
-                    section_start,
-                    section["end"],
-                    section_idx,
-                    para_idx
-                )
+            para_words = _extract_section_words(
+                all_words,
+                word_starts,
+                para_start,
+                para_end,
+                section_start,
+                section["end"]
+            )
+            
+            if para_words:
+                section_para_start = max(para_start, section_start)
+                section_para_end = min(para_end, section["end"])
+                
+                section_para = {
+                    "speaker": para.get("speaker", "Unknown"),
+                    "start": section_para_start,
+                    "end": section_para_end,
+                    "words": builder.add_paragraph(para_words, section_idx, para_idx),
+                    "ner": []
+                }
                 
-                if para_words:
-                    section_para_start = max(para_start, section_start)
-                    section_para_end = min(para_end, section["end"])
-                    
-                    section_para = {
-                        "speaker": para.get("speaker", "Unknown"),
-                        "start": section_para_start,
-                        "end": section_para_end,
-                        "words": para_words,
-                        "ner": []
-                    }
-                    
-                    section["paragraphs"].append(section_para)
-                    para_idx += 1
+                section["paragraphs"].append(section_para)
+                if first_word is None:
+                    first_word = para_words[0]
+                last_word = para_words[-1]
+                para_idx += 1
         
         # Update section speaker based on most common speaker in paragraphs
         if section["paragraphs"]:
@@ -176,8 +216,8 @@ def _create_indexed_sections(
             section["speaker"] = max(set(speakers), key=speakers.count) if speakers else "Unknown"
             
             # Update section start/end to actual word boundaries
-            section["start"] = section["paragraphs"][0]["words"][0]["start"]
-            section["end"] = section["paragraphs"][-1]["words"][-1]["end"]
+            section["start"] = first_word["start"]
+            section["end"] = last_word["end"]
         
         sections.append(section)
     
@@ -255,53 +295,71 @@ def _calculate_section_end(
     return current_start
 
 
+class WordStartIndex:
+    """Word start times sorted once for range queries.
+    
+    `select()` returns the positions of words whose start falls in a time
+    range, in their original transcript order, via `np.searchsorted` on the
+    sorted starts instead of a scan over every word.
+    """
+    
+    def __init__(self, words: List[Dict[str, Any]]) -> None:
+        starts = np.array([float(w.get("start", 0) or 0) for w in words], dtype=np.float64)
+        self.in_order = bool(np.all(starts[1:] >= starts[:-1]))
+        self.order = np.arange(len(starts)) if self.in_order else np.argsort(starts, kind="stable")
+        self.starts = starts if self.in_order else starts[self.order]
+    
+    def select(
+        self,
+        low: float,
+        high: float,
+        high_exclusive: Optional[float] = None,
+    ) -> List[int]:
+        """Return positions of words with low <= start <= high (and start < high_exclusive).
+        
+        Args:
+            low: Inclusive lower bound on word start
+            high: Inclusive upper bound on word start
+            high_exclusive: Optional additional exclusive upper bound
+            
+        Returns:
+            Word positions in original order
+        """
+        lo = int(np.searchsorted(self.starts, low, side="left"))
+        hi = int(np.searchsorted(self.starts, high, side="right"))
+        if high_exclusive is not None:
+            hi = min(hi, int(np.searchsorted(self.starts, high_exclusive, side="left")))
+        if lo >= hi:
+            return []
+        positions = self.order[lo:hi]
+        return (positions if self.in_order else np.sort(positions)).tolist()
+
+
 def _extract_section_words(
     all_words: List[Dict[str, Any]],
+    word_starts: WordStartIndex,
     para_start: float,
     para_end: float,
     section_start: float,
-    section_end: float,
-    section_idx: int,
-    para_idx: int
+    section_end: float
 ) -> List[Dict[str, Any]]:
     """Extract words that belong to both a paragraph and a section.
     
+    A word belongs when para_start <= start <= para_end and
+    floor(section_start) <= start < section_end (no lower section bound for a
+    section starting at 0).
+    
     Args:
         all_words: All transcript words
+        word_starts: `WordStartIndex` built over `all_words`
         para_start: Paragraph start time
         para_end: Paragraph end time
         section_start: Section start time
         section_end: Section end time
-        section_idx: Section index
-        para_idx: Paragraph index within section
         
     Returns:
-        List of word dictionaries with indices added
+        The matching word dictionaries from `all_words` (not copies)
     """
-    para_words = []
-    word_idx = 0
-    section_floor = float(int(section_start))
-    
-    for word in all_words:
-        word_start = word.get("start", 0)
-        
-        # Check if word is within paragraph bounds
-        if not (para_start <= word_start <= para_end):
-            continue
-        
-        # Check if word is within section bounds
-        if section_start == 0:  # First section
-            if word_start >= section_end:
-                continue
-        else:  # Other sections
-            if word_start < section_floor or word_start >= section_end:
-                continue
-        
-        word_copy = word.copy()
-        word_copy["section_idx"] = section_idx
-        word_copy["para_idx"] = para_idx
-        word_copy["word_idx"] = word_idx
-        para_words.append(word_copy)
-        word_idx += 1
-    
-    return para_words
+    low = para_start if section_start == 0 else max(para_start, float(int(section_start)))
+    positions = word_starts.select(low, para_end, high_exclusive=section_end)
+    return [all_words[position] for position in positions]
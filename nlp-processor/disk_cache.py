@@ -0,0 +1,497 @@
+"""Persistent on-disk caches for embedding vectors and NER results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from metrics import (
+    NER_CACHE_HITS,
+    NER_CACHE_MISSES,
+    VECTOR_CACHE_EVICTIONS,
+    VECTOR_CACHE_HITS,
+    VECTOR_CACHE_MISSES,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# (start_char, end_char, label, text) of one predicted entity.
+NerEntity = Tuple[int, int, str, str]
+
+
+def normalize_cache_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, trimmed, single-spaced."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def normalize_query_text(text: str) -> str:
+    """Normalize a search query: NFKC, case-folded, trimmed, single-spaced.
+
+    Used only as the `/embed` cache and coalescing key, so queries differing
+    only in case or spacing share one cache entry and one vector; the model
+    encodes the original text.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text or "").casefold()).strip()
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value).strip("_") or "default"
+
+
+class VectorCache:
+    """Fixed-capacity float32 vector store backed by a memory-mapped file.
+
+    Vectors live in `vectors.f32`, a `(capacity, dim)` memmap; `index.sqlite`
+    maps each key to its slot and last-use time. When the cache is full the
+    least recently used entries are evicted and their slots reused; entries
+    older than `ttl_seconds` (if set) count as misses and are overwritten.
+    Evicted slots go to `free_slots`, and `next_slot` in `meta` marks the
+    first slot never handed out, so allocation never scans the index.
+    Lookups and writes both run in immediate SQLite transactions, which keeps
+    a slot from being reused while another process copies it, so several
+    processes (e.g. uvicorn workers) can share one cache directory.
+    """
+
+    # Fraction of capacity evicted at once when the cache is full, so eviction
+    # cost is amortized over many inserts.
+    EVICT_FRACTION = 0.05
+
+    def __init__(
+        self,
+        directory: Path,
+        namespace: str,
+        dim: int,
+        max_bytes: int,
+        ttl_seconds: float = 0,
+        normalize: Callable[[str], str] = normalize_cache_text,
+        name: str = "chunks",
+    ) -> None:
+        self.namespace = namespace
+        self.name = name
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._normalize = normalize
+        self.dim = int(dim)
+        self.capacity = max(1, int(max_bytes) // (self.dim * 4))
+        self.directory = Path(directory).expanduser() / _slug(namespace)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(
+            str(self.directory / "index.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "created" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN created REAL NOT NULL DEFAULT 0")
+        self._vectors = self._open_vectors()
+
+    def _open_vectors(self) -> np.memmap:
+        path = self.directory / "vectors.f32"
+        layout = f"{self.dim}x{self.capacity}"
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'layout'").fetchone()
+            if row is None or row[0] != layout or not path.exists():
+                if row is not None:
+                    logger.info(
+                        "[VectorCache] Layout changed (%s -> %s) for %s; clearing cache",
+                        row[0],
+                        layout,
+                        self.namespace,
+                    )
+                self._db.execute("DELETE FROM entries")
+                self._db.execute("DELETE FROM free_slots")
+                vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(self.capacity, self.dim))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('layout', ?)", (layout,)
+                )
+                self._set_next_slot(0)
+            else:
+                vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+                if self._db.execute("SELECT 1 FROM meta WHERE name = 'next_slot'").fetchone() is None:
+                    # Caches written before the free list existed: record the
+                    # gaps below the highest used slot once.
+                    taken = {row[0] for row in self._db.execute("SELECT slot FROM entries")}
+                    next_slot = max(taken) + 1 if taken else 0
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO free_slots (slot) VALUES (?)",
+                        [(slot,) for slot in range(next_slot) if slot not in taken],
+                    )
+                    self._set_next_slot(next_slot)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return vectors
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's namespace (the model name)."""
+        material = f"{self.namespace}\0{self._normalize(text)}".encode("utf-8")
+        return hashlib.sha256(material).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up vectors for `texts`; missing entries are None."""
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+
+        now = time.time()
+        oldest = now - self.ttl_seconds if self.ttl_seconds else 0.0
+
+        with self._lock:
+            # Writers evict and overwrite slots in immediate transactions too,
+            # so no slot found here is reused before its vector is copied.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(unique), 500):
+                    group = unique[start:start + 500]
+                    placeholders = ",".join("?" * len(group))
+                    rows = self._db.execute(
+                        f"SELECT key, slot FROM entries WHERE key IN ({placeholders}) AND created >= ?",
+                        [*group, oldest],
+                    ).fetchall()
+                    for key, slot in rows:
+                        found[key] = np.array(self._vectors[slot], dtype=np.float32)
+                if found:
+                    self._db.executemany(
+                        "UPDATE entries SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        results = [found.get(key) for key in keys]
+        hits = sum(1 for vector in results if vector is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        VECTOR_CACHE_HITS.labels(cache=self.name).inc(hits)
+        VECTOR_CACHE_MISSES.labels(cache=self.name).inc(len(results) - hits)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Any) -> None:
+        """Store vectors for `texts`, evicting least recently used entries if needed."""
+        pending: Dict[str, np.ndarray] = {}
+        for text, vector in zip(texts, vectors):
+            pending[self.key(text)] = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        if not pending:
+            return
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                keys = list(pending)
+                now = time.time()
+                oldest = now - self.ttl_seconds if self.ttl_seconds else 0.0
+                known: Dict[str, int] = {}
+                expired: Dict[str, int] = {}
+                for start in range(0, len(keys), 500):
+                    group = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(group))
+                    for key, slot, created in self._db.execute(
+                        f"SELECT key, slot, created FROM entries WHERE key IN ({placeholders})", group
+                    ):
+                        (known if created >= oldest else expired)[key] = slot
+                new_keys = [
+                    key for key in pending if key not in known and key not in expired
+                ][:self.capacity]
+                slots = self._allocate_slots(len(new_keys), keep=set(pending))
+                # Vectors are written before their index rows are committed, so a
+                # reader never sees a row pointing at an unwritten slot.
+                for key, slot in zip(new_keys, slots):
+                    self._vectors[slot] = pending[key]
+                for key, slot in expired.items():
+                    self._vectors[slot] = pending[key]
+                self._vectors.flush()
+                self._db.executemany(
+                    "INSERT INTO entries (key, slot, last_used, created) VALUES (?, ?, ?, ?)",
+                    [(key, slot, now, now) for key, slot in zip(new_keys, slots)],
+                )
+                self._db.executemany(
+                    "UPDATE entries SET last_used = ?, created = ? WHERE key = ?",
+                    [(now, now, key) for key in expired],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _allocate_slots(self, count: int, keep: Optional[set] = None) -> List[int]:
+        if count <= 0:
+            return []
+        used = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = used + count - self.capacity
+        if overflow > 0:
+            evict = max(overflow, int(self.capacity * self.EVICT_FRACTION))
+            keep = keep or set()
+            # Expired entries go first, then the least recently used ones; keys
+            # being refreshed by the current write are never evicted.
+            victims: List[Tuple[str, int]] = []
+            if self.ttl_seconds:
+                victims = [
+                    (key, slot)
+                    for key, slot in self._db.execute(
+                        "SELECT key, slot FROM entries WHERE created < ?", (time.time() - self.ttl_seconds,)
+                    )
+                    if key not in keep
+                ]
+            if len(victims) < overflow:
+                expired = {key for key, _ in victims}
+                victims.extend(
+                    [
+                        (key, slot)
+                        for key, slot in self._db.execute(
+                            "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?",
+                            (evict + len(keep) + len(expired),),
+                        )
+                        if key not in keep and key not in expired
+                    ][:evict - len(victims)]
+                )
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            self._db.executemany("INSERT INTO free_slots (slot) VALUES (?)", [(slot,) for _, slot in victims])
+            removed = len(victims)
+            self.evictions += removed
+            VECTOR_CACHE_EVICTIONS.labels(cache=self.name).inc(removed)
+
+        # Reuse evicted slots first, then hand out slots never used yet.
+        free = [row[0] for row in self._db.execute("SELECT slot FROM free_slots LIMIT ?", (count,))]
+        self._db.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in free])
+        if len(free) < count:
+            next_slot = int(self._db.execute("SELECT value FROM meta WHERE name = 'next_slot'").fetchone()[0])
+            fresh = min(count - len(free), self.capacity - next_slot)
+            free.extend(range(next_slot, next_slot + fresh))
+            self._set_next_slot(next_slot + fresh)
+        return free
+
+    def _set_next_slot(self, slot: int) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('next_slot', ?)", (str(slot),))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the shared entry count."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "namespace": self.namespace,
+            "entries": entries,
+            "capacity": self.capacity,
+            "max_bytes": self.capacity * self.dim * 4,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def cache_info(self) -> CacheInfo:
+        """Hit/miss counts for this process in the shape of `functools.lru_cache`."""
+        return CacheInfo(self.hits, self.misses, self.capacity, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            self._db.close()
+
+
+class BlobCache:
+    """Size-capped key/value store of byte strings in one SQLite file.
+
+    Each entry records its size and last use; when the total exceeds
+    `max_bytes` the least recently used entries are evicted. WAL mode and
+    immediate transactions let several processes share the file.
+    """
+
+    # Evict down to this fraction of `max_bytes` so eviction runs rarely.
+    EVICT_TARGET = 0.9
+    # Rough per-row overhead (key, index, page slack) counted against the cap.
+    ROW_OVERHEAD = 64
+
+    def __init__(self, path: Path, max_bytes: int, name: str) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max(1, int(max_bytes))
+        self.name = name
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(
+            str(self.path),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Look up values for `keys`; missing entries are None."""
+        found: Dict[str, bytes] = {}
+        unique = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                group = unique[start:start + 500]
+                placeholders = ",".join("?" * len(group))
+                for key, value in self._db.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})", group
+                ):
+                    found[key] = value
+            if found:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(time.time(), key) for key in found],
+                )
+                self._db.execute("COMMIT")
+
+        results = [found.get(key) for key in keys]
+        hits = sum(1 for value in results if value is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up one value; None when missing."""
+        return self.get_many([key])[0]
+
+    def put_many(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        """Store `(key, value)` pairs, evicting least recently used entries if needed."""
+        now = time.time()
+        rows = [(key, value, len(value) + self.ROW_OVERHEAD, now) for key, value in items]
+        if not rows:
+            return
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store one value."""
+        self.put_many([(key, value)])
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * self.EVICT_TARGET)
+        victims: List[str] = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the shared entry count and size."""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class NerCache(BlobCache):
+    """Content-addressed store of GLiNER predictions.
+
+    Keys hash `namespace` (model, threshold and sorted labels) together with
+    the exact text, so changing any of them misses. Values are the predicted
+    entities as character offsets into that text, in JSON; callers map them
+    to word timings themselves.
+    """
+
+    def __init__(self, directory: Path, namespace: str, max_bytes: int) -> None:
+        super().__init__(Path(directory).expanduser() / "ner.sqlite", max_bytes, name="ner")
+        self.namespace = namespace
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's namespace."""
+        material = f"{self.namespace}\0{text}".encode("utf-8")
+        return hashlib.sha256(material).hexdigest()
+
+    def get_entities(self, texts: Sequence[str]) -> List[Optional[List[NerEntity]]]:
+        """Look up entities for `texts`; missing entries are None."""
+        values = self.get_many([self.key(text) for text in texts])
+        hits = sum(1 for value in values if value is not None)
+        NER_CACHE_HITS.inc(hits)
+        NER_CACHE_MISSES.inc(len(values) - hits)
+        return [
+            None if value is None else [tuple(ent) for ent in json.loads(value)]
+            for value in values
+        ]
+
+    def put_entities(self, texts: Sequence[str], entities: Sequence[Sequence[NerEntity]]) -> None:
+        """Store entities for `texts`."""
+        self.put_many(
+            [
+                (
+                    self.key(text),
+                    json.dumps([list(ent) for ent in ents], ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                )
+                for text, ents in zip(texts, entities)
+            ]
+        )
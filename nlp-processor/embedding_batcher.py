@@ -0,0 +1,161 @@
+"""Coalesce concurrent query embeddings into batched model calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from disk_cache import CacheInfo, normalize_query_text
+from embedding_service import LocalEmbedding
+from metrics import EMBED_COALESCED_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Micro-batcher in front of `LocalEmbedding` for `/embed`.
+
+    Requests arriving within `max_wait_ms` of each other (or while the previous
+    batch is still encoding) are encoded together, up to `max_batch_size` per
+    forward pass. Requests are keyed by `normalize_query_text`, so queries
+    differing only in case or spacing that are already queued or encoding
+    share one result; the model still encodes the original (stripped) text,
+    as chunks are embedded. Each batch is first looked up in the shared on-disk query cache
+    and only misses reach the model; cache I/O runs off the event loop.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        # (normalized key, original text) waiting to be encoded
+        self._pending: List[Tuple[str, str]] = []
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the batching task on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the batching task and fail requests still waiting."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for future in self._inflight.values():
+            if not future.done():
+                future.set_exception(RuntimeError("embedding batcher stopped"))
+        self._inflight.clear()
+        self._pending.clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Query cache hit/miss counts for this process, shaped like `functools.lru_cache`."""
+        return LocalEmbedding.query_cache_info()
+
+    async def embed(self, text: str) -> List[float]:
+        """Return the embedding for `text`, batched with concurrent requests."""
+        text = text.strip()
+        key = normalize_query_text(text) or text
+        if self._task is None:
+            self.start()
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._pending.append((key, text))
+            self._wakeup.set()
+            if len(self._pending) >= self.max_batch_size:
+                self._full.set()
+        # Shield so one cancelled request does not cancel the shared result.
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.max_batch_size and self.max_wait:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+            if not self._pending:
+                self._wakeup.clear()
+            if batch:
+                await self._encode(batch)
+
+    async def prewarm(self, texts: Iterable[str]) -> Dict[str, Any]:
+        """Embed queries ahead of time so later searches hit the cache.
+
+        Returns:
+            Dict with the number of distinct queries and elapsed seconds
+        """
+        started = time.perf_counter()
+        distinct: Dict[str, str] = {}
+        for text in texts:
+            key = normalize_query_text(text)
+            if key and key not in distinct:
+                distinct[key] = text.strip()
+        queries = list(distinct.values())
+        step = self.max_batch_size * 4
+        for start in range(0, len(queries), step):
+            await asyncio.gather(*(self.embed(q) for q in queries[start:start + step]))
+        return {"queries": len(queries), "seconds": round(time.perf_counter() - started, 3)}
+
+    @staticmethod
+    def _lookup_or_encode(batch: List[str]) -> List[Any]:
+        cache = LocalEmbedding.get_query_cache()
+        vectors: List[Any] = cache.get_many(batch) if cache is not None else [None] * len(batch)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = LocalEmbedding.encode([batch[i] for i in missing], batch_size=len(missing))
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            if cache is not None:
+                try:
+                    cache.put_many([batch[i] for i in missing], encoded)
+                except Exception as exc:
+                    logger.warning("[EmbeddingBatcher] Could not store query vectors: %s", exc)
+        return vectors
+
+    async def _encode(self, batch: List[Tuple[str, str]]) -> None:
+        EMBED_COALESCED_BATCH_SIZE.observe(len(batch))
+        try:
+            # The query cache normalizes its keys itself.
+            vectors = await asyncio.to_thread(self._lookup_or_encode, [text for _, text in batch])
+        except Exception as exc:
+            logger.warning("[EmbeddingBatcher] Batch of %s failed: %s", len(batch), exc)
+            for key, _ in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (key, _), vector in zip(batch, vectors):
+            result = [float(x) for x in vector]
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+
+embedding_batcher = EmbeddingBatcher(
+    max_batch_size=Config.EMBED_BATCH_MAX_SIZE,
+    max_wait_ms=Config.EMBED_BATCH_MAX_WAIT_MS,
+)
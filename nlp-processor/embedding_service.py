@@ -3,17 +3,157 @@
 from __future__ import annotations
 
 import logging
+import os
+import re
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
 from typing import List, Optional
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from config import Config
+from disk_cache import CacheInfo, VectorCache, normalize_query_text
+from metrics import observe_embedding_batch
 
 logger = logging.getLogger(__name__)
 
+# Rough activation memory per padded token during a CPU forward pass of a
+# BERT-base sized encoder; only used to shrink the token budget when available
+# memory is low.
+_BYTES_PER_TOKEN = 96 * 1024
+# Share of currently available memory one embedding batch may use.
+_MEMORY_FRACTION = 0.25
+# Bump when how `/embed` vectors are computed changes, so cached query
+# vectors from the old scheme are not served.
+QUERY_CACHE_VERSION = 2
+
+
+# cgroup v2 and v1 (limit, usage) files; the first pair present applies.
+_CGROUP_MEMORY_FILES = (
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+    ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes"),
+)
+
+
+def _host_available_bytes() -> Optional[int]:
+    """`MemAvailable` from /proc/meminfo, which counts reclaimable page cache."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE"))
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _cgroup_available_bytes() -> Optional[int]:
+    """Memory left under the container's cgroup limit, or None without a limit."""
+    for limit_path, usage_path in _CGROUP_MEMORY_FILES:
+        try:
+            limit = Path(limit_path).read_text().strip()
+            usage = int(Path(usage_path).read_text().strip())
+        except (OSError, ValueError):
+            continue
+        # cgroup v2 writes "max"; v1 reports a huge number when unlimited.
+        if limit == "max" or int(limit) >= 1 << 60:
+            return None
+        return max(0, int(limit) - usage)
+    return None
+
+
+def _available_memory_bytes() -> Optional[int]:
+    """Best-effort available memory on the encode device, or None if unknown.
+
+    On CPU this is the host's `MemAvailable`, capped by what is left under the
+    cgroup memory limit when running in a container.
+    """
+    if Config.USE_GPU:
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                return int(torch.cuda.mem_get_info()[0])
+        except Exception:
+            return None
+    available = _host_available_bytes()
+    cgroup_available = _cgroup_available_bytes()
+    if cgroup_available is not None:
+        available = cgroup_available if available is None else min(available, cgroup_available)
+    return available
+
+
+def _is_out_of_memory(exc: BaseException) -> bool:
+    return isinstance(exc, MemoryError) or "out of memory" in str(exc).lower()
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _onnx_export_dir(model_name: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "--", model_name).strip("-")
+    return Path(Config.EMBEDDING_ONNX_DIR).expanduser() / slug
+
+
+def build_sentence_transformer(model_name: str, device: str, backend: str = "torch") -> SentenceTransformer:
+    """Load a SentenceTransformer on the requested backend.
+
+    ONNX backends export the model on first use and save it under
+    `EMBEDDING_ONNX_DIR`; `onnx-int8` additionally writes a dynamically
+    quantized copy. Later loads read the saved artifact directly.
+
+    Args:
+        model_name: Hugging Face model id
+        device: Torch device (`cpu` or `cuda`)
+        backend: One of `torch`, `onnx`, `onnx-int8`
+
+    Returns:
+        A SentenceTransformer model instance.
+
+    Raises:
+        ValueError: If the backend is unknown
+        RuntimeError: If ONNX support is not installed
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'; expected one of {EMBEDDING_BACKENDS}")
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+
+    try:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+    except ImportError as exc:
+        raise RuntimeError(
+            f"EMBEDDING_BACKEND={backend} needs sentence-transformers>=3.2 and "
+            "optimum[onnxruntime]. Install them or use EMBEDDING_BACKEND=torch."
+        ) from exc
+
+    export_dir = _onnx_export_dir(model_name)
+    if not (export_dir / "onnx" / "model.onnx").exists():
+        logger.info("[LocalEmbedding] Exporting '%s' to ONNX in %s (one-time)", model_name, export_dir)
+        SentenceTransformer(model_name, device=device, backend="onnx").save(str(export_dir))
+
+    if backend == "onnx":
+        return SentenceTransformer(str(export_dir), device=device, backend="onnx")
+
+    config = Config.EMBEDDING_ONNX_QUANTIZATION
+    file_name = f"model_qint8_{config}.onnx"
+    if not (export_dir / "onnx" / file_name).exists():
+        logger.info("[LocalEmbedding] Quantizing ONNX model to int8 (%s)", config)
+        onnx_model = SentenceTransformer(str(export_dir), device=device, backend="onnx")
+        export_dynamic_quantized_onnx_model(onnx_model, config, str(export_dir))
+    return SentenceTransformer(
+        str(export_dir),
+        device=device,
+        backend="onnx",
+        model_kwargs={"file_name": f"onnx/{file_name}"},
+    )
+
 
 class LocalEmbedding:
     """Local embedding service backed by Hugging Face SentenceTransformers.
@@ -25,6 +165,15 @@ class LocalEmbedding:
     """
 
     _model: Optional[SentenceTransformer] = None
+    # Serializes model loading across threads.
+    _load_lock = threading.Lock()
+    # HF fast tokenizers are not safe for concurrent use, so forward passes are
+    # serialized. Long inputs are encoded batch by batch so query embeddings can
+    # interleave with ingestion instead of waiting for a whole story.
+    _encode_lock = threading.Lock()
+    _vector_cache: Optional[VectorCache] = None
+    _query_cache: Optional[VectorCache] = None
+    _cache_lock = threading.Lock()
 
     @classmethod
     def get_model(cls) -> SentenceTransformer:
@@ -33,79 +182,178 @@ class LocalEmbedding:
         Returns:
             A SentenceTransformer model instance.
         """
-        if cls._model is None:
-            device = "cuda" if Config.USE_GPU else "cpu"
-            model_name = Config.EMBEDDING_MODEL
-            timeout = max(1, int(Config.EMBEDDING_LOAD_TIMEOUT_SECONDS))
-            started_at = time.time()
-
-            logger.info(
-                "[LocalEmbedding] Loading model '%s' on device '%s' (timeout=%ss)",
-                model_name,
-                device,
-                timeout,
-            )
+        if cls._model is not None:
+            return cls._model
 
-            executor = ThreadPoolExecutor(max_workers=1)
-            future = executor.submit(SentenceTransformer, model_name, device=device)
-            try:
-                poll_seconds = 10
-                while True:
-                    elapsed = time.time() - started_at
-                    remaining = timeout - elapsed
-                    if remaining <= 0:
-                        raise FutureTimeoutError()
-
-                    try:
-                        cls._model = future.result(timeout=min(poll_seconds, remaining))
-                        break
-                    except FutureTimeoutError:
-                        logger.info(
-                            "[LocalEmbedding] Still loading model '%s'... %.0fs elapsed",
-                            model_name,
-                            time.time() - started_at,
-                        )
-            except FutureTimeoutError as exc:
-                message = (
-                    "[LocalEmbedding] Timeout loading embedding model "
-                    f"'{model_name}' after {timeout}s. "
-                    "Verify internet/cache for the configured EMBEDDING_MODEL "
-                    f"('{model_name}') or switch EMBEDDING_MODEL to another model."
-                )
-                logger.error(message)
-                raise RuntimeError(message) from exc
-            except Exception as exc:
-                message = (
-                    "[LocalEmbedding] Failed to load embedding model "
-                    f"'{model_name}': {exc}"
-                )
-                logger.exception(message)
-                raise RuntimeError(message) from exc
-            finally:
-                executor.shutdown(wait=False, cancel_futures=True)
-
-            dim = cls._model.get_sentence_embedding_dimension()
-            elapsed = time.time() - started_at
-            logger.info(
-                "[LocalEmbedding] Model loaded successfully in %.2fs (dim=%s)",
-                elapsed,
-                dim,
-            )
+        with cls._load_lock:
+            if cls._model is None:
+                cls._load_model()
 
         return cls._model
 
+    @classmethod
+    def _load_model(cls) -> None:
+        device = "cuda" if Config.USE_GPU else "cpu"
+        model_name = Config.EMBEDDING_MODEL
+        timeout = max(1, int(Config.EMBEDDING_LOAD_TIMEOUT_SECONDS))
+        started_at = time.time()
+
+        logger.info(
+            "[LocalEmbedding] Loading model '%s' on device '%s' with backend '%s' (timeout=%ss)",
+            model_name,
+            device,
+            Config.EMBEDDING_BACKEND,
+            timeout,
+        )
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(build_sentence_transformer, model_name, device, Config.EMBEDDING_BACKEND)
+        try:
+            poll_seconds = 10
+            while True:
+                elapsed = time.time() - started_at
+                remaining = timeout - elapsed
+                if remaining <= 0:
+                    raise FutureTimeoutError()
+
+                try:
+                    cls._model = future.result(timeout=min(poll_seconds, remaining))
+                    break
+                except FutureTimeoutError:
+                    logger.info(
+                        "[LocalEmbedding] Still loading model '%s'... %.0fs elapsed",
+                        model_name,
+                        time.time() - started_at,
+                    )
+        except FutureTimeoutError as exc:
+            message = (
+                "[LocalEmbedding] Timeout loading embedding model "
+                f"'{model_name}' after {timeout}s. "
+                "Verify internet/cache for the configured EMBEDDING_MODEL "
+                f"('{model_name}') or switch EMBEDDING_MODEL to another model."
+            )
+            logger.error(message)
+            raise RuntimeError(message) from exc
+        except Exception as exc:
+            message = (
+                "[LocalEmbedding] Failed to load embedding model "
+                f"'{model_name}': {exc}"
+            )
+            logger.exception(message)
+            raise RuntimeError(message) from exc
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        dim = cls._model.get_sentence_embedding_dimension()
+        elapsed = time.time() - started_at
+        logger.info(
+            "[LocalEmbedding] Model loaded successfully in %.2fs (dim=%s)",
+            elapsed,
+            dim,
+        )
+
     @classmethod
     def is_loaded(cls) -> bool:
         """Return True when the embedding model has already been initialized."""
         return cls._model is not None
 
     @classmethod
-    def encode(cls, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    def _token_lengths(cls, model: SentenceTransformer, texts: List[str]) -> List[int]:
+        """Tokenized length of each text, capped at the model's max sequence length."""
+        max_len = int(getattr(model, "max_seq_length", None) or 512)
+        tokenizer = getattr(model, "tokenizer", None)
+        if tokenizer is None:
+            return [min(max_len, len(text.split()) + 2) for text in texts]
+
+        lengths: List[int] = []
+        for start in range(0, len(texts), 256):
+            with cls._encode_lock:
+                encoded = tokenizer(
+                    texts[start:start + 256],
+                    add_special_tokens=True,
+                    truncation=True,
+                    max_length=max_len,
+                    return_attention_mask=False,
+                    return_token_type_ids=False,
+                )
+            lengths.extend(len(ids) for ids in encoded["input_ids"])
+        return lengths
+
+    @classmethod
+    def _token_budget(cls) -> int:
+        """Padded tokens per forward pass, reduced when available memory is low."""
+        budget = max(1, int(Config.EMBEDDING_TOKEN_BUDGET))
+        available = _available_memory_bytes()
+        if available:
+            budget = min(budget, max(1, int(available * _MEMORY_FRACTION) // _BYTES_PER_TOKEN))
+        return budget
+
+    @staticmethod
+    def _plan_batches(lengths: List[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+        """Group text indices, longest first, so `len(batch) * longest` fits the budget.
+
+        Sorting by length keeps similar lengths together, so little of each
+        batch is padding. A text longer than the budget gets a batch of its own.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+        batches: List[List[int]] = []
+        current: List[int] = []
+        longest = 0
+        for i in order:
+            # Sorted descending, so the first text of a batch is its longest.
+            longest = longest or lengths[i]
+            if current and (
+                (len(current) + 1) * longest > token_budget or len(current) >= max_batch_size
+            ):
+                batches.append(current)
+                current, longest = [], lengths[i]
+            current.append(i)
+        if current:
+            batches.append(current)
+        return batches
+
+    @classmethod
+    def _encode_batch(cls, model: SentenceTransformer, batch: List[str]) -> np.ndarray:
+        with cls._encode_lock:
+            started = time.perf_counter()
+            vectors = model.encode(
+                batch,
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+            observe_embedding_batch(len(batch), time.perf_counter() - started)
+        return vectors
+
+    @classmethod
+    def _encode_adaptive(cls, model: SentenceTransformer, batch: List[str]) -> np.ndarray:
+        """Encode a batch, halving it on out-of-memory errors."""
+        try:
+            return cls._encode_batch(model, batch)
+        except (MemoryError, RuntimeError) as exc:
+            if len(batch) == 1 or not _is_out_of_memory(exc):
+                raise
+            logger.warning(
+                "[LocalEmbedding] Out of memory encoding %s texts; splitting the batch",
+                len(batch),
+            )
+            middle = len(batch) // 2
+            return np.vstack([
+                cls._encode_adaptive(model, batch[:middle]),
+                cls._encode_adaptive(model, batch[middle:]),
+            ])
+
+    @classmethod
+    def encode(cls, texts: List[str], batch_size: int = 128) -> np.ndarray:
         """Generate embeddings for a list of texts.
 
+        Texts are sorted by tokenized length and grouped so each forward pass
+        stays within `EMBEDDING_TOKEN_BUDGET` padded tokens (lowered when free
+        memory is short). Rows are returned in input order.
+
         Args:
             texts: Strings to encode.
-            batch_size: Number of texts to process per batch.
+            batch_size: Maximum number of texts per forward pass.
 
         Returns:
             A numpy array with shape (len(texts), embedding_dim).
@@ -115,13 +363,124 @@ class LocalEmbedding:
             return np.array([])
 
         model = cls.get_model()
-        return model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=len(texts) > 100,
-            convert_to_numpy=True,
+        if len(texts) == 1:
+            return cls._encode_batch(model, list(texts))
+
+        lengths = cls._token_lengths(model, list(texts))
+        plan = cls._plan_batches(lengths, cls._token_budget(), max(1, int(batch_size)))
+
+        vectors: Optional[np.ndarray] = None
+        for indices in plan:
+            encoded = cls._encode_adaptive(model, [texts[i] for i in indices])
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=encoded.dtype)
+            vectors[indices] = encoded
+        return vectors
+
+    @classmethod
+    def get_vector_cache(cls) -> Optional[VectorCache]:
+        """Return the on-disk vector cache for the configured model, or None if disabled."""
+        if not Config.EMBEDDING_CACHE_ENABLED:
+            return None
+        if cls._vector_cache is not None:
+            return cls._vector_cache
+
+        with cls._cache_lock:
+            if cls._vector_cache is None:
+                try:
+                    cls._vector_cache = VectorCache(
+                        Config.EMBEDDING_CACHE_DIR,
+                        Config.EMBEDDING_VARIANT,
+                        cls.get_embedding_dimension(),
+                        Config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+                    )
+                except Exception as exc:
+                    # The cache is an optimization; never fail encoding over it.
+                    logger.warning("[LocalEmbedding] Vector cache unavailable: %s", exc)
+                    return None
+        return cls._vector_cache
+
+    @classmethod
+    def get_query_cache(cls) -> Optional[VectorCache]:
+        """Return the shared on-disk `/embed` query cache, or None if disabled."""
+        if not Config.QUERY_CACHE_ENABLED:
+            return None
+        if cls._query_cache is not None:
+            return cls._query_cache
+
+        with cls._cache_lock:
+            if cls._query_cache is None:
+                try:
+                    cls._query_cache = VectorCache(
+                        Path(Config.EMBEDDING_CACHE_DIR).expanduser() / "queries",
+                        f"{Config.EMBEDDING_VARIANT}@v{QUERY_CACHE_VERSION}",
+                        cls.get_embedding_dimension(),
+                        Config.QUERY_CACHE_MAX_MB * 1024 * 1024,
+                        ttl_seconds=Config.QUERY_CACHE_TTL_SECONDS,
+                        normalize=normalize_query_text,
+                        name="queries",
+                    )
+                except Exception as exc:
+                    logger.warning("[LocalEmbedding] Query cache unavailable: %s", exc)
+                    return None
+        return cls._query_cache
+
+    @classmethod
+    def vector_cache_stats(cls) -> Optional[dict]:
+        """Return vector cache statistics, or None if the cache is not open yet."""
+        return cls._vector_cache.stats() if cls._vector_cache is not None else None
+
+    @classmethod
+    def query_cache_info(cls) -> CacheInfo:
+        """Query cache hit/miss counts for this process (zeros before first use)."""
+        if cls._query_cache is None:
+            return CacheInfo(0, 0, 0, None)
+        return cls._query_cache.cache_info()
+
+    @classmethod
+    def query_cache_stats(cls) -> Optional[dict]:
+        """Return query cache statistics, or None if the cache is not open yet."""
+        return cls._query_cache.stats() if cls._query_cache is not None else None
+
+    @classmethod
+    def encode_cached(cls, texts: List[str], batch_size: int = 128) -> np.ndarray:
+        """Generate embeddings, reusing vectors from the on-disk cache.
+
+        Only texts missing from the cache are encoded; their vectors are
+        stored for the next run.
+
+        Args:
+            texts: Strings to encode.
+            batch_size: Maximum number of texts per forward pass.
+
+        Returns:
+            A float32 numpy array with shape (len(texts), embedding_dim).
+        """
+        cache = cls.get_vector_cache()
+        if cache is None or not texts:
+            return cls.encode(texts, batch_size=batch_size)
+
+        cached = cache.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        logger.info(
+            "[LocalEmbedding] Vector cache: %s hit(s), %s miss(es)",
+            len(texts) - len(missing),
+            len(missing),
         )
 
+        vectors = np.empty((len(texts), cache.dim), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                vectors[i] = vector
+        if missing:
+            encoded = cls.encode([texts[i] for i in missing], batch_size=batch_size)
+            vectors[missing] = encoded
+            try:
+                cache.put_many([texts[i] for i in missing], encoded)
+            except Exception as exc:
+                logger.warning("[LocalEmbedding] Could not store vectors in cache: %s", exc)
+        return vectors
+
     @classmethod
     def encode_single(cls, text: str) -> List[float]:
         """Generate an embedding for a single text.
@@ -139,7 +498,10 @@ class LocalEmbedding:
             dim = model.get_sentence_embedding_dimension()
             return [0.0] * dim
 
-        embedding = model.encode([text], convert_to_numpy=True)[0]
+        with cls._encode_lock:
+            started = time.perf_counter()
+            embedding = model.encode([text], convert_to_numpy=True)[0]
+            observe_embedding_batch(1, time.perf_counter() - started)
         return embedding.tolist()
 
     @classmethod
@@ -0,0 +1,118 @@
+"""Content fingerprints and deterministic ids used to skip unchanged work."""
+
+import hashlib
+import json
+from typing import Any, Dict
+
+from config import Config, NER_LABELS
+from data_transformers import select_story_index
+from utils import convert_to_uuid
+
+# Bump when processing logic changes in a way that alters stored output, so
+# previously imported stories are reprocessed once.
+FINGERPRINT_VERSION = 6
+
+
+def compute_story_fingerprint(
+    payload: Dict[str, Any],
+    story_meta: Dict[str, Any],
+    collection_meta: Dict[str, str],
+    folder_meta: Dict[str, str],
+    sentence_chunk_size: int,
+    overlap_sentences: int,
+    run_ner: bool,
+) -> str:
+    """Compute a stable hash of everything that determines a story's stored output.
+
+    Covers the transcript, the index used for sectioning, the metadata copied
+    onto testimony and chunk objects, the chunking parameters and the NER and
+    embedding model settings.
+
+    Args:
+        payload: Raw story payload
+        story_meta: Story metadata extracted from the payload
+        collection_meta: Resolved collection metadata
+        folder_meta: Resolved folder metadata
+        sentence_chunk_size: Number of sentences per chunk
+        overlap_sentences: Number of sentences to overlap between chunks
+        run_ner: Whether NER runs for this request
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    material = {
+        "version": FINGERPRINT_VERSION,
+        "transcript": payload.get("transcript"),
+        "index": select_story_index(payload),
+        "story": story_meta,
+        "collection": collection_meta,
+        "folder": folder_meta,
+        "chunking": {
+            "sentence_chunk_size": int(sentence_chunk_size),
+            "overlap_sentences": int(overlap_sentences),
+            "min_words": Config.MIN_WORDS_PER_CHUNK,
+            "min_chars": Config.MIN_CHARS_PER_CHUNK,
+            "max_words": Config.MAX_WORDS_PER_CHUNK,
+            "word_timestamps": Config.CHUNK_WORD_TIMESTAMPS,
+            "sentence_profile": Config.SPACY_SENTENCE_PROFILE,
+        },
+        "ner": {
+            "run": bool(run_ner),
+            "labels": list(NER_LABELS),
+            "model": Config.GLINER_MODEL,
+            "threshold": Config.GLINER_THRESHOLD,
+            "min_text_length": Config.MIN_TEXT_LENGTH_FOR_NER,
+        },
+        "transcription": {
+            "format": Config.TRANSCRIPTION_FORMAT,
+            "compression": Config.TRANSCRIPTION_COMPRESSION,
+        },
+        "embedding_model": Config.EMBEDDING_VARIANT,
+    }
+    return _hash_json(material)
+
+
+def _hash_json(value: Any) -> str:
+    encoded = json.dumps(
+        value,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def compute_chunk_uuid(
+    testimony_uuid: str,
+    section_id: int,
+    para_id: int,
+    text: str,
+    occurrence: int = 0,
+) -> str:
+    """Derive a stable chunk UUID from its position and text.
+
+    The embedding model and backend are part of the seed so switching either
+    gives every chunk a new id and forces re-embedding. `occurrence` separates identical
+    texts within the same paragraph.
+
+    Args:
+        testimony_uuid: UUID of the parent testimony
+        section_id: Section index of the chunk
+        para_id: Paragraph index within the section
+        text: Chunk text (the embedded content)
+        occurrence: Index among chunks with the same key in the paragraph
+
+    Returns:
+        UUID string
+    """
+    text_hash = hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+    seed = f"chunk:{testimony_uuid}:{int(section_id)}:{int(para_id)}:{text_hash}:{Config.EMBEDDING_VARIANT}"
+    if occurrence:
+        seed = f"{seed}:{int(occurrence)}"
+    return convert_to_uuid(seed)
+
+
+def compute_chunk_content_hash(properties: Dict[str, Any]) -> str:
+    """Hash a chunk's stored properties (excluding `content_hash` itself)."""
+    return _hash_json({k: v for k, v in properties.items() if k != "content_hash"})
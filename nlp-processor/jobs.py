@@ -0,0 +1,219 @@
+"""In-process ingestion job queue with status tracking."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from story_processor import StageTracker, process_story_payload
+
+logger = logging.getLogger("nlp-processor.jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue has no room for another job."""
+
+
+class Job:
+    """A queued story-processing request and its progress."""
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        collection: Optional[Dict[str, str]],
+        folder: Optional[Dict[str, str]],
+        options: Dict[str, Any],
+    ) -> None:
+        self.id = uuid.uuid4().hex
+        self.status = JOB_QUEUED
+        self.payload: Optional[Dict[str, Any]] = payload
+        self.collection = collection
+        self.folder = folder
+        self.options = options
+        self.tracker = StageTracker()
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.story_id = _story_id(payload)
+        self.testimony_uuid: Optional[str] = None
+        self.skipped = False
+        self.counts: Dict[str, Any] = {}
+        self.ner_stats: Dict[str, int] = {}
+        self.errors: List[str] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable status view of the job."""
+        now = time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.tracker.current_stage or self.status,
+            "story_id": self.story_id,
+            "testimony_uuid": self.testimony_uuid,
+            "skipped": self.skipped,
+            "options": self.options,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round((self.started_at or now) - self.created_at, 3),
+            "elapsed_seconds": (
+                round((self.finished_at or now) - self.started_at, 3) if self.started_at else None
+            ),
+            "timings": dict(self.tracker.timings),
+            "counts": self.counts,
+            "ner_stats": self.ner_stats,
+            "errors": self.errors,
+        }
+
+
+def _story_id(payload: Dict[str, Any]) -> Optional[str]:
+    story = payload.get("story") if isinstance(payload, dict) else None
+    transcript = payload.get("transcript") if isinstance(payload, dict) else None
+    story_id = (story or {}).get("_id") or (transcript or {}).get("storyId")
+    return str(story_id) if story_id else None
+
+
+class JobManager:
+    """Bounded in-process queue drained by a fixed number of worker tasks.
+
+    Workers are asyncio tasks; CPU-bound work inside each job still runs on the
+    processing executor, so `workers` bounds how many stories are in flight
+    while `PROCESSING_WORKERS` bounds how many use the CPU at once.
+    """
+
+    def __init__(self, workers: int, max_queue_size: int, retention: int) -> None:
+        self.workers = max(1, int(workers))
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.retention = max(1, int(retention))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Create the queue and start worker tasks on the running loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(
+            "[Jobs] Started %s worker(s), queue size %s",
+            self.workers,
+            self.max_queue_size,
+        )
+
+    async def stop(self) -> None:
+        """Cancel worker tasks. Queued jobs are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        collection: Optional[Dict[str, str]],
+        folder: Optional[Dict[str, str]],
+        options: Dict[str, Any],
+    ) -> Job:
+        """Enqueue a story for processing.
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity
+        """
+        if self._queue is None:
+            raise RuntimeError("Job manager is not started")
+
+        job = Job(payload, collection, folder, options)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as exc:
+            raise JobQueueFullError(
+                f"Job queue is full ({self.max_queue_size} jobs); retry later"
+            ) from exc
+
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_COMPLETED: 0, JOB_FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            **counts,
+            "workers": self.workers,
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+        }
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        overflow = len(finished) - self.retention
+        for job_id in finished[:max(0, overflow)]:
+            del self._jobs[job_id]
+
+    async def _worker(self, worker_idx: int) -> None:
+        assert self._queue is not None
+        while True:
+            job: Job = await self._queue.get()
+            try:
+                await self._run(job, worker_idx)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, worker_idx: int) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        print(f"\n📥 JOB {job.id} STARTED (worker {worker_idx}, story {job.story_id})")
+        try:
+            result = await process_story_payload(
+                job.payload or {},
+                job.collection,
+                job.folder,
+                tracker=job.tracker,
+                **job.options,
+            )
+            job.skipped = bool(result.get("skipped"))
+            job.testimony_uuid = result.get("testimony_uuid") or result["testimony"]["id"]
+            job.counts = result["counts"]
+            job.ner_stats = result["ner_stats"]
+            job.status = JOB_COMPLETED
+        except Exception as exc:
+            job.errors.append(str(exc))
+            job.errors.append(traceback.format_exc()[:4000])
+            job.status = JOB_FAILED
+            logger.exception("[Jobs] Job %s failed in stage %s", job.id, job.tracker.current_stage)
+        finally:
+            job.finished_at = time.time()
+            # Drop the payload: finished jobs only keep their status summary.
+            job.payload = None
+            print(
+                f"🏁 JOB {job.id} {job.status.upper()} in "
+                f"{job.finished_at - job.started_at:.2f}s"
+            )
+
+
+job_manager = JobManager(
+    workers=Config.JOB_WORKERS,
+    max_queue_size=Config.JOB_QUEUE_MAX_SIZE,
+    retention=Config.JOB_RETENTION,
+)
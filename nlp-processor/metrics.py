@@ -0,0 +1,173 @@
+"""Prometheus metrics for the processing pipeline, exposed on `/metrics`."""
+
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+T = TypeVar("T")
+
+# Pipeline stages range from milliseconds (transform) to many minutes (NER on
+# a long story), so the default buckets are extended at both ends.
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STAGE_SECONDS = Histogram(
+    "nlp_stage_duration_seconds",
+    "Duration of a story processing stage (transform, parse, ner, chunk, embed, weaviate_write, ...)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+NER_BATCH_SECONDS = Histogram(
+    "nlp_ner_batch_duration_seconds",
+    "Duration of one GLiNER forward pass over a group of texts",
+    buckets=STAGE_BUCKETS,
+)
+NER_BATCH_TEXTS = Counter(
+    "nlp_ner_texts_total",
+    "Texts sent to GLiNER",
+)
+EMBED_BATCH_SECONDS = Histogram(
+    "nlp_embedding_batch_duration_seconds",
+    "Duration of one embedding model forward pass",
+    buckets=STAGE_BUCKETS,
+)
+EMBED_TEXTS = Counter(
+    "nlp_embedding_texts_total",
+    "Texts encoded by the embedding model",
+)
+EMBED_TEXTS_PER_SECOND = Gauge(
+    "nlp_embedding_texts_per_second",
+    "Throughput of the most recent embedding batch",
+)
+WEAVIATE_SECONDS = Histogram(
+    "nlp_weaviate_request_duration_seconds",
+    "Duration of Weaviate operations",
+    ["operation"],
+    buckets=STAGE_BUCKETS,
+)
+EMBED_REQUEST_SECONDS = Histogram(
+    "nlp_embed_request_duration_seconds",
+    "Latency of POST /embed",
+    buckets=REQUEST_BUCKETS,
+)
+EMBED_COALESCED_BATCH_SIZE = Histogram(
+    "nlp_embed_coalesced_batch_size",
+    "Distinct /embed texts encoded together by the micro-batcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+EMBED_CACHE_HITS = Gauge(
+    "nlp_embed_cache_hits",
+    "Query embedding cache hits since startup",
+)
+EMBED_CACHE_MISSES = Gauge(
+    "nlp_embed_cache_misses",
+    "Query embedding cache misses since startup",
+)
+EMBED_CACHE_HIT_RATIO = Gauge(
+    "nlp_embed_cache_hit_ratio",
+    "Query embedding cache hits / lookups since startup",
+)
+VECTOR_CACHE_HITS = Counter(
+    "nlp_vector_cache_hits_total",
+    "Embeddings served from an on-disk vector cache (chunks or queries)",
+    ["cache"],
+)
+VECTOR_CACHE_MISSES = Counter(
+    "nlp_vector_cache_misses_total",
+    "Embeddings not found in an on-disk vector cache (chunks or queries)",
+    ["cache"],
+)
+VECTOR_CACHE_EVICTIONS = Counter(
+    "nlp_vector_cache_evictions_total",
+    "Entries evicted from an on-disk vector cache (chunks or queries)",
+    ["cache"],
+)
+NER_CACHE_HITS = Counter(
+    "nlp_ner_cache_hits_total",
+    "NER texts answered from the on-disk GLiNER result cache",
+)
+NER_CACHE_MISSES = Counter(
+    "nlp_ner_cache_misses_total",
+    "NER texts not found in the on-disk GLiNER result cache",
+)
+DOC_CACHE_HITS = Counter(
+    "nlp_doc_cache_hits_total",
+    "Transcripts whose parsed spaCy Doc was loaded from the on-disk DocBin cache",
+)
+DOC_CACHE_MISSES = Counter(
+    "nlp_doc_cache_misses_total",
+    "Transcripts parsed because no cached Doc was found",
+)
+JOBS = Gauge(
+    "nlp_jobs",
+    "Jobs tracked by the ingestion queue, by status",
+    ["status"],
+)
+MODEL_LOADED = Gauge(
+    "nlp_model_loaded",
+    "1 when the model is loaded in this process",
+    ["model"],
+)
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "nlp_event_loop_lag_seconds",
+    "Most recent event loop wake-up lag",
+)
+
+
+@contextmanager
+def observe_weaviate(operation: str) -> Iterator[None]:
+    """Time a Weaviate operation (delete, upsert, batch_insert, ...)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        WEAVIATE_SECONDS.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def track_weaviate(operation: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate an async Weaviate call so its duration is recorded under `operation`."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with observe_weaviate(operation):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def observe_embedding_batch(size: int, seconds: float) -> None:
+    """Record one embedding forward pass over `size` texts."""
+    EMBED_BATCH_SECONDS.observe(seconds)
+    EMBED_TEXTS.inc(size)
+    if seconds > 0:
+        EMBED_TEXTS_PER_SECOND.set(size / seconds)
+
+
+def observe_ner_batch(size: int, seconds: float) -> None:
+    """Record one GLiNER forward pass over `size` texts."""
+    NER_BATCH_SECONDS.observe(seconds)
+    NER_BATCH_TEXTS.inc(size)
+
+
+def register_embed_cache(cache_info: Callable[[], object]) -> None:
+    """Expose hit/miss counts of an `lru_cache`-style `cache_info()` callable."""
+
+    def ratio() -> float:
+        info = cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    EMBED_CACHE_HITS.set_function(lambda: cache_info().hits)
+    EMBED_CACHE_MISSES.set_function(lambda: cache_info().misses)
+    EMBED_CACHE_HIT_RATIO.set_function(ratio)
+
+
+def render_metrics() -> tuple:
+    """Return the Prometheus exposition body and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,16 +1,22 @@
 """Named Entity Recognition (NER) processing using GLiNER and spaCy."""
 
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import json
 import logging
+import re
+import threading
 import time
-from typing import Any, Dict, List, Literal, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Tuple
 import warnings
 
 import spacy
 from gliner import GLiNER
 from spacy.language import Language
+from spacy.tokens import Doc
 
 from config import Config, NER_LABELS
+from disk_cache import NerCache, NerEntity
+from metrics import observe_ner_batch
 
 logger = logging.getLogger(__name__)
 
@@ -23,91 +29,183 @@ warnings.filterwarnings(
 
 # Initialize spaCy model
 nlp = spacy.blank("en")
+# Set by GlinerComponent when GLiNER raised on a text, so an empty result is
+# reported as "gliner_bug_empty" and not cached as "no_entities".
+if not Doc.has_extension("gliner_failed"):
+    Doc.set_extension("gliner_failed", default=False)
 gliner_model: Optional[GLiNER] = None
+# Guards model loading and pipe setup when several processing workers run NER.
+_gliner_load_lock = threading.RLock()
+# GLiNER's tokenizer is not safe for concurrent use from multiple threads.
+_gliner_predict_lock = threading.Lock()
+ner_cache: Optional[NerCache] = None
+_ner_cache_lock = threading.Lock()
 
 
 def get_gliner_model() -> GLiNER:
     """Lazily load GLiNER model on first real NER use."""
     global gliner_model
-    if gliner_model is None:
-        timeout = max(1, int(Config.GLINER_LOAD_TIMEOUT_SECONDS))
-        started_at = time.time()
-        logger.info(
-            "[NER] Loading GLiNER model '%s' (timeout=%ss). This may take several minutes on first run.",
-            Config.GLINER_MODEL,
-            timeout,
+    if gliner_model is not None:
+        return gliner_model
+
+    with _gliner_load_lock:
+        if gliner_model is None:
+            _load_gliner_model()
+    return gliner_model
+
+
+def _load_gliner_model() -> None:
+    global gliner_model
+    timeout = max(1, int(Config.GLINER_LOAD_TIMEOUT_SECONDS))
+    started_at = time.time()
+    logger.info(
+        "[NER] Loading GLiNER model '%s' (timeout=%ss). This may take several minutes on first run.",
+        Config.GLINER_MODEL,
+        timeout,
+    )
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(GLiNER.from_pretrained, Config.GLINER_MODEL)
+    try:
+        poll_seconds = 10
+        while True:
+            elapsed = time.time() - started_at
+            remaining = timeout - elapsed
+            if remaining <= 0:
+                raise FutureTimeoutError()
+
+            try:
+                gliner_model = future.result(timeout=min(poll_seconds, remaining))
+                break
+            except FutureTimeoutError:
+                logger.info(
+                    "[NER] Still loading GLiNER model '%s'... %.0fs elapsed",
+                    Config.GLINER_MODEL,
+                    time.time() - started_at,
+                )
+    except FutureTimeoutError as exc:
+        message = (
+            "[NER] Timeout loading GLiNER model "
+            f"'{Config.GLINER_MODEL}' after {timeout}s. "
+            "Verify internet/cache, increase GLINER_LOAD_TIMEOUT_SECONDS, "
+            "or import with run_ner=false."
         )
-        executor = ThreadPoolExecutor(max_workers=1)
-        future = executor.submit(GLiNER.from_pretrained, Config.GLINER_MODEL)
-        try:
-            poll_seconds = 10
-            while True:
-                elapsed = time.time() - started_at
-                remaining = timeout - elapsed
-                if remaining <= 0:
-                    raise FutureTimeoutError()
-
-                try:
-                    gliner_model = future.result(timeout=min(poll_seconds, remaining))
-                    break
-                except FutureTimeoutError:
-                    logger.info(
-                        "[NER] Still loading GLiNER model '%s'... %.0fs elapsed",
-                        Config.GLINER_MODEL,
-                        time.time() - started_at,
-                    )
-        except FutureTimeoutError as exc:
-            message = (
-                "[NER] Timeout loading GLiNER model "
-                f"'{Config.GLINER_MODEL}' after {timeout}s. "
-                "Verify internet/cache, increase GLINER_LOAD_TIMEOUT_SECONDS, "
-                "or import with run_ner=false."
-            )
-            logger.error(message)
-            raise RuntimeError(message) from exc
-        except Exception as exc:
-            message = (
-                "[NER] Failed to load GLiNER model "
-                f"'{Config.GLINER_MODEL}': {exc}"
+        logger.error(message)
+        raise RuntimeError(message) from exc
+    except Exception as exc:
+        message = (
+            "[NER] Failed to load GLiNER model "
+            f"'{Config.GLINER_MODEL}': {exc}"
+        )
+        logger.exception(message)
+        raise RuntimeError(message) from exc
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info("[NER] GLiNER model ready in %.2fs", time.time() - started_at)
+
+
+def is_gliner_loaded() -> bool:
+    """Return True when the GLiNER model has already been initialized."""
+    return gliner_model is not None
+
+
+NerEmptyReason = Literal["ok", "too_short", "gliner_bug_empty", "no_entities", "error"]
+
+
+class CachedEntity(NamedTuple):
+    """Entity served from the NER cache, with the span attributes callers read."""
+
+    start_char: int
+    end_char: int
+    label_: str
+    text: str
+
+
+def get_ner_cache() -> Optional[NerCache]:
+    """Return the on-disk GLiNER result cache, or None if disabled or unavailable."""
+    global ner_cache
+    if not Config.NER_CACHE_ENABLED:
+        return None
+    if ner_cache is not None:
+        return ner_cache
+
+    with _ner_cache_lock:
+        if ner_cache is None:
+            namespace = json.dumps(
+                [Config.GLINER_MODEL, Config.GLINER_THRESHOLD, sorted(NER_LABELS)],
+                separators=(",", ":"),
             )
-            logger.exception(message)
-            raise RuntimeError(message) from exc
-        finally:
-            executor.shutdown(wait=False, cancel_futures=True)
+            try:
+                ner_cache = NerCache(
+                    Config.NER_CACHE_DIR,
+                    namespace,
+                    Config.NER_CACHE_MAX_MB * 1024 * 1024,
+                )
+            except Exception as exc:
+                # The cache is an optimization; never fail NER over it.
+                logger.warning("[NER] NER cache unavailable: %s", exc)
+                return None
+    return ner_cache
 
-        logger.info("[NER] GLiNER model ready in %.2fs", time.time() - started_at)
-    return gliner_model
 
-NerEmptyReason = Literal["ok", "too_short", "gliner_bug_empty", "no_entities"]
+def ner_cache_stats() -> Optional[Dict[str, Any]]:
+    """Return NER cache statistics, or None if the cache is not open yet."""
+    return ner_cache.stats() if ner_cache is not None else None
 
 
-@Language.component("gliner_custom")
-def gliner_custom_component(doc):
-    """Custom spaCy pipeline component for GLiNER entity extraction.
-    
-    Args:
-        doc: spaCy Doc object
-        
-    Returns:
-        Doc with entities populated
-    """
-    text = (doc.text or "").strip()
-    
-    if len(text) < 5 or not NER_LABELS:
-        doc.ents = ()
-        return doc
-    
+def _cache_lookup(texts: List[str]) -> List[Optional[List[NerEntity]]]:
+    cache = get_ner_cache()
+    if cache is None or not texts:
+        return [None] * len(texts)
     try:
-        model = get_gliner_model()
-        ents = model.predict_entities(
-            text=text,
-            labels=NER_LABELS,
-            threshold=Config.GLINER_THRESHOLD,
-        )
-    except IndexError:
-        doc.ents = ()
-        return doc
-    
+        return cache.get_entities(texts)
+    except Exception as exc:
+        logger.warning("[NER] NER cache lookup failed: %s", exc)
+        return [None] * len(texts)
+
+
+def _cache_store(texts: List[str], results: List[Tuple[List[Any], NerEmptyReason]]) -> None:
+    """Cache definitive predictions; errors and GLiNER failures are retried next time."""
+    cache = get_ner_cache()
+    if cache is None:
+        return
+    rows = [
+        (text, [(e.start_char, e.end_char, e.label_, e.text) for e in ents])
+        for text, (ents, reason) in zip(texts, results)
+        if reason in ("ok", "no_entities")
+    ]
+    if not rows:
+        return
+    try:
+        cache.put_entities([text for text, _ in rows], [ents for _, ents in rows])
+    except Exception as exc:
+        logger.warning("[NER] Could not store NER results: %s", exc)
+
+
+def _cached_result(entities: List[NerEntity]) -> Tuple[List[Any], NerEmptyReason]:
+    ents = [CachedEntity(*entity) for entity in entities]
+    return ents, ("ok" if ents else "no_entities")
+
+
+def _predict_entities_batch(model: GLiNER, texts: List[str]) -> List[List[Dict[str, Any]]]:
+    """Run GLiNER over several texts in one padded forward pass."""
+    if len(texts) == 1 or not hasattr(model, "batch_predict_entities"):
+        return [
+            model.predict_entities(
+                text=text,
+                labels=NER_LABELS,
+                threshold=Config.GLINER_THRESHOLD,
+            )
+            for text in texts
+        ]
+    return model.batch_predict_entities(
+        texts,
+        NER_LABELS,
+        threshold=Config.GLINER_THRESHOLD,
+    )
+
+
+def _set_gliner_entities(doc, text: str, ents: List[Dict[str, Any]]):
     spans = []
     for entity in ents:
         label = (entity.get("label") or "").strip()
@@ -149,25 +247,149 @@ def gliner_custom_component(doc):
     return doc
 
 
+class GlinerComponent:
+    """Custom spaCy pipeline component for GLiNER entity extraction.
+
+    `__call__` annotates a single Doc; `pipe` groups Docs so GLiNER runs one
+    padded forward pass per group instead of one per text.
+    """
+
+    def __call__(self, doc):
+        """Annotate one Doc.
+        
+        Args:
+            doc: spaCy Doc object
+            
+        Returns:
+            Doc with entities populated
+        """
+        return self._annotate([doc])[0]
+
+    def pipe(self, docs: Iterable[Any], batch_size: int = 8) -> Iterator[Any]:
+        for batch in spacy.util.minibatch(docs, size=max(1, int(batch_size))):
+            yield from self._annotate(list(batch))
+
+    def _annotate(self, docs: List[Any]) -> List[Any]:
+        texts = [(doc.text or "").strip() for doc in docs]
+        predicted: List[List[Dict[str, Any]]] = [[] for _ in docs]
+        targets = [i for i, text in enumerate(texts) if len(text) >= 5] if NER_LABELS else []
+
+        if targets:
+            model = get_gliner_model()
+            try:
+                with _gliner_predict_lock:
+                    started = time.perf_counter()
+                    batch_ents = _predict_entities_batch(model, [texts[i] for i in targets])
+                    observe_ner_batch(len(targets), time.perf_counter() - started)
+                for i, ents in zip(targets, batch_ents):
+                    predicted[i] = ents
+            except IndexError:
+                # GLiNER raises IndexError on some degenerate inputs; isolate
+                # the offending text instead of dropping the whole group.
+                for i in targets:
+                    try:
+                        with _gliner_predict_lock:
+                            predicted[i] = _predict_entities_batch(model, [texts[i]])[0]
+                    except IndexError:
+                        docs[i]._.gliner_failed = True
+
+        return [
+            _set_gliner_entities(doc, text, ents)
+            for doc, text, ents in zip(docs, texts, predicted)
+        ]
+
+
+@Language.factory("gliner_custom")
+def create_gliner_component(nlp: Language, name: str) -> GlinerComponent:
+    return GlinerComponent()
+
+
 def ensure_ner_pipe():
     """Ensure the GLiNER custom pipeline component is loaded."""
-    if "gliner_custom" not in nlp.pipe_names:
-        logger.info("[NER] Adding gliner_custom spaCy pipe (model=%s)", Config.GLINER_MODEL)
-        nlp.add_pipe("gliner_custom", last=True)
-        logger.info("[NER] Active pipes: %s", nlp.pipe_names)
+    if "gliner_custom" in nlp.pipe_names:
+        return
+    with _gliner_load_lock:
+        if "gliner_custom" not in nlp.pipe_names:
+            logger.info("[NER] Adding gliner_custom spaCy pipe (model=%s)", Config.GLINER_MODEL)
+            nlp.add_pipe("gliner_custom", last=True)
+            logger.info("[NER] Active pipes: %s", nlp.pipe_names)
+
+
+# GLiNER's default ("whitespace") words splitter; `max_len` is counted in these words.
+_GLINER_WORD_PATTERN = re.compile(r"\w+(?:[-_]\w+)*|\S")
+
+
+def _gliner_words_splitter(model: GLiNER) -> Optional[Any]:
+    processor = getattr(model, "data_processor", None)
+    return getattr(processor, "words_splitter", None)
+
+
+def count_ner_tokens(texts: List[str]) -> List[int]:
+    """Count GLiNER words for each text, the unit the model's `max_len` limits.
+    
+    Uses the model's own words splitter, or GLiNER's default word/punctuation
+    pattern when the model exposes none. Words of texts joined with spaces
+    add up, so counts can be summed while packing batches.
+    
+    Args:
+        texts: Texts to measure
+        
+    Returns:
+        Word count per text, in input order
+    """
+    if not texts:
+        return []
+    splitter = _gliner_words_splitter(get_gliner_model())
+    if splitter is None:
+        return [len(_GLINER_WORD_PATTERN.findall(text)) for text in texts]
+    return [sum(1 for _ in splitter(text)) for text in texts]
 
 
 def get_safe_token_limit(default_fallback: int = 300) -> int:
-    """Return a conservative token limit based on model configuration."""
+    """Return the word budget for one NER text.
+    
+    GLiNER truncates each text to `max_len` words from its words splitter;
+    the label prompt is added on top and does not count against it.
+    
+    Args:
+        default_fallback: Limit used when the model cannot be inspected
+        
+    Returns:
+        80% of the model's `max_len`, at least 1
+    """
     try:
         model = get_gliner_model()
-        max_tokens = int(getattr(model.config, "max_length", 384))
-        return max(1, int(max_tokens * 0.8))
+        max_words = int(getattr(model.config, "max_len", 384))
+        return max(1, int(max_words * 0.8))
     except Exception as exc:
         logger.warning("[NER] Could not determine model token limit: %s", exc)
         return default_fallback
 
 
+def _doc_entities(doc) -> Tuple[List[Any], NerEmptyReason]:
+    if doc._.gliner_failed:
+        return [], "gliner_bug_empty"
+    
+    # Primary method: doc.ents
+    ents = list(doc.ents) if doc.ents else []
+    if ents:
+        return ents, "ok"
+    
+    # Fallback: doc.spans (in case pipeline uses spans)
+    spans_as_ents: List[Any] = []
+    for _, spans in doc.spans.items():
+        if not spans:
+            continue
+        for span in spans:
+            if getattr(span, "label_", None) and (span.text or "").strip():
+                spans_as_ents.append(span)
+    
+    if spans_as_ents:
+        return spans_as_ents, "ok"
+    
+    return [], "no_entities"
+
+
 def safe_ner_process(
     text: str, 
     min_length: int = Config.MIN_TEXT_LENGTH_FOR_NER
@@ -185,96 +407,72 @@ def safe_ner_process(
     if len(t) < min_length:
         return [], "too_short"
     
+    cached = _cache_lookup([t])[0]
+    if cached is not None:
+        return _cached_result(cached)
+    
     ensure_ner_pipe()
     
     try:
         doc = nlp(t)
-                
-        # Primary method: doc.ents
-        ents = list(doc.ents) if doc.ents else []
-        if ents:
-            return ents, "ok"
-        
-        # Fallback: doc.spans (in case pipeline uses spans)
-        spans_as_ents: List[Any] = []
-        for _, spans in doc.spans.items():
-            if not spans:
-                continue
-            for span in spans:
-                if getattr(span, "label_", None) and (span.text or "").strip():
-                    spans_as_ents.append(span)
-        
-        if spans_as_ents:
-            return spans_as_ents, "ok"
-        
-        return [], "no_entities"
-    
+        result = _doc_entities(doc)
     except IndexError:
         return [], "gliner_bug_empty"
-
-
-def build_word_char_spans(words: List[Dict[str, Any]]) -> List[Tuple[int, int, Dict[str, Any]]]:
-    """Build character-level spans for words in chunk text.
-    
-    Generates (char_start, char_end, word_obj) tuples for text created by
-    joining words with spaces.
-    
-    Args:
-        words: List of word dictionaries
-        
-    Returns:
-        List of (start_idx, end_idx, word_dict) tuples
-    """
-    spans: List[Tuple[int, int, Dict[str, Any]]] = []
-    pos = 0
-    first = True
-    
-    for word in words:
-        token = (word.get("text") or "") if isinstance(word, dict) else ""
-        if not token:
-            continue
-        
-        if not first:
-            pos += 1  # Space between words
-        first = False
-        
-        start = pos
-        pos += len(token)
-        end = pos
-        spans.append((start, end, word))
     
-    return spans
+    _cache_store([t], [result])
+    return result
 
 
-def map_entity_to_time(
-    ent_start: int,
-    ent_end: int,
-    word_spans: List[Tuple[int, int, Dict[str, Any]]],
-) -> Tuple[Optional[float], Optional[float]]:
-    """Map entity character positions to time range based on word spans.
+def safe_ner_process_many(
+    texts: List[str],
+    min_length: int = Config.MIN_TEXT_LENGTH_FOR_NER,
+    batch_size: Optional[int] = None,
+) -> List[Tuple[List[Any], NerEmptyReason]]:
+    """Process several texts for NER, grouping them into batched GLiNER calls.
     
     Args:
-        ent_start: Entity start character position
-        ent_end: Entity end character position
-        word_spans: List of (char_start, char_end, word) tuples
+        texts: Texts to process
+        min_length: Minimum text length required for processing
+        batch_size: Texts per GLiNER forward pass (defaults to NER_PREDICT_BATCH_SIZE)
         
     Returns:
-        Tuple of (start_time, end_time) or (None, None) if not found
+        One (entities list, reason) tuple per input text, in input order
     """
-    touched: List[Dict[str, Any]] = []
-    for word_start, word_end, word in word_spans:
-        if word_end <= ent_start:
-            continue
-        if word_start >= ent_end:
-            break
-        touched.append(word)
+    results: List[Tuple[List[Any], NerEmptyReason]] = [([], "too_short") for _ in texts]
+    runnable = [
+        (i, t) for i, t in enumerate((text or "").strip() for text in texts)
+        if len(t) >= min_length
+    ]
+    misses: List[Tuple[int, str]] = []
+    for (i, t), cached in zip(runnable, _cache_lookup([t for _, t in runnable])):
+        if cached is None:
+            misses.append((i, t))
+        else:
+            results[i] = _cached_result(cached)
+    if len(misses) < len(runnable):
+        logger.info("[NER] %s of %s texts served from the NER cache", len(runnable) - len(misses), len(runnable))
+    runnable = misses
+    if not runnable:
+        return results
     
-    if not touched:
-        return None, None
+    ensure_ner_pipe()
+    size = max(1, int(batch_size or Config.NER_PREDICT_BATCH_SIZE))
+    # Group texts of similar length so each padded forward pass wastes little.
+    runnable.sort(key=lambda item: len(item[1]))
     
     try:
-        start_time = float(touched[0]["start"])
-        end_time = float(touched[-1]["end"])
-        return start_time, end_time
-    except Exception:
-        return None, None
+        docs = list(nlp.pipe((t for _, t in runnable), batch_size=size))
+    except Exception as exc:
+        logger.warning("[NER] Batched NER failed (%s); retrying texts one by one", exc)
+        for i, t in runnable:
+            try:
+                results[i] = safe_ner_process(t, min_length=min_length)
+            except Exception as item_exc:
+                logger.warning("[NER] NER failed for text %s: %s", i, item_exc)
+                results[i] = ([], "error")
+        return results
+    
+    for (i, _), doc in zip(runnable, docs):
+        results[i] = _doc_entities(doc)
+    _cache_store([t for _, t in runnable], [results[i] for i, _ in runnable])
+    return results
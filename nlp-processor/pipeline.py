@@ -2,12 +2,43 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
-
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import spacy
 from spacy.language import Language
-from spacy.tokens import Doc, Span, Token
+from spacy.tokens import Doc, DocBin, Span, Token
 
+from config import Config
+from disk_cache import BlobCache
+from metrics import DOC_CACHE_HITS, DOC_CACHE_MISSES
 from spacy_models import get_en_sentence_nlp
+from transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsed Doc layout changes so cached Docs are rebuilt.
+PARSED_DOC_VERSION = 3
+# Token attributes kept in the DocBin; timings travel in user_data.
+DOC_ATTRS = ["ORTH", "SPACY", "SENT_START"]
+_STRUCTURE_KEY = "theirstory_structure"
+_TIMINGS_KEY = "theirstory_timings"
+
+
+def _token_start_time(token: Token) -> Optional[float]:
+    starts = token.doc._.word_starts
+    return None if starts is None else float(starts[token.i])
+
+
+def _token_end_time(token: Token) -> Optional[float]:
+    ends = token.doc._.word_ends
+    return None if ends is None else float(ends[token.i])
 
 
 def _ensure_extensions() -> None:
@@ -29,125 +60,266 @@ def _ensure_extensions() -> None:
     if not Span.has_extension("end_time"):
         Span.set_extension("end_time", default=None)
 
+    # Word timings live once per Doc as arrays; tokens read them by index.
+    if not Doc.has_extension("word_starts"):
+        Doc.set_extension("word_starts", default=None)
+    if not Doc.has_extension("word_ends"):
+        Doc.set_extension("word_ends", default=None)
     if not Token.has_extension("start_time"):
-        Token.set_extension("start_time", default=None)
+        Token.set_extension("start_time", getter=_token_start_time)
     if not Token.has_extension("end_time"):
-        Token.set_extension("end_time", default=None)
+        Token.set_extension("end_time", getter=_token_end_time)
 
 
 _ensure_extensions()
 
 
-@Language.component("from_json")
-def from_json(doc: Doc, json_data: Dict[str, Any], **kwargs: Any) -> Doc:
-    """Build a single document from section/paragraph/word transcript JSON."""
+def _mark_sentences(doc: Doc, paragraphs: List[Span], annotation_nlp: Language) -> None:
+    """Record sentence boundaries on the transcript tokens (`Token.is_sent_start`).
+
+    Each paragraph's words are joined with single spaces and all paragraphs go
+    through `annotation_nlp` in one `nlp.pipe` pass, so the pipeline tokenizes
+    the text itself (splitting off attached punctuation). Sentence start
+    characters are then mapped back onto the transcript tokens: a sentence
+    starts at the first token beginning at or after its first character.
+    Every paragraph starts a sentence.
+    """
+    for token in doc[1:]:
+        token.is_sent_start = False
+
+    annotated = annotation_nlp.pipe(
+        (" ".join(token.text for token in paragraph) for paragraph in paragraphs),
+        batch_size=max(1, Config.SENTENCE_PIPE_BATCH_SIZE),
+        n_process=max(1, Config.SENTENCE_PIPE_N_PROCESS),
+    )
+    for paragraph, para_doc in zip(paragraphs, annotated):
+        if paragraph.start > 0:
+            doc[paragraph.start].is_sent_start = True
+
+        sent_chars = [sent.start_char for sent in para_doc.sents if sent.start_char > 0]
+        if not sent_chars:
+            continue
+        lengths = np.fromiter((len(token.text) for token in paragraph), dtype=np.int64, count=len(paragraph))
+        token_chars = np.cumsum(lengths + 1) - (lengths + 1)
+        for i in np.searchsorted(token_chars, sent_chars, side="left").tolist():
+            if 0 < i < len(paragraph):
+                doc[paragraph.start + i].is_sent_start = True
+
+
+def paragraph_sentences(paragraph: Span) -> List[Tuple[int, int]]:
+    """Return the sentences of a parsed paragraph as (start, end) token offsets within it."""
+    starts = [i for i, token in enumerate(paragraph) if i == 0 or token.is_sent_start]
+    return list(zip(starts, starts[1:] + [len(paragraph)]))
+
+
+@Language.component("from_transcript")
+def from_transcript(doc: Doc, transcript: Transcript, **kwargs: Any) -> Doc:
+    """Build a single document from a columnar `Transcript`.
+
+    Tokens are the transcript words in order; their timings stay in the
+    transcript's arrays (`Doc._.word_starts`/`_.word_ends`) and are read
+    through `Token._.start_time`/`_.end_time`.
+    """
     annotation_nlp = kwargs.get("nlp")
     if annotation_nlp is None:
         annotation_nlp = get_en_sentence_nlp()
 
-    all_words: List[str] = []
-    all_word_data: List[Dict[str, Any]] = []
-
-    for section_idx, section in enumerate(json_data["sections"]):
-        for para_idx, paragraph in enumerate(section["paragraphs"]):
-            for word_idx, word in enumerate(paragraph["words"]):
-                all_words.append(word["text"])
-                all_word_data.append(
-                    {
-                        **word,
-                        "section_idx": section_idx,
-                        "para_idx": para_idx,
-                        "word_idx": word_idx,
-                    }
-                )
-
-    doc = Doc(doc.vocab, words=all_words)
-
-    for index, token in enumerate(doc):
-        word_data = all_word_data[index]
-        token._.start_time = word_data["start"]
-        token._.end_time = word_data["end"]
+    words = transcript.words
+    doc = Doc(doc.vocab, words=words.texts())
+    doc._.word_starts = words.starts
+    doc._.word_ends = words.ends
 
     section_spans: List[Span] = []
-    current_section_idx = -1
-    current_para_idx = -1
-    section_start_token = 0
-    para_start_token = 0
-    current_section_paragraphs: List[Span] = []
-
-    def finalize_paragraph(end_token_idx: int) -> None:
-        nonlocal para_start_token, current_section_paragraphs
-        if current_para_idx < 0 or end_token_idx <= para_start_token:
-            return
-
-        paragraph_span = doc[para_start_token:end_token_idx]
-        paragraph_data = json_data["sections"][current_section_idx]["paragraphs"][current_para_idx]
-        paragraph_span._.speaker = paragraph_data.get("speaker")
-        paragraph_span._.start_time = paragraph_data.get("start")
-        paragraph_span._.end_time = paragraph_data.get("end")
-        current_section_paragraphs.append(paragraph_span)
-
-    def finalize_section(end_token_idx: int) -> None:
-        nonlocal current_section_paragraphs, section_start_token
-        if current_section_idx < 0 or end_token_idx <= section_start_token:
-            return
-
-        section_span = doc[section_start_token:end_token_idx]
-        section_data = json_data["sections"][current_section_idx]
+    for section_data in transcript.sections:
+        paragraphs: List[Span] = []
+        for paragraph_data in section_data["paragraphs"]:
+            positions = paragraph_data["words"]
+            if not positions:
+                continue
+            paragraph_span = doc[positions.start:positions.stop]
+            paragraph_span._.speaker = paragraph_data.get("speaker")
+            paragraph_span._.start_time = paragraph_data.get("start")
+            paragraph_span._.end_time = paragraph_data.get("end")
+            paragraphs.append(paragraph_span)
+
+        if not paragraphs:
+            continue
+        section_span = doc[paragraphs[0].start:paragraphs[-1].end]
         section_span._.timestamp = section_data.get("timestamp")
         section_span._.title = section_data.get("title")
         section_span._.synopsis = section_data.get("synopsis")
-        section_span._.paragraphs = list(current_section_paragraphs)
+        section_span._.paragraphs = paragraphs
         section_spans.append(section_span)
-        current_section_paragraphs = []
-
-    for index, word_data in enumerate(all_word_data):
-        if word_data["section_idx"] != current_section_idx:
-            if current_section_idx >= 0:
-                finalize_paragraph(index)
-                finalize_section(index)
-
-            section_start_token = index
-            current_section_idx = word_data["section_idx"]
-            current_para_idx = -1
-
-        if word_data["para_idx"] != current_para_idx:
-            if current_para_idx >= 0:
-                finalize_paragraph(index)
-
-            para_start_token = index
-            current_para_idx = word_data["para_idx"]
-
-    if current_section_idx >= 0:
-        finalize_paragraph(len(doc))
-        finalize_section(len(doc))
 
     doc._.sections = section_spans
 
-    for _, component in annotation_nlp.pipeline:
-        doc = component(doc)
+    # Sentences are found once here; chunking reads them from the tokens.
+    _mark_sentences(
+        doc,
+        [paragraph for section in section_spans for paragraph in section._.paragraphs],
+        annotation_nlp,
+    )
+    return doc
 
-    final_entities: List[Span] = []
-    for ent in doc.ents:
-        entity_span = Span(doc, ent.start, ent.end, label=ent.label_.replace(" ", "_"))
-        entity_span._.start_time = doc[ent.start]._.start_time
-        entity_span._.end_time = doc[ent.end - 1]._.end_time
-        final_entities.append(entity_span)
 
-    doc.ents = final_entities
+def _doc_to_bytes(doc: Doc) -> bytes:
+    """Serialize a parsed transcript Doc, its token timings and section/paragraph spans."""
+    structure = [
+        {
+            "start": section.start,
+            "end": section.end,
+            "timestamp": section._.timestamp,
+            "title": section._.title,
+            "synopsis": section._.synopsis,
+            "paragraphs": [
+                {
+                    "start": paragraph.start,
+                    "end": paragraph.end,
+                    "speaker": paragraph._.speaker,
+                    "start_time": paragraph._.start_time,
+                    "end_time": paragraph._.end_time,
+                }
+                for paragraph in section._.paragraphs
+            ],
+        }
+        for section in doc._.sections
+    ]
+    # Span lists and timing arrays are not serializable as extension values;
+    # they are rebuilt from `structure` and raw float64 bytes on load.
+    user_data: Dict[str, Any] = {
+        _STRUCTURE_KEY: structure,
+        _TIMINGS_KEY: {
+            "starts": doc._.word_starts.tobytes(),
+            "ends": doc._.word_ends.tobytes(),
+        },
+    }
+
+    original = doc.user_data
+    doc.user_data = user_data
+    try:
+        doc_bin = DocBin(attrs=DOC_ATTRS, store_user_data=True)
+        doc_bin.add(doc)
+    finally:
+        doc.user_data = original
+    return doc_bin.to_bytes()
+
+
+def _doc_from_bytes(data: bytes, vocab) -> Doc:
+    """Rebuild a parsed transcript Doc serialized by `_doc_to_bytes`."""
+    doc = next(iter(DocBin(store_user_data=True).from_bytes(data).get_docs(vocab)))
+    structure = doc.user_data.pop(_STRUCTURE_KEY)
+    timings = doc.user_data.pop(_TIMINGS_KEY)
+    doc._.word_starts = np.frombuffer(timings["starts"], dtype=np.float64)
+    doc._.word_ends = np.frombuffer(timings["ends"], dtype=np.float64)
+
+    sections: List[Span] = []
+    for section_data in structure:
+        paragraphs: List[Span] = []
+        for paragraph_data in section_data["paragraphs"]:
+            paragraph = doc[paragraph_data["start"]:paragraph_data["end"]]
+            paragraph._.speaker = paragraph_data["speaker"]
+            paragraph._.start_time = paragraph_data["start_time"]
+            paragraph._.end_time = paragraph_data["end_time"]
+            paragraphs.append(paragraph)
+
+        section = doc[section_data["start"]:section_data["end"]]
+        section._.timestamp = section_data["timestamp"]
+        section._.title = section_data["title"]
+        section._.synopsis = section_data["synopsis"]
+        section._.paragraphs = paragraphs
+        sections.append(section)
+
+    doc._.sections = sections
     return doc
 
 
 class TheirStoryTranscriptParser:
-    """Parse transcript JSON into a structured spaCy document."""
+    """Parse a transcript into a structured spaCy document."""
 
     def __init__(self) -> None:
-        # Keep parser and annotation pipelines separate so custom components
-        # do not accidentally run inside the auxiliary pipeline.
-        self.parser_nlp = get_en_sentence_nlp()
+        # The annotation pipeline is the shared, cached sentence pipeline
+        # (SPACY_SENTENCE_PROFILE); the parser is a blank pipeline over the
+        # same vocab that only holds the custom component, so the shared
+        # pipeline is never modified.
         self.annotation_nlp = get_en_sentence_nlp()
-        self.parser_nlp.add_pipe("from_json")
+        self.parser_nlp = spacy.blank("en", vocab=self.annotation_nlp.vocab)
+        self.parser_nlp.add_pipe("from_transcript")
+
+        self._doc_cache: Optional[BlobCache] = None
+        self._doc_cache_lock = threading.Lock()
+
+    def get_doc_cache(self) -> Optional[BlobCache]:
+        """Return the on-disk parsed Doc cache, or None if disabled or unavailable."""
+        if not Config.DOC_CACHE_ENABLED:
+            return None
+        if self._doc_cache is not None:
+            return self._doc_cache
+
+        with self._doc_cache_lock:
+            if self._doc_cache is None:
+                try:
+                    self._doc_cache = BlobCache(
+                        Path(Config.DOC_CACHE_DIR).expanduser() / "docs.sqlite",
+                        Config.DOC_CACHE_MAX_MB * 1024 * 1024,
+                        name="docs",
+                    )
+                except Exception as exc:
+                    # The cache is an optimization; never fail parsing over it.
+                    logger.warning("[Pipeline] Parsed doc cache unavailable: %s", exc)
+                    return None
+        return self._doc_cache
+
+    def cache_key(self, transcript: Transcript) -> str:
+        """Hash of the transcript and everything that shapes the parsed Doc."""
+        material = {
+            "version": PARSED_DOC_VERSION,
+            "spacy": spacy.__version__,
+            "profile": Config.SPACY_SENTENCE_PROFILE,
+            "pipeline": [self.annotation_nlp.meta.get("name"), self.annotation_nlp.meta.get("version")],
+        }
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(encoded.encode("utf-8"))
+        transcript.update_hash(digest)
+        return digest.hexdigest()
+
+    def parse_transcript(self, transcript: Transcript) -> Doc:
+        """Parse a columnar transcript, reusing a cached Doc for an identical transcript.
+
+        Args:
+            transcript: `Transcript` from `convert_api_format_to_transcript`
+
+        Returns:
+            Doc with `_.sections`, paragraph spans, token timings and sentence boundaries
+        """
+        cache = self.get_doc_cache()
+        key = self.cache_key(transcript) if cache is not None else None
+        if cache is not None:
+            started = time.perf_counter()
+            try:
+                data = cache.get(key)
+                if data is not None:
+                    doc = _doc_from_bytes(data, self.parser_nlp.vocab)
+                    DOC_CACHE_HITS.inc()
+                    logger.info(
+                        "[Pipeline] Loaded parsed doc (%s tokens) from cache in %.3fs",
+                        len(doc),
+                        time.perf_counter() - started,
+                    )
+                    return doc
+            except Exception as exc:
+                logger.warning("[Pipeline] Could not load cached doc: %s", exc)
+            DOC_CACHE_MISSES.inc()
 
-    def parse_json(self, json_data: Dict[str, Any]) -> Doc:
         empty_doc = Doc(self.parser_nlp.vocab, words=[])
-        return self.parser_nlp.get_pipe("from_json")(empty_doc, json_data, nlp=self.annotation_nlp)
+        doc = self.parser_nlp.get_pipe("from_transcript")(empty_doc, transcript, nlp=self.annotation_nlp)
+
+        if cache is not None:
+            try:
+                cache.put(key, _doc_to_bytes(doc))
+            except Exception as exc:
+                logger.warning("[Pipeline] Could not cache parsed doc: %s", exc)
+        return doc
+
+    def doc_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return parsed Doc cache statistics, or None if the cache is not open yet."""
+        return self._doc_cache.stats() if self._doc_cache is not None else None
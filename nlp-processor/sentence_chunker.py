@@ -4,57 +4,63 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Sequence, Tuple
 
-from spacy.tokens import Span, Token
+import numpy as np
 
 from config import Config
-from spacy_models import get_en_sentence_nlp
+from pipeline import paragraph_sentences
 from utils import normalize_text
+from word_timestamps import encode_word_timing
 
 
 Entity = Dict[str, Any]
 
 
-def _build_token_char_spans(tokens: Sequence[Token]) -> List[Tuple[int, int, Token]]:
-    spans: List[Tuple[int, int, Token]] = []
-    pos = 0
+class EntityIntervalIndex:
+    """Story entities indexed by time for chunk overlap queries.
 
-    for idx, token in enumerate(tokens):
-        if idx > 0:
-            pos += 1
-        start = pos
-        pos += len(token.text)
-        end = pos
-        spans.append((start, end, token))
+    Built once per story. Start times are sorted and `max_ends[i]` is the
+    latest end among the first `i + 1` entities, so `np.searchsorted` bounds
+    the candidates for a window on both sides and only those are compared.
+    Entities without times are dropped, as they never overlap a chunk.
+    """
 
-    return spans
-
-
-def _tokens_for_char_range(
-    token_spans: Sequence[Tuple[int, int, Token]],
-    start_char: int,
-    end_char: int,
-) -> List[Token]:
-    selected: List[Token] = []
-
-    for token_start, token_end, token in token_spans:
-        if token_end <= start_char:
-            continue
-        if token_start >= end_char:
-            break
-        selected.append(token)
+    def __init__(self, entities: Sequence[Entity]) -> None:
+        self.entities: List[Entity] = []
+        for entity in entities:
+            ent_start = entity.get("start_time")
+            ent_end = entity.get("end_time")
+            if ent_start is None or ent_end is None:
+                continue
+            self.entities.append(
+                {
+                    "text": entity["text"],
+                    "label": entity["label"],
+                    "start_time": float(ent_start),
+                    "end_time": float(ent_end),
+                }
+            )
 
-    return selected
+        starts = np.array([e["start_time"] for e in self.entities], dtype=np.float64)
+        ends = np.array([e["end_time"] for e in self.entities], dtype=np.float64)
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
 
+    def __len__(self) -> int:
+        return len(self.entities)
 
-def _entity_overlaps_chunk(entity: Entity, start_time: float, end_time: float) -> bool:
-    ent_start = entity.get("start_time")
-    ent_end = entity.get("end_time")
-    if ent_start is None or ent_end is None:
-        return False
-    return float(ent_start) < end_time and float(ent_end) > start_time
+    def overlapping(self, start_time: float, end_time: float) -> List[Entity]:
+        """Return entities with start < `end_time` and end > `start_time`, in input order."""
+        hi = int(np.searchsorted(self.starts, end_time, side="left"))
+        lo = int(np.searchsorted(self.max_ends, start_time, side="right"))
+        if lo >= hi:
+            return []
+        picked = np.sort(self.order[lo:hi][self.ends[lo:hi] > start_time])
+        return [dict(self.entities[i]) for i in picked]
 
 
-def _chunk_sentences(sentences: Sequence[Span], chunk_size: int, overlap_size: int) -> List[Tuple[int, int]]:
+def _chunk_sentences(sentences: Sequence[Any], chunk_size: int, overlap_size: int) -> List[Tuple[int, int]]:
     if not sentences:
         return []
 
@@ -92,8 +98,17 @@ def chunk_doc_sections(
     sentence_chunk_size: int,
     overlap_sentences: int,
 ) -> List[Dict[str, Any]]:
-    """Chunk parsed sections and paragraphs by sentence windows with overlap."""
-    sentence_nlp = get_en_sentence_nlp()
+    """Chunk parsed sections and paragraphs by sentence windows with overlap.
+
+    Sentence boundaries are the ones `TheirStoryTranscriptParser` recorded on
+    the transcript tokens, so paragraphs are not re-tokenized or re-parsed.
+    Timings are sliced from the Doc's word arrays and encoded for storage
+    per `CHUNK_WORD_TIMESTAMPS` (`word_timing`); token positions are the
+    testimony word positions used by the `range` encoding.
+    """
+    entity_index = EntityIntervalIndex(entities)
+    word_starts = doc._.word_starts
+    word_ends = doc._.word_ends
     chunks: List[Dict[str, Any]] = []
     global_chunk_id = 0
 
@@ -103,19 +118,11 @@ def chunk_doc_sections(
 
         for para_idx, paragraph in enumerate(section._.paragraphs):
             print(f"     └─ Processing paragraph {para_idx + 1}...")
-            para_text = normalize_text(paragraph.text)
-            if not para_text:
+            if not normalize_text(paragraph.text):
                 print("        ↳ Skipped empty paragraph")
                 continue
 
-            para_doc = sentence_nlp(para_text)
-            sentences = list(para_doc.sents)
-            if not sentences:
-                print("        ↳ No sentence boundaries detected, skipping paragraph")
-                continue
-
-            paragraph_tokens = list(paragraph)
-            token_spans = _build_token_char_spans(paragraph_tokens)
+            sentences = paragraph_sentences(paragraph)
             sentence_windows = _chunk_sentences(
                 sentences,
                 sentence_chunk_size,
@@ -128,9 +135,7 @@ def chunk_doc_sections(
             )
 
             for window_start, window_end in sentence_windows:
-                chunk_start_char = sentences[window_start].start_char
-                chunk_end_char = sentences[window_end - 1].end_char
-                chunk_tokens = _tokens_for_char_range(token_spans, chunk_start_char, chunk_end_char)
+                chunk_tokens = paragraph[sentences[window_start][0]:sentences[window_end - 1][1]]
                 if not chunk_tokens:
                     continue
 
@@ -141,28 +146,20 @@ def chunk_doc_sections(
                 if len(chunk_tokens) < Config.MIN_WORDS_PER_CHUNK:
                     continue
 
-                start_time = float(chunk_tokens[0]._.start_time)
-                end_time = float(chunk_tokens[-1]._.end_time)
-
-                word_timestamps = [
-                    {
-                        "text": token.text,
-                        "start": float(token._.start_time),
-                        "end": float(token._.end_time),
-                    }
-                    for token in chunk_tokens
-                ]
+                starts = word_starts[chunk_tokens.start:chunk_tokens.end].tolist()
+                ends = word_ends[chunk_tokens.start:chunk_tokens.end].tolist()
+                start_time = starts[0]
+                end_time = ends[-1]
+
+                word_timing = encode_word_timing(
+                    Config.CHUNK_WORD_TIMESTAMPS,
+                    [token.text for token in chunk_tokens],
+                    starts,
+                    ends,
+                    chunk_tokens.start,
+                )
 
-                chunk_entities = [
-                    {
-                        "text": entity["text"],
-                        "label": entity["label"],
-                        "start_time": float(entity["start_time"]),
-                        "end_time": float(entity["end_time"]),
-                    }
-                    for entity in entities
-                    if _entity_overlaps_chunk(entity, start_time, end_time)
-                ]
+                chunk_entities = entity_index.overlapping(start_time, end_time)
 
                 chunks.append(
                     {
@@ -174,7 +171,7 @@ def chunk_doc_sections(
                         "start_time": start_time,
                         "end_time": end_time,
                         "text": chunk_text,
-                        "word_timestamps": word_timestamps,
+                        "word_timing": word_timing,
                         "entities": chunk_entities,
                     }
                 )
@@ -1,22 +1,44 @@
-"""Helpers for loading spaCy models lazily at runtime."""
+"""Helpers for loading spaCy models lazily at runtime.
+
+Pipelines are loaded once per process and shared through a small registry
+keyed by profile:
+
+- `full`: `en_core_web_sm` without NER (tagger, parser, lemmatizer, ...)
+- `senter`: `en_core_web_sm` reduced to its statistical sentence recognizer
+- `sentencizer`: blank English with the rule-based punctuation sentencizer
+"""
 
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from functools import lru_cache
+from typing import Dict, Tuple
 
 import spacy
 from spacy.cli import download as spacy_download
+from spacy.language import Language
+
+from config import Config
 
 
 logger = logging.getLogger(__name__)
 
 EN_CORE_WEB_SM = "en_core_web_sm"
+PROFILES: Tuple[str, ...] = ("full", "senter", "sentencizer")
+# Components the sentence-only `senter` profile never needs.
+SENTER_EXCLUDE = ["tagger", "parser", "lemmatizer", "attribute_ruler", "ner"]
+
+_pipelines: Dict[str, Language] = {}
+_pipelines_lock = threading.Lock()
 
 
 @lru_cache(maxsize=1)
 def ensure_en_sentence_model():
     """Ensure `en_core_web_sm` is installed before loading pipelines."""
+    if spacy.util.is_package(EN_CORE_WEB_SM):
+        return True
     try:
         logger.info("[spaCy] Checking model '%s'", EN_CORE_WEB_SM)
         spacy.load(EN_CORE_WEB_SM, disable=["ner"])
@@ -27,8 +49,71 @@ def ensure_en_sentence_model():
     return True
 
 
-def get_en_sentence_nlp():
-    """Load a fresh `en_core_web_sm` pipeline after ensuring installation."""
+def _load_senter() -> Language:
+    nlp = spacy.load(EN_CORE_WEB_SM, exclude=SENTER_EXCLUDE)
+    if "senter" not in nlp.component_names:
+        raise RuntimeError(f"'{EN_CORE_WEB_SM}' has no senter component")
+    if "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    # The shared tok2vec only feeds the excluded components unless senter listens to it.
+    if "tok2vec" in nlp.pipe_names:
+        listeners = getattr(nlp.get_pipe("tok2vec"), "listening_components", [])
+        if "senter" not in listeners:
+            nlp.disable_pipe("tok2vec")
+    return nlp
+
+
+def load_pipeline(profile: str) -> Language:
+    """Load a new, unshared pipeline for `profile`.
+
+    Args:
+        profile: One of `PROFILES`
+
+    Returns:
+        The loaded spaCy pipeline
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown spaCy profile '{profile}'; expected one of {', '.join(PROFILES)}")
+
+    if profile == "sentencizer":
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
     ensure_en_sentence_model()
-    logger.info("[spaCy] Loading fresh pipeline '%s'", EN_CORE_WEB_SM)
+    if profile == "senter":
+        return _load_senter()
     return spacy.load(EN_CORE_WEB_SM, disable=["ner"])
+
+
+def get_pipeline(profile: str = "full") -> Language:
+    """Return the process-wide pipeline for `profile`, loading it on first use.
+
+    Pipelines are shared between threads and must not be modified by callers;
+    use `load_pipeline` for a private copy.
+    """
+    nlp = _pipelines.get(profile)
+    if nlp is not None:
+        return nlp
+
+    with _pipelines_lock:
+        nlp = _pipelines.get(profile)
+        if nlp is None:
+            started = time.perf_counter()
+            nlp = load_pipeline(profile)
+            _pipelines[profile] = nlp
+            logger.info(
+                "[spaCy] Loaded '%s' pipeline %s in %.2fs",
+                profile,
+                nlp.pipe_names,
+                time.perf_counter() - started,
+            )
+    return nlp
+
+
+def get_en_sentence_nlp() -> Language:
+    """Return the shared sentence segmentation pipeline (`SPACY_SENTENCE_PROFILE`)."""
+    return get_pipeline(Config.SPACY_SENTENCE_PROFILE)
@@ -0,0 +1,1035 @@
+"""Story processing pipeline shared by the synchronous endpoint and the job queue."""
+
+import logging
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from concurrency import run_in_processing_executor
+from config import Config
+from data_transformers import convert_api_format_to_transcript
+from embedding_service import LocalEmbedding
+from fingerprint import compute_chunk_content_hash, compute_chunk_uuid, compute_story_fingerprint
+from metrics import STAGE_SECONDS
+from ner_processor import count_ner_tokens, get_safe_token_limit, safe_ner_process_many
+from pipeline import TheirStoryTranscriptParser
+from sentence_chunker import chunk_doc_sections
+from transcript import Transcript, TranscriptWords
+from transcription_format import encode_transcription
+from utils import OffsetIndex, convert_to_uuid, safe_get, to_weaviate_date
+from weaviate_client import (
+    weaviate_batch_insert,
+    weaviate_delete_objects,
+    weaviate_get_object,
+    weaviate_list_chunk_hashes,
+    weaviate_patch_object,
+    weaviate_patch_objects,
+    weaviate_upsert_object,
+)
+
+logger = logging.getLogger("nlp-processor.story")
+
+
+class MissingStoryIdError(ValueError):
+    """Raised when a payload carries no story id to key the testimony on."""
+
+
+class StageTracker:
+    """Track the current processing stage and how long each stage took."""
+
+    def __init__(self, on_change: Optional[Callable[["StageTracker"], None]] = None) -> None:
+        self.current_stage: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._on_change = on_change
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage; repeated stages accumulate."""
+        self.current_stage = name
+        if self._on_change:
+            self._on_change(self)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 4)
+            STAGE_SECONDS.labels(stage=name).observe(elapsed)
+
+    def finish(self, name: str) -> None:
+        """Mark the pipeline as ended in a terminal stage (e.g. `done`)."""
+        self.current_stage = name
+        if self._on_change:
+            self._on_change(self)
+
+
+@lru_cache(maxsize=1)
+def get_transcript_parser() -> TheirStoryTranscriptParser:
+    """Lazily initialize the transcript parser."""
+    logger.info("[Pipeline] Loading TheirStory transcript parser")
+    return TheirStoryTranscriptParser()
+
+
+def _parse_transcript(transcript: Transcript):
+    return get_transcript_parser().parse_transcript(transcript)
+
+
+def _resolve_collection_metadata(
+    payload: Dict[str, Any],
+    req_collection: Optional[Dict[str, str]],
+) -> Dict[str, str]:
+    collection = req_collection or {}
+    collection_id = (
+        (collection.get("id") or "").strip()
+        or str(safe_get(payload, ["story", "collection_id"], "")).strip()
+        or "Collection"
+    )
+    collection_name = (
+        (collection.get("name") or "").strip()
+        or str(safe_get(payload, ["story", "collection_name"], "")).strip()
+        or collection_id.replace("-", " ").replace("_", " ").title()
+    )
+    collection_description = (
+        (collection.get("description") or "").strip()
+        or str(safe_get(payload, ["story", "collection_description"], "")).strip()
+        or ""
+    )
+    return {
+        "id": collection_id,
+        "name": collection_name,
+        "description": collection_description,
+        "uuid_prefix": collection_id.strip().lower() or "default",
+    }
+
+
+def _resolve_folder_metadata(
+    payload: Dict[str, Any],
+    req_folder: Optional[Dict[str, str]],
+) -> Dict[str, str]:
+    folder = req_folder or {}
+    folder_id = (
+        (folder.get("id") or "").strip()
+        or str(safe_get(payload, ["story", "folder_id"], "")).strip()
+    )
+    folder_name = (
+        (folder.get("name") or "").strip()
+        or str(safe_get(payload, ["story", "folder_name"], "")).strip()
+    )
+    folder_path = (
+        (folder.get("path") or "").strip()
+        or str(safe_get(payload, ["story", "folder_path"], "")).strip()
+    )
+    return {
+        "id": folder_id,
+        "name": folder_name,
+        "path": folder_path,
+    }
+
+
+def _extract_story_metadata(payload: Dict[str, Any]) -> Dict[str, Any]:
+    story_id = safe_get(payload, ["story", "_id"], None) or safe_get(payload, ["transcript", "storyId"], None)
+    custom_archive_media_type = safe_get(payload, ["story", "custom_archive_media_type"], None)
+    return {
+        "story_id": story_id,
+        "record_date": safe_get(payload, ["story", "record_date"], None),
+        "title": safe_get(payload, ["story", "title"], None),
+        "description": safe_get(payload, ["story", "description"], None),
+        "duration": float(safe_get(payload, ["story", "duration"], 0) or 0),
+        "transcoded": safe_get(payload, ["story", "transcoded"], "") or "",
+        "thumbnail_url": safe_get(payload, ["story", "thumbnail_url"], "") or "",
+        "video_url": safe_get(payload, ["videoURL"], "") or "",
+        "asset_id": safe_get(payload, ["story", "asset_id"], "") or "",
+        "organization_id": safe_get(payload, ["story", "organization_id"], "") or "",
+        "project_id": safe_get(payload, ["story", "project_id"], "") or "",
+        "publisher": safe_get(payload, ["story", "author", "full_name"], "") or "",
+        "is_audio_file": bool(
+            custom_archive_media_type and str(custom_archive_media_type).startswith("audio")
+        ),
+    }
+
+
+def _build_testimony_data(
+    testimony_uuid: str,
+    story_meta: Dict[str, Any],
+    collection_meta: Dict[str, str],
+    folder_meta: Dict[str, str],
+) -> Dict[str, Any]:
+    return {
+        "id": str(story_meta["story_id"]),
+        "weaviate_uuid": testimony_uuid,
+        "theirstory_id": testimony_uuid,
+        "title": story_meta["title"] or "",
+        "interview_description": story_meta["description"] or "",
+        "interview_duration": story_meta["duration"],
+        "transcoded": story_meta["transcoded"],
+        "thumbnail_url": story_meta["thumbnail_url"],
+        "video_url": story_meta["video_url"],
+        "date": story_meta["record_date"] or "",
+        # Filled in by encode_transcription()
+        "sections": [],
+        "asset_id": story_meta["asset_id"],
+        "organization_id": story_meta["organization_id"],
+        "project_id": story_meta["project_id"],
+        "isAudioFile": story_meta["is_audio_file"],
+        "collection_id": collection_meta["id"],
+        "collection_name": collection_meta["name"],
+        "collection_description": collection_meta["description"],
+        "folder_id": folder_meta["id"],
+        "folder_name": folder_meta["name"],
+        "folder_path": folder_meta["path"],
+    }
+
+
+def _extract_speakers(sections: List[Dict[str, Any]]) -> List[str]:
+    seen = set()
+    speakers: List[str] = []
+    for section in sections:
+        for para in section.get("paragraphs", []):
+            speaker = para.get("speaker", "")
+            if speaker and speaker not in seen:
+                seen.add(speaker)
+                speakers.append(speaker)
+    return speakers
+
+
+def _build_testimony_object(
+    testimony_uuid: str,
+    transcript: Transcript,
+    story_meta: Dict[str, Any],
+    collection_meta: Dict[str, str],
+    folder_meta: Dict[str, str],
+    speakers: List[str],
+) -> Dict[str, Any]:
+    transcription = encode_transcription(
+        _build_testimony_data(testimony_uuid, story_meta, collection_meta, folder_meta),
+        transcript,
+        Config.TRANSCRIPTION_FORMAT,
+        Config.TRANSCRIPTION_COMPRESSION,
+    )
+    return {
+        "class": "Testimonies",
+        "id": testimony_uuid,
+        "properties": {
+            "interview_title": story_meta["title"] or "",
+            "recording_date": story_meta["record_date"] or "",
+            "interview_description": story_meta["description"] or "",
+            "transcription": transcription,
+            "transcoded": story_meta["transcoded"],
+            "interview_duration": story_meta["duration"],
+            "participants": speakers,
+            "video_url": story_meta["video_url"],
+            "publisher": story_meta["publisher"],
+            "ner_labels": [],
+            "ner_data": [],
+            "isAudioFile": story_meta["is_audio_file"],
+            "collection_id": collection_meta["id"],
+            "collection_name": collection_meta["name"],
+            "collection_description": collection_meta["description"],
+            "folder_id": folder_meta["id"],
+            "folder_name": folder_meta["name"],
+            "folder_path": folder_meta["path"],
+        },
+    }
+
+
+def _empty_ner_stats() -> Dict[str, int]:
+    return {
+        "batches_processed": 0,
+        "paragraphs_processed": 0,
+        "skipped_too_short": 0,
+        "skipped_gliner_bug": 0,
+        "entities_found": 0,
+        "errors": 0,
+    }
+
+
+def _split_long_paragraph(
+    para_info: Dict[str, Any],
+    words: TranscriptWords,
+    safe_token_limit: int,
+) -> List[Dict[str, Any]]:
+    """Split a paragraph over the token limit into consecutive word runs that fit."""
+    positions = para_info["words"]
+    word_tokens = count_ner_tokens(words.texts(positions))
+    pieces: List[Dict[str, Any]] = []
+    start = 0
+    tokens = 0
+    for i, count in enumerate(word_tokens):
+        if i > start and tokens + count > safe_token_limit:
+            piece = positions[start:i]
+            pieces.append({**para_info, "words": piece, "text": words.to_text(piece), "tokens": tokens})
+            start, tokens = i, 0
+        tokens += count
+    piece = positions[start:]
+    pieces.append({**para_info, "words": piece, "text": words.to_text(piece), "tokens": tokens})
+    return pieces
+
+
+def _collect_ner_paragraphs(transcript: Transcript, safe_token_limit: int) -> List[Dict[str, Any]]:
+    all_paragraphs: List[Dict[str, Any]] = []
+    for section_idx, para_idx, para in transcript.paragraphs():
+        positions = para["words"]
+        if positions:
+            all_paragraphs.append(
+                {
+                    "words": positions,
+                    "text": transcript.words.to_text(positions),
+                    "section_idx": section_idx,
+                    "para_idx": para_idx,
+                }
+            )
+
+    print(f"   📊 Total paragraphs to process: {len(all_paragraphs)}")
+
+    # Counted once for the whole story; lengths are reused while packing.
+    token_counts = count_ner_tokens([p["text"] for p in all_paragraphs])
+    split_paragraphs: List[Dict[str, Any]] = []
+    for para_info, tokens in zip(all_paragraphs, token_counts):
+        if tokens > safe_token_limit:
+            split_paragraphs.extend(_split_long_paragraph(para_info, transcript.words, safe_token_limit))
+        else:
+            split_paragraphs.append({**para_info, "tokens": tokens})
+
+    print(f"   📏 After splitting long paragraphs: {len(split_paragraphs)} total")
+    return split_paragraphs
+
+
+def _plan_ner_batches(transcript: Transcript, safe_token_limit: int) -> List[Dict[str, Any]]:
+    """Pack consecutive paragraphs into the fewest NER batches that fit the token limit.
+    
+    Paragraph lengths and `safe_token_limit` are both in GLiNER words (the
+    unit of the model's `max_len`), so a batch never exceeds what the model
+    sees untruncated. Packing is a single greedy pass
+    with a running token total. Batch `words` are word positions in
+    `transcript.words`.
+    """
+    all_paragraphs = _collect_ner_paragraphs(transcript, safe_token_limit)
+    batches: List[Dict[str, Any]] = []
+    current_batch: List[Dict[str, Any]] = []
+    current_batch_tokens = 0
+
+    def flush() -> None:
+        batches.append(
+            {
+                "text": " ".join(p["text"] for p in current_batch),
+                "words": [w for p in current_batch for w in p["words"]],
+                "size": len(current_batch),
+                "approx_tokens": current_batch_tokens,
+            }
+        )
+
+    for para_info in all_paragraphs:
+        if current_batch and current_batch_tokens + para_info["tokens"] > safe_token_limit:
+            flush()
+            current_batch = []
+            current_batch_tokens = 0
+
+        current_batch.append(para_info)
+        current_batch_tokens += para_info["tokens"]
+
+    if current_batch:
+        flush()
+
+    return batches
+
+
+def _apply_batch_entities(
+    batch: Dict[str, Any],
+    words: TranscriptWords,
+    ents: List[Any],
+    reason: str,
+    all_entities: List[Dict[str, Any]],
+    ner_stats: Dict[str, int],
+) -> None:
+    if reason == "error":
+        ner_stats["errors"] += 1
+        return
+
+    ner_stats["batches_processed"] += 1
+    ner_stats["paragraphs_processed"] += batch["size"]
+
+    if reason == "too_short":
+        ner_stats["skipped_too_short"] += 1
+        return
+    if reason == "gliner_bug_empty":
+        ner_stats["skipped_gliner_bug"] += 1
+        return
+
+    batch_spans = OffsetIndex(words.char_spans(batch["words"]))
+    for ent in ents:
+        label = (getattr(ent, "label_", None) or "").strip()
+        text = (getattr(ent, "text", None) or "").strip()
+        if not label or not text:
+            continue
+
+        touched = batch_spans.overlapping(ent.start_char, ent.end_char)
+        if not touched:
+            continue
+        start_time = words.starts[touched[0]]
+        end_time = words.ends[touched[-1]]
+
+        all_entities.append(
+            {
+                "text": text,
+                "label": label,
+                "start_time": float(start_time),
+                "end_time": float(end_time),
+                "char_start": ent.start_char,
+                "char_end": ent.end_char,
+            }
+        )
+        ner_stats["entities_found"] += 1
+
+
+def _run_dynamic_ner(transcript: Transcript, run_ner: bool) -> tuple[List[Dict[str, Any]], Dict[str, int]]:
+    print("\n🏷️  Running NER with dynamic batching...")
+    all_entities: List[Dict[str, Any]] = []
+    ner_stats = _empty_ner_stats()
+
+    if not run_ner:
+        print(f"   ⏭️  NER skipped (run_ner={run_ner})")
+        return all_entities, ner_stats
+
+    safe_token_limit = get_safe_token_limit(default_fallback=300)
+    print(f"   📏 NER safe token limit: {safe_token_limit}")
+
+    batches = _plan_ner_batches(transcript, safe_token_limit)
+    group_size = max(1, Config.NER_PREDICT_BATCH_SIZE)
+    print(
+        f"   🔄 Processing {len(batches)} batches in GLiNER groups of {group_size} "
+        f"(~{sum(batch['approx_tokens'] for batch in batches)} tokens)..."
+    )
+    predictions = safe_ner_process_many([batch["text"] for batch in batches], batch_size=group_size)
+
+    for batch_num, (batch, (ents, reason)) in enumerate(zip(batches, predictions), start=1):
+        try:
+            _apply_batch_entities(batch, transcript.words, ents, reason, all_entities, ner_stats)
+        except Exception as exc:
+            print(f"      ⚠️  NER error in batch {batch_num}: {exc}")
+            ner_stats["errors"] += 1
+
+    print(f"   ✅ Total entities found: {len(all_entities)} across {len(batches)} batches")
+    return all_entities, ner_stats
+
+
+def _run_pooled_ner(
+    transcripts: List[Transcript],
+    run_ner: bool,
+) -> List[tuple[List[Dict[str, Any]], Dict[str, int]]]:
+    """Run NER for several stories, sharing GLiNER forward passes across them."""
+    print(f"\n🏷️  Running pooled NER for {len(transcripts)} stories...")
+    results = [([], _empty_ner_stats()) for _ in transcripts]
+
+    if not run_ner:
+        print(f"   ⏭️  NER skipped (run_ner={run_ner})")
+        return results
+
+    safe_token_limit = get_safe_token_limit(default_fallback=300)
+    print(f"   📏 NER safe token limit: {safe_token_limit}")
+
+    pooled = [
+        (story_idx, batch)
+        for story_idx, transcript in enumerate(transcripts)
+        for batch in _plan_ner_batches(transcript, safe_token_limit)
+    ]
+    print(f"   🔄 Processing {len(pooled)} batches from {len(transcripts)} stories together...")
+    predictions = safe_ner_process_many([batch["text"] for _, batch in pooled])
+
+    for batch_num, ((story_idx, batch), (ents, reason)) in enumerate(zip(pooled, predictions), start=1):
+        all_entities, ner_stats = results[story_idx]
+        try:
+            _apply_batch_entities(batch, transcripts[story_idx].words, ents, reason, all_entities, ner_stats)
+        except Exception as exc:
+            print(f"      ⚠️  NER error in batch {batch_num}: {exc}")
+            ner_stats["errors"] += 1
+
+    total = sum(len(entities) for entities, _ in results)
+    print(f"   ✅ Total entities found: {total} across {len(pooled)} batches")
+    return results
+
+
+def _build_chunk_objects(
+    chunk_data_items: List[Dict[str, Any]],
+    chunk_vectors: Any,
+    testimony_uuid: str,
+    story_meta: Dict[str, Any],
+    collection_meta: Dict[str, str],
+    folder_meta: Dict[str, str],
+) -> List[Dict[str, Any]]:
+    chunks_objects: List[Dict[str, Any]] = []
+    for chunk_data, chunk_vector in zip(chunk_data_items, chunk_vectors):
+        chunk_entities = chunk_data["entities"]
+        # Sorted so the content hash does not depend on set iteration order.
+        chunk_labels = sorted(set(ent["label"] for ent in chunk_entities))
+
+        chunk_obj = {
+            "class": "Chunks",
+            "id": chunk_data["uuid"],
+            "properties": {
+                "theirstory_id": testimony_uuid,
+                "chunk_id": int(chunk_data["chunk_id"]),
+                "start_time": chunk_data["start_time"],
+                "end_time": chunk_data["end_time"],
+                "transcription": chunk_data["text"],
+                "interview_title": story_meta["title"] or "",
+                "recording_date": story_meta["record_date"] or "",
+                "interview_duration": story_meta["duration"],
+                **chunk_data["word_timing"],
+                "ner_data": chunk_entities,
+                "ner_labels": chunk_labels,
+                "ner_text": [ent["text"] for ent in chunk_entities],
+                "belongsToTestimony": [{"beacon": f"weaviate://localhost/Testimonies/{testimony_uuid}"}],
+                "section_title": chunk_data["section_title"],
+                "speaker": chunk_data["speaker"],
+                "asset_id": story_meta["asset_id"],
+                "organization_id": story_meta["organization_id"],
+                "project_id": story_meta["project_id"],
+                "section_id": int(chunk_data["section_id"]),
+                "para_id": int(chunk_data["para_id"]),
+                "transcoded": story_meta["transcoded"],
+                "thumbnail_url": story_meta["thumbnail_url"],
+                "date": to_weaviate_date(story_meta["record_date"]),
+                "video_url": story_meta["video_url"],
+                "isAudioFile": story_meta["is_audio_file"],
+                "collection_id": collection_meta["id"],
+                "collection_name": collection_meta["name"],
+                "collection_description": collection_meta["description"],
+                "folder_id": folder_meta["id"],
+                "folder_name": folder_meta["name"],
+                "folder_path": folder_meta["path"],
+            },
+        }
+        chunk_obj["properties"]["content_hash"] = compute_chunk_content_hash(chunk_obj["properties"])
+        # Chunks already stored with the same id keep their vector and are not re-embedded.
+        if chunk_vector is not None:
+            chunk_obj["vectors"] = {
+                "transcription_vector": chunk_vector.tolist() if hasattr(chunk_vector, "tolist") else list(chunk_vector)
+            }
+        chunks_objects.append(chunk_obj)
+    return chunks_objects
+
+
+def _assign_chunk_uuids(testimony_uuid: str, chunk_data_items: List[Dict[str, Any]]) -> None:
+    """Give each chunk a deterministic UUID from its position and text."""
+    seen: Dict[tuple, int] = {}
+    for chunk in chunk_data_items:
+        key = (int(chunk["section_id"]), int(chunk["para_id"]), chunk["text"])
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        chunk["uuid"] = compute_chunk_uuid(testimony_uuid, key[0], key[1], key[2], occurrence)
+
+
+async def _load_existing_chunks(story: Dict[str, Any], tracker: StageTracker) -> Dict[str, str]:
+    """Fetch `{chunk uuid: content_hash}` for the chunks currently stored for a story."""
+    with tracker.stage("weaviate_diff"):
+        existing = await weaviate_list_chunk_hashes(story["testimony_uuid"])
+    print(f"   🔎 {len(existing)} chunks already stored for this testimony")
+    return existing
+
+
+def _chunks_to_embed(chunk_data_items: List[Dict[str, Any]], existing: Dict[str, str]) -> List[int]:
+    """Indices of chunks that are not stored yet and therefore need a vector."""
+    return [i for i, chunk in enumerate(chunk_data_items) if chunk["uuid"] not in existing]
+
+
+def _spread_vectors(size: int, indices: List[int], vectors: Any) -> List[Any]:
+    """Place encoded vectors at `indices` in a list of `size`, leaving None elsewhere."""
+    placed: List[Any] = [None] * size
+    for i, vector in zip(indices, vectors):
+        placed[i] = vector
+    return placed
+
+
+def _resolve_story(
+    payload: Dict[str, Any],
+    collection: Optional[Dict[str, str]],
+    folder: Optional[Dict[str, str]],
+) -> Dict[str, Any]:
+    """Resolve story, collection and folder metadata and the testimony UUID."""
+    collection_meta = _resolve_collection_metadata(payload, collection)
+    folder_meta = _resolve_folder_metadata(payload, folder)
+    story_meta = _extract_story_metadata(payload)
+    story_id = story_meta["story_id"]
+
+    print(f"📌 Story ID: {story_id}")
+
+    if not story_id:
+        raise MissingStoryIdError(
+            "Missing story id. Expected payload.story._id or payload.transcript.storyId"
+        )
+
+    print(f"📝 Title: {story_meta['title'] or 'No title'}")
+    print(f"📅 Date: {story_meta['record_date'] or 'No date'}")
+    print(f"🗂️ Collection: {collection_meta['id']} ({collection_meta['name']})")
+    if folder_meta["path"]:
+        print(f"📁 Folder: {folder_meta['path']}")
+
+    return {
+        "payload": payload,
+        "story_id": story_id,
+        "story_meta": story_meta,
+        "collection_meta": collection_meta,
+        "folder_meta": folder_meta,
+        "testimony_uuid": convert_to_uuid(f"{collection_meta['uuid_prefix']}:{story_id}"),
+    }
+
+
+async def _is_unchanged(story: Dict[str, Any], tracker: StageTracker) -> bool:
+    """Return True when Weaviate already holds this story with the same fingerprint."""
+    with tracker.stage("fingerprint_check"):
+        try:
+            existing = await weaviate_get_object("Testimonies", story["testimony_uuid"])
+        except Exception as exc:
+            logger.warning("Fingerprint lookup failed for %s, reprocessing: %s", story["story_id"], exc)
+            return False
+    stored = ((existing or {}).get("properties") or {}).get("content_fingerprint")
+    return bool(stored) and stored == story["fingerprint"]
+
+
+def _skipped_result(story: Dict[str, Any], tracker: StageTracker) -> Dict[str, Any]:
+    print(f"   ⏭️  Unchanged since last import (fingerprint {story['fingerprint'][:12]}), skipping")
+    tracker.finish("skipped")
+    return {
+        "skipped": True,
+        "status": "skipped: unchanged",
+        "story_id": str(story["story_id"]),
+        "testimony_uuid": story["testimony_uuid"],
+        "fingerprint": story["fingerprint"],
+        "counts": {},
+        "ner_stats": _empty_ner_stats(),
+        "timings": dict(tracker.timings),
+    }
+
+
+async def _prepare_story(story: Dict[str, Any], tracker: StageTracker) -> Dict[str, Any]:
+    """Transform and parse a resolved story and build its testimony object."""
+    payload = story["payload"]
+    story_meta = story["story_meta"]
+    collection_meta = story["collection_meta"]
+    folder_meta = story["folder_meta"]
+    testimony_uuid = story["testimony_uuid"]
+
+    # Convert API format to the columnar transcript
+    with tracker.stage("transform"):
+        transcript = await run_in_processing_executor(convert_api_format_to_transcript, payload)
+    speakers = _extract_speakers(transcript.sections)
+
+    # Parse transcript JSON into the structured spaCy document used by chunking.
+    print("\n🧱 BUILDING TRANSCRIPT DOCUMENT...")
+    with tracker.stage("parse"):
+        doc = await run_in_processing_executor(_parse_transcript, transcript)
+    print(
+        f"   ✅ Transcript doc ready with {len(doc._.sections)} sections "
+        f"and {len(doc)} tokens"
+    )
+
+    # Create Weaviate testimony object
+    with tracker.stage("build_testimony"):
+        testimony_obj = await run_in_processing_executor(
+            _build_testimony_object,
+            testimony_uuid,
+            transcript,
+            story_meta,
+            collection_meta,
+            folder_meta,
+            speakers,
+        )
+
+    story.update({"transcript": transcript, "doc": doc, "testimony_obj": testimony_obj})
+    return story
+
+
+async def _chunk_story(
+    story: Dict[str, Any],
+    all_entities: List[Dict[str, Any]],
+    sentence_chunk_size: int,
+    overlap_sentences: int,
+    tracker: StageTracker,
+) -> List[Dict[str, Any]]:
+    print(
+        f"\n🔪 STARTING SENTENCE CHUNKING "
+        f"(sentence_chunk_size={sentence_chunk_size}, overlap_sentences={overlap_sentences})..."
+    )
+    with tracker.stage("chunk"):
+        chunk_data_items = await run_in_processing_executor(
+            chunk_doc_sections,
+            story["doc"],
+            all_entities,
+            sentence_chunk_size,
+            overlap_sentences,
+        )
+
+    print(f"\n📦 Sentence chunker produced {len(chunk_data_items)} chunks before embedding")
+    _assign_chunk_uuids(story["testimony_uuid"], chunk_data_items)
+    return chunk_data_items
+
+
+async def _embed_texts(texts: List[str], tracker: StageTracker) -> Any:
+    print(f"\n🧮 Generating {len(texts)} embeddings in batch...")
+    t_embed = time.time()
+    try:
+        with tracker.stage("embed"):
+            vectors = await run_in_processing_executor(LocalEmbedding.encode_cached, texts)
+    except Exception as exc:
+        logger.exception("Embedding generation failed")
+        raise RuntimeError(
+            "Failed to load/generate embeddings. "
+            "Check EMBEDDING_MODEL and HuggingFace connectivity/cache. "
+            f"Current EMBEDDING_MODEL='{Config.EMBEDDING_MODEL}'."
+        ) from exc
+    print(f"   ✅ Embeddings generated in {time.time() - t_embed:.2f}s")
+    return vectors
+
+
+async def _build_story_chunks(
+    story: Dict[str, Any],
+    chunk_data_items: List[Dict[str, Any]],
+    chunk_vectors: Any,
+    tracker: StageTracker,
+) -> List[Dict[str, Any]]:
+    if not chunk_data_items:
+        return []
+    with tracker.stage("build_chunks"):
+        return await run_in_processing_executor(
+            _build_chunk_objects,
+            chunk_data_items,
+            chunk_vectors,
+            story["testimony_uuid"],
+            story["story_meta"],
+            story["collection_meta"],
+            story["folder_meta"],
+        )
+
+
+def _build_story_result(
+    story: Dict[str, Any],
+    chunks_objects: List[Dict[str, Any]],
+    all_entities: List[Dict[str, Any]],
+    ner_stats: Dict[str, int],
+) -> Dict[str, Any]:
+    testimony_obj = story["testimony_obj"]
+
+    # Consolidate NER data from all entities into testimony
+    testimony_obj["properties"]["ner_data"] = all_entities
+    testimony_obj["properties"]["ner_labels"] = list(set(ent["label"] for ent in all_entities))
+
+    print(f"\n✅ CHUNKING COMPLETED: {len(chunks_objects)} total chunks")
+    print(f"\n📊 NER Statistics:")
+    print(f"   - Batches processed: {ner_stats['batches_processed']}")
+    print(f"   - Paragraphs processed: {ner_stats['paragraphs_processed']}")
+    print(f"   - Total entities found: {ner_stats['entities_found']}")
+    if all_entities:
+        print(f"   - Unique entity types: {len(set(ent['label'] for ent in all_entities))}")
+    if ner_stats['skipped_too_short'] > 0:
+        print(f"   - Skipped (text too short): {ner_stats['skipped_too_short']}")
+    if ner_stats['skipped_gliner_bug'] > 0:
+        print(f"   - Skipped (GLiNER bug): {ner_stats['skipped_gliner_bug']}")
+    if ner_stats['errors'] > 0:
+        print(f"   - Errors: {ner_stats['errors']}")
+
+    return {
+        "testimony": testimony_obj,
+        "chunks": chunks_objects,
+        "counts": {
+            "chunks": len(chunks_objects),
+            "sections": len(story["doc"]._.sections),
+            "entities": len(all_entities),
+        },
+        "ner_stats": ner_stats,
+        "fingerprint": story["fingerprint"],
+    }
+
+
+async def _write_story(
+    story: Dict[str, Any],
+    chunks_objects: List[Dict[str, Any]],
+    existing: Dict[str, str],
+    tracker: StageTracker,
+) -> Dict[str, int]:
+    """Write a story, touching only chunks that are new, changed or gone.
+
+    Returns:
+        Counts of inserted, updated, unchanged and deleted chunks
+    """
+    testimony_uuid = story["testimony_uuid"]
+    print(f"\n💾 WRITING TO WEAVIATE...")
+    with tracker.stage("weaviate_write"):
+        await weaviate_upsert_object("Testimonies", testimony_uuid, story["testimony_obj"]["properties"])
+
+        new_chunks = [obj for obj in chunks_objects if obj["id"] not in existing]
+        changed_chunks = [
+            obj for obj in chunks_objects
+            if obj["id"] in existing and existing[obj["id"]] != obj["properties"]["content_hash"]
+        ]
+        current_ids = {obj["id"] for obj in chunks_objects}
+        stale_ids = [object_id for object_id in existing if object_id not in current_ids]
+        print(
+            f"   🧩 Chunks: {len(new_chunks)} new, {len(changed_chunks)} changed, "
+            f"{len(chunks_objects) - len(new_chunks) - len(changed_chunks)} unchanged, "
+            f"{len(stale_ids)} stale"
+        )
+
+        # Insert and update before deleting so the story stays searchable throughout.
+        if new_chunks:
+            await weaviate_batch_insert(new_chunks)
+        elif not chunks_objects:
+            print(f"   ⚠️  No chunks to insert")
+
+        await weaviate_patch_objects(
+            "Chunks",
+            [(obj["id"], obj["properties"]) for obj in changed_chunks],
+        )
+
+        if stale_ids:
+            print(f"   🗑️  Deleting {len(stale_ids)} stale chunks...")
+            await weaviate_delete_objects("Chunks", stale_ids)
+
+        # The upsert above replaced the testimony without a fingerprint; record it
+        # only once every chunk is stored so a failed write is retried next run.
+        await weaviate_patch_object(
+            "Testimonies",
+            testimony_uuid,
+            {"content_fingerprint": story["fingerprint"]},
+        )
+
+    return {
+        "chunks_inserted": len(new_chunks),
+        "chunks_updated": len(changed_chunks),
+        "chunks_unchanged": len(chunks_objects) - len(new_chunks) - len(changed_chunks),
+        "chunks_deleted": len(stale_ids),
+    }
+
+
+async def process_story_payload(
+    payload: Dict[str, Any],
+    collection: Optional[Dict[str, str]] = None,
+    folder: Optional[Dict[str, str]] = None,
+    *,
+    write_to_weaviate: bool = True,
+    sentence_chunk_size: int = Config.DEFAULT_SENTENCE_CHUNK_SIZE,
+    overlap_sentences: int = Config.DEFAULT_SENTENCE_OVERLAP,
+    run_ner: bool = True,
+    force: bool = False,
+    tracker: Optional[StageTracker] = None,
+) -> Dict[str, Any]:
+    """Process a story payload with chunking and NER, optionally writing to Weaviate.
+
+    CPU-bound stages run on the processing executor; only the Weaviate writes
+    are awaited on the event loop. When writing, a story whose fingerprint
+    matches the one stored on its testimony is skipped unless `force` is set.
+
+    Args:
+        payload: Raw story payload (story, transcript, videoURL)
+        collection: Optional collection metadata overriding the payload
+        folder: Optional folder metadata overriding the payload
+        write_to_weaviate: Whether to write results to Weaviate
+        sentence_chunk_size: Number of sentences per chunk
+        overlap_sentences: Number of sentences to overlap between chunks
+        run_ner: Whether to run NER processing
+        force: Reprocess even if the stored fingerprint matches
+        tracker: Optional stage tracker receiving stage changes and timings
+
+    Returns:
+        Dict with the testimony object, chunk objects, counts, NER stats and
+        timings, or a `skipped` result for unchanged stories
+
+    Raises:
+        MissingStoryIdError: If the payload has no story id
+    """
+    tracker = tracker or StageTracker()
+    t0 = time.time()
+
+    story = _resolve_story(payload, collection, folder)
+    story["fingerprint"] = await run_in_processing_executor(
+        compute_story_fingerprint,
+        payload,
+        story["story_meta"],
+        story["collection_meta"],
+        story["folder_meta"],
+        sentence_chunk_size,
+        overlap_sentences,
+        run_ner,
+    )
+    if write_to_weaviate and not force and await _is_unchanged(story, tracker):
+        return _skipped_result(story, tracker)
+
+    await _prepare_story(story, tracker)
+
+    with tracker.stage("ner"):
+        all_entities, ner_stats = await run_in_processing_executor(_run_dynamic_ner, story["transcript"], run_ner)
+
+    chunk_data_items = await _chunk_story(story, all_entities, sentence_chunk_size, overlap_sentences, tracker)
+    existing = await _load_existing_chunks(story, tracker) if write_to_weaviate else {}
+
+    # Collect all chunks that are not stored yet, then batch generate embeddings
+    embed_indices = _chunks_to_embed(chunk_data_items, existing)
+    texts_to_embed = [chunk_data_items[i]["text"] for i in embed_indices]
+    vectors = await _embed_texts(texts_to_embed, tracker) if texts_to_embed else []
+    chunk_vectors = _spread_vectors(len(chunk_data_items), embed_indices, vectors)
+    chunks_objects = await _build_story_chunks(story, chunk_data_items, chunk_vectors, tracker)
+
+    result = _build_story_result(story, chunks_objects, all_entities, ner_stats)
+    result["counts"]["chunks_embedded"] = len(texts_to_embed)
+
+    # Write to Weaviate if requested
+    if write_to_weaviate:
+        result["counts"].update(await _write_story(story, chunks_objects, existing, tracker))
+
+    tracker.finish("done")
+    result["timings"] = dict(tracker.timings)
+
+    elapsed = time.time() - t0
+    print(f"\n🎉 PROCESSING COMPLETED IN {elapsed:.2f}s")
+
+    return result
+
+
+async def process_story_payloads(
+    requests: List[Dict[str, Any]],
+    *,
+    write_to_weaviate: bool = True,
+    sentence_chunk_size: int = Config.DEFAULT_SENTENCE_CHUNK_SIZE,
+    overlap_sentences: int = Config.DEFAULT_SENTENCE_OVERLAP,
+    run_ner: bool = True,
+    force: bool = False,
+    tracker: Optional[StageTracker] = None,
+) -> Dict[str, Any]:
+    """Process several stories together, sharing model batches across them.
+
+    Every story's NER batches go through shared GLiNER calls and every story's
+    chunk texts through one embedding pass, so collections of short interviews
+    fill model batches instead of running many tiny ones. A story that fails
+    in any per-story stage (parsing, chunking, building chunk objects or
+    writing) is reported as failed without failing the others, and its chunks
+    are left out of the aggregate counts. Unchanged stories are skipped as in
+    `process_story_payload`.
+
+    Args:
+        requests: Items with `payload` and optional `collection` / `folder`
+        write_to_weaviate: Whether to write results to Weaviate
+        sentence_chunk_size: Number of sentences per chunk
+        overlap_sentences: Number of sentences to overlap between chunks
+        run_ner: Whether to run NER processing
+        force: Reprocess stories even if their stored fingerprint matches
+        tracker: Optional stage tracker receiving stage changes and timings
+
+    Returns:
+        Dict with a per-story summary list, aggregate counts and timings
+    """
+    tracker = tracker or StageTracker()
+    t0 = time.time()
+    summaries: List[Dict[str, Any]] = []
+    stories: List[Dict[str, Any]] = []
+
+    for index, item in enumerate(requests):
+        print(f"\n📥 STORY {index + 1}/{len(requests)}")
+        summary: Dict[str, Any] = {"index": index, "status": "ok"}
+        summaries.append(summary)
+        try:
+            story = _resolve_story(item["payload"], item.get("collection"), item.get("folder"))
+            summary.update({"story_id": str(story["story_id"]), "testimony_uuid": story["testimony_uuid"]})
+            story["fingerprint"] = await run_in_processing_executor(
+                compute_story_fingerprint,
+                item["payload"],
+                story["story_meta"],
+                story["collection_meta"],
+                story["folder_meta"],
+                sentence_chunk_size,
+                overlap_sentences,
+                run_ner,
+            )
+            if write_to_weaviate and not force and await _is_unchanged(story, tracker):
+                print(f"   ⏭️  Unchanged since last import, skipping")
+                summary["status"] = "skipped: unchanged"
+                continue
+            await _prepare_story(story, tracker)
+        except Exception as exc:
+            logger.exception("Story %s failed during preparation", index)
+            summary.update({"status": "failed", "error": str(exc)})
+            continue
+        story["summary"] = summary
+        stories.append(story)
+
+    with tracker.stage("ner"):
+        ner_results = await run_in_processing_executor(
+            _run_pooled_ner,
+            [story["transcript"] for story in stories],
+            run_ner,
+        )
+
+    story_chunks: List[List[Dict[str, Any]]] = []
+    story_existing: List[Dict[str, str]] = []
+    for story, (all_entities, _) in zip(stories, ner_results):
+        chunk_data_items: List[Dict[str, Any]] = []
+        existing: Dict[str, str] = {}
+        try:
+            chunk_data_items = await _chunk_story(
+                story, all_entities, sentence_chunk_size, overlap_sentences, tracker
+            )
+            if write_to_weaviate:
+                existing = await _load_existing_chunks(story, tracker)
+        except Exception as exc:
+            logger.exception("Story %s failed while chunking or listing stored chunks", story["story_id"])
+            story["summary"].update({"status": "failed", "error": str(exc)})
+            chunk_data_items, existing = [], {}
+        story_chunks.append(chunk_data_items)
+        story_existing.append(existing)
+
+    embed_indices = [_chunks_to_embed(items, existing) for items, existing in zip(story_chunks, story_existing)]
+    all_chunk_texts = [
+        chunk_data_items[i]["text"]
+        for chunk_data_items, indices in zip(story_chunks, embed_indices)
+        for i in indices
+    ]
+    all_vectors = await _embed_texts(all_chunk_texts, tracker) if all_chunk_texts else []
+
+    offset = 0
+    for story, chunk_data_items, existing, indices, (all_entities, ner_stats) in zip(
+        stories, story_chunks, story_existing, embed_indices, ner_results
+    ):
+        vectors = all_vectors[offset:offset + len(indices)]
+        offset += len(indices)
+        if story["summary"]["status"] == "failed":
+            continue
+
+        try:
+            chunk_vectors = _spread_vectors(len(chunk_data_items), indices, vectors)
+            chunks_objects = await _build_story_chunks(story, chunk_data_items, chunk_vectors, tracker)
+            result = _build_story_result(story, chunks_objects, all_entities, ner_stats)
+        except Exception as exc:
+            logger.exception("Story %s failed while building chunk objects", story["story_id"])
+            story["summary"].update({"status": "failed", "error": str(exc)})
+            continue
+        result["counts"]["chunks_embedded"] = len(indices)
+        story["summary"].update({"counts": result["counts"], "ner_stats": result["ner_stats"]})
+
+        if write_to_weaviate:
+            try:
+                result["counts"].update(await _write_story(story, chunks_objects, existing, tracker))
+            except Exception as exc:
+                logger.exception("Story %s failed while writing to Weaviate", story["story_id"])
+                story["summary"].update({"status": "failed", "error": str(exc)})
+
+    tracker.finish("done")
+    failed = sum(1 for summary in summaries if summary["status"] == "failed")
+    skipped = sum(1 for summary in summaries if summary["status"] == "skipped: unchanged")
+    elapsed = time.time() - t0
+    print(f"\n🎉 PROCESSED {len(requests) - failed}/{len(requests)} STORIES IN {elapsed:.2f}s ({skipped} unchanged)")
+
+    return {
+        "stories": summaries,
+        "counts": {
+            "stories": len(requests),
+            "succeeded": len(requests) - failed,
+            "failed": failed,
+            "skipped": skipped,
+            "chunks": sum(
+                len(chunk_data_items)
+                for story, chunk_data_items in zip(stories, story_chunks)
+                if story["summary"]["status"] != "failed"
+            ),
+            "chunks_embedded": len(all_chunk_texts),
+        },
+        "timings": dict(tracker.timings),
+    }
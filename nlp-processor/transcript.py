@@ -0,0 +1,220 @@
+"""Columnar transcript model shared by transform, parsing, NER and chunking.
+
+Words are stored as a struct of arrays instead of one dict per word: texts
+as offsets into a single string buffer, start/end times and
+section/paragraph/word indexes as NumPy arrays. Sections and paragraphs keep
+their metadata as small dicts, and a paragraph's `"words"` is a `range` of
+word positions into those arrays. Word dicts are only built at the
+API/Weaviate boundary (`Transcript.to_sections`).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils import normalize_text
+
+
+class TranscriptWords:
+    """Parallel arrays for every word of a transcript, in transcript order.
+
+    Positions index all arrays. `sources` keeps a reference (not a copy) to
+    each word's original payload dict so boundary output can carry any
+    extra fields the API sent.
+    """
+
+    __slots__ = ("buffer", "offsets", "starts", "ends", "section_idx", "para_idx", "word_idx", "sources")
+
+    def __init__(
+        self,
+        buffer: str,
+        offsets: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        section_idx: np.ndarray,
+        para_idx: np.ndarray,
+        word_idx: np.ndarray,
+        sources: List[Dict[str, Any]],
+    ) -> None:
+        self.buffer = buffer
+        self.offsets = offsets
+        self.starts = starts
+        self.ends = ends
+        self.section_idx = section_idx
+        self.para_idx = para_idx
+        self.word_idx = word_idx
+        self.sources = sources
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def texts(self, positions: Optional[Iterable[int]] = None) -> List[str]:
+        """Return word texts at `positions` (all words by default)."""
+        if positions is None:
+            bounds = self.offsets.tolist()
+            return [self.buffer[a:b] for a, b in zip(bounds, bounds[1:])]
+        idx = np.asarray(positions, dtype=np.int64)
+        return [
+            self.buffer[a:b]
+            for a, b in zip(self.offsets[idx].tolist(), self.offsets[idx + 1].tolist())
+        ]
+
+    def to_text(self, positions: Iterable[int]) -> str:
+        """Join words at `positions` into normalized text, like `words_to_text`."""
+        return normalize_text(" ".join(text for text in self.texts(positions) if text))
+
+    def char_spans(self, positions: Iterable[int]) -> List[Tuple[int, int, int]]:
+        """Build (char_start, char_end, position) spans for words joined with spaces.
+
+        Empty words are skipped, and each span points back at its word
+        position.
+
+        Args:
+            positions: Word positions in text order
+
+        Returns:
+            List of (start_idx, end_idx, position) tuples
+        """
+        idx = np.asarray(positions, dtype=np.int64)
+        lengths = self.offsets[idx + 1] - self.offsets[idx]
+        keep = lengths > 0
+        idx, lengths = idx[keep], lengths[keep]
+        ends = np.cumsum(lengths + 1) - 1
+        starts = ends - lengths
+        return list(zip(starts.tolist(), ends.tolist(), idx.tolist()))
+
+    def to_dicts(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Materialize word dicts (payload fields plus indexes) at `positions`."""
+        positions = list(positions)
+        return [
+            {**self.sources[position], "section_idx": section_idx, "para_idx": para_idx, "word_idx": word_idx}
+            for position, section_idx, para_idx, word_idx in zip(
+                positions,
+                self.section_idx[positions].tolist(),
+                self.para_idx[positions].tolist(),
+                self.word_idx[positions].tolist(),
+            )
+        ]
+
+
+class TranscriptWordsBuilder:
+    """Append paragraphs of payload word dicts and freeze them into `TranscriptWords`."""
+
+    def __init__(self) -> None:
+        self._texts: List[str] = []
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self._section_idx: List[int] = []
+        self._para_idx: List[int] = []
+        self._word_idx: List[int] = []
+        self._sources: List[Dict[str, Any]] = []
+
+    def add_paragraph(self, words: Sequence[Dict[str, Any]], section_idx: int, para_idx: int) -> range:
+        """Append a paragraph's words and return their positions.
+
+        Args:
+            words: Payload word dicts, referenced rather than copied
+            section_idx: Section index of the paragraph
+            para_idx: Paragraph index within the section
+
+        Returns:
+            Range of the appended word positions
+        """
+        first = len(self._sources)
+        for word_idx, word in enumerate(words):
+            self._texts.append(str(word.get("text") or ""))
+            self._starts.append(float(word.get("start", 0) or 0))
+            self._ends.append(float(word.get("end", 0) or 0))
+            self._word_idx.append(word_idx)
+            self._sources.append(word)
+        self._section_idx.extend([section_idx] * len(words))
+        self._para_idx.extend([para_idx] * len(words))
+        return range(first, len(self._sources))
+
+    def build(self) -> TranscriptWords:
+        offsets = np.zeros(len(self._texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in self._texts], out=offsets[1:])
+        # Times stay float64: float32 cannot hold millisecond timestamps past
+        # ~4.6 hours, and stored times must match the payload exactly.
+        return TranscriptWords(
+            buffer="".join(self._texts),
+            offsets=offsets,
+            starts=np.array(self._starts, dtype=np.float64),
+            ends=np.array(self._ends, dtype=np.float64),
+            section_idx=np.array(self._section_idx, dtype=np.int32),
+            para_idx=np.array(self._para_idx, dtype=np.int32),
+            word_idx=np.array(self._word_idx, dtype=np.int32),
+            sources=self._sources,
+        )
+
+
+class Transcript:
+    """Section/paragraph metadata over a columnar word store.
+
+    `sections` are section dicts (timestamp, title, speaker, start, end, ...)
+    whose `"paragraphs"` are paragraph dicts (speaker, start, end, ner) with
+    `"words"` set to a `range` of positions into `words`. Paragraph ranges
+    are contiguous and in transcript order.
+    """
+
+    __slots__ = ("sections", "words")
+
+    def __init__(self, sections: List[Dict[str, Any]], words: TranscriptWords) -> None:
+        self.sections = sections
+        self.words = words
+
+    @classmethod
+    def from_sections(cls, sections: List[Dict[str, Any]]) -> "Transcript":
+        """Build a transcript from nested section/paragraph/word dicts."""
+        builder = TranscriptWordsBuilder()
+        columnar = [
+            {
+                **section,
+                "paragraphs": [
+                    {**paragraph, "words": builder.add_paragraph(paragraph.get("words") or [], section_idx, para_idx)}
+                    for para_idx, paragraph in enumerate(section.get("paragraphs", []))
+                ],
+            }
+            for section_idx, section in enumerate(sections)
+        ]
+        return cls(columnar, builder.build())
+
+    def paragraphs(self) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """Yield (section_idx, para_idx, paragraph) for every paragraph."""
+        for section_idx, section in enumerate(self.sections):
+            for para_idx, paragraph in enumerate(section["paragraphs"]):
+                yield section_idx, para_idx, paragraph
+
+    def to_sections(self) -> List[Dict[str, Any]]:
+        """Materialize the nested section/paragraph/word dicts (API/Weaviate output)."""
+        return [
+            {
+                **section,
+                "paragraphs": [
+                    {**paragraph, "words": self.words.to_dicts(paragraph["words"])}
+                    for paragraph in section["paragraphs"]
+                ],
+            }
+            for section in self.sections
+        ]
+
+    def update_hash(self, digest: Any) -> None:
+        """Feed the words, times and section layout into a hashlib object."""
+        words = self.words
+        digest.update(words.buffer.encode("utf-8"))
+        for array in (words.offsets, words.starts, words.ends):
+            digest.update(array.tobytes())
+        layout = [
+            {
+                **section,
+                "paragraphs": [
+                    {**paragraph, "words": [paragraph["words"].start, paragraph["words"].stop]}
+                    for paragraph in section["paragraphs"]
+                ],
+            }
+            for section in self.sections
+        ]
+        digest.update(json.dumps(layout, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
@@ -0,0 +1,163 @@
+"""Encodings for the `Testimonies.transcription` blob.
+
+`TRANSCRIPTION_FORMAT` selects what the processor stores:
+
+- `legacy` (format 1, no `format_version` field): the nested
+  section/paragraph/word JSON, every word a `{text, start, end, section_idx,
+  para_idx, word_idx, ...}` object
+- `compact` (`format_version: 2`): the same testimony fields and section and
+  paragraph metadata, with
+  - speakers interned: `speakers` lists them once and sections and
+    paragraphs store an index
+  - paragraph `words` as a `[start, end)` range into the columnar `words`
+  - `words` as `{"text": [...], "start": [...], "duration": [...]}`, where
+    `start` holds the first start and then the difference to the previous
+    start, both in milliseconds
+
+With `TRANSCRIPTION_COMPRESSION=gzip`, the compact JSON is gzipped and stored
+base64-encoded as `{"format_version": 2, "compression": "gzip", "data": ...}`.
+Word indexes are implied by position, and word fields other than text and
+times are not kept. The frontend reads every format with
+`decodeTranscription()` (`app/utils/decodeTranscription.ts`).
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from transcript import Transcript
+
+TRANSCRIPTION_FORMATS: Tuple[str, ...] = ("legacy", "compact")
+TRANSCRIPTION_COMPRESSIONS: Tuple[str, ...] = ("none", "gzip")
+COMPACT_FORMAT_VERSION = 2
+
+
+def _intern(speakers: List[str], index: Dict[str, int], speaker: Any) -> int:
+    if speaker not in index:
+        index[speaker] = len(speakers)
+        speakers.append(speaker)
+    return index[speaker]
+
+
+def _compact(testimony_data: Dict[str, Any], transcript: Transcript) -> Dict[str, Any]:
+    speakers: List[Any] = []
+    speaker_index: Dict[Any, int] = {}
+    sections = [
+        {
+            **section,
+            "speaker": _intern(speakers, speaker_index, section.get("speaker")),
+            "paragraphs": [
+                {
+                    **paragraph,
+                    "speaker": _intern(speakers, speaker_index, paragraph.get("speaker")),
+                    "words": [paragraph["words"].start, paragraph["words"].stop],
+                }
+                for paragraph in section["paragraphs"]
+            ],
+        }
+        for section in transcript.sections
+    ]
+
+    words = transcript.words
+    start_ms = np.rint(words.starts * 1000).astype(np.int64)
+    end_ms = np.rint(words.ends * 1000).astype(np.int64)
+    return {
+        "format_version": COMPACT_FORMAT_VERSION,
+        **testimony_data,
+        "speakers": speakers,
+        "sections": sections,
+        "words": {
+            "text": words.texts(),
+            "start": np.diff(start_ms, prepend=0).tolist(),
+            "duration": (end_ms - start_ms).tolist(),
+        },
+    }
+
+
+def encode_transcription(
+    testimony_data: Dict[str, Any],
+    transcript: Transcript,
+    fmt: str = "compact",
+    compression: str = "none",
+) -> str:
+    """Serialize a testimony and its transcript for `Testimonies.transcription`.
+
+    Args:
+        testimony_data: Testimony fields stored alongside the sections
+        transcript: Columnar transcript of the testimony
+        fmt: One of `TRANSCRIPTION_FORMATS`
+        compression: One of `TRANSCRIPTION_COMPRESSIONS` (compact format only)
+
+    Returns:
+        The transcription string
+
+    Raises:
+        ValueError: If the format or compression is unknown
+    """
+    if fmt not in TRANSCRIPTION_FORMATS:
+        raise ValueError(f"Unknown transcription format '{fmt}'; expected one of {', '.join(TRANSCRIPTION_FORMATS)}")
+    if compression not in TRANSCRIPTION_COMPRESSIONS:
+        raise ValueError(
+            f"Unknown transcription compression '{compression}'; "
+            f"expected one of {', '.join(TRANSCRIPTION_COMPRESSIONS)}"
+        )
+
+    if fmt == "legacy":
+        return json.dumps({**testimony_data, "sections": transcript.to_sections()}, ensure_ascii=False)
+
+    encoded = json.dumps(_compact(testimony_data, transcript), ensure_ascii=False, separators=(",", ":"))
+    if compression == "none":
+        return encoded
+    # mtime=0 keeps the output identical for identical input.
+    data = base64.b64encode(gzip.compress(encoded.encode("utf-8"), mtime=0)).decode("ascii")
+    return json.dumps({"format_version": COMPACT_FORMAT_VERSION, "compression": "gzip", "data": data})
+
+
+def decode_transcription(raw: str) -> Dict[str, Any]:
+    """Decode any stored transcription into the legacy nested shape.
+
+    Raises:
+        ValueError: If the format version or compression is not supported
+    """
+    data = json.loads(raw)
+    if data.get("compression") is not None:
+        if data["compression"] != "gzip":
+            raise ValueError(f"Unsupported transcription compression: {data['compression']}")
+        data = json.loads(gzip.decompress(base64.b64decode(data["data"])).decode("utf-8"))
+
+    version = data.get("format_version", 1)
+    if version == 1:
+        return data
+    if version != COMPACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported transcription format version: {version}")
+
+    columns = data.pop("words")
+    speakers = data.pop("speakers")
+    data.pop("format_version")
+    start_ms = np.cumsum(np.asarray(columns["start"], dtype=np.int64))
+    starts = (start_ms / 1000).tolist()
+    ends = ((start_ms + np.asarray(columns["duration"], dtype=np.int64)) / 1000).tolist()
+    texts = columns["text"]
+
+    for section_idx, section in enumerate(data["sections"]):
+        section["speaker"] = speakers[section["speaker"]]
+        for para_idx, paragraph in enumerate(section["paragraphs"]):
+            paragraph["speaker"] = speakers[paragraph["speaker"]]
+            first, last = paragraph["words"]
+            paragraph["words"] = [
+                {
+                    "text": texts[position],
+                    "start": starts[position],
+                    "end": ends[position],
+                    "section_idx": section_idx,
+                    "para_idx": para_idx,
+                    "word_idx": word_idx,
+                }
+                for word_idx, position in enumerate(range(first, last))
+            ]
+    return data
@@ -2,7 +2,10 @@
 
 import re
 import uuid
-from typing import Any, Dict, List, Optional
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
 
 
 def convert_to_uuid(raw_id: str) -> str:
@@ -101,3 +104,37 @@ def to_weaviate_date(value: Any) -> Optional[str]:
         return None
     
     return None
+
+
+class OffsetIndex(Generic[T]):
+    """Character-offset spans indexed for O(log n) range lookups.
+    
+    Built once from the `(char_start, char_end, item)` tuples produced by
+    `TranscriptWords.char_spans`, whose starts and ends are both
+    non-decreasing. Spans are kept as parallel start/end lists
+    so a lookup is two bisections plus a slice.
+    """
+    
+    __slots__ = ("starts", "ends", "items")
+    
+    def __init__(self, spans: Sequence[Tuple[int, int, T]]) -> None:
+        self.starts: List[int] = [span[0] for span in spans]
+        self.ends: List[int] = [span[1] for span in spans]
+        self.items: List[T] = [span[2] for span in spans]
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def overlapping(self, start_char: int, end_char: int) -> List[T]:
+        """Return items whose span overlaps [start_char, end_char), in order.
+        
+        Args:
+            start_char: Range start (inclusive)
+            end_char: Range end (exclusive)
+            
+        Returns:
+            Items with char_end > start_char and char_start < end_char
+        """
+        lo = bisect_right(self.ends, start_char)
+        hi = bisect_left(self.starts, end_char, lo)
+        return self.items[lo:hi]
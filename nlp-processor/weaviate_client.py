@@ -1,13 +1,72 @@
 """Weaviate client operations for managing testimonies and chunks."""
 
+import asyncio
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
 from config import Config
+from metrics import track_weaviate
 
+_http_client: Optional[httpx.AsyncClient] = None
 
+
+def _timeout(seconds: float) -> httpx.Timeout:
+    """Timeout for one Weaviate operation, with the shared connect and pool limits."""
+    return httpx.Timeout(
+        seconds,
+        connect=Config.WEAVIATE_CONNECT_TIMEOUT_SECONDS,
+        pool=Config.WEAVIATE_POOL_TIMEOUT_SECONDS,
+    )
+
+
+def get_weaviate_http_client() -> httpx.AsyncClient:
+    """Return the shared Weaviate HTTP client, creating it on first use.
+    
+    One pooled client keeps connections (and TLS sessions) alive across
+    requests and stories instead of opening new ones for every call. It is
+    created at startup and closed by `close_weaviate_http_client()`.
+    
+    Raises:
+        RuntimeError: If `WEAVIATE_HTTP2` is set but HTTP/2 support is not installed
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        if Config.WEAVIATE_HTTP2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError(
+                    "WEAVIATE_HTTP2=true needs the h2 package. "
+                    "Install httpx[http2] or set WEAVIATE_HTTP2=false."
+                ) from exc
+        
+        _http_client = httpx.AsyncClient(
+            timeout=_timeout(Config.WEAVIATE_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=Config.WEAVIATE_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.WEAVIATE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.WEAVIATE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=Config.WEAVIATE_HTTP2,
+        )
+        print(
+            f"[Weaviate] 🔌 HTTP client ready ({Config.WEAVIATE_MAX_CONNECTIONS} connections, "
+            f"HTTP/2 {'on' if Config.WEAVIATE_HTTP2 else 'off'})"
+        )
+    return _http_client
+
+
+async def close_weaviate_http_client() -> None:
+    """Close the shared Weaviate HTTP client and its pooled connections."""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+@track_weaviate("batch_insert")
 async def weaviate_batch_insert(objects: List[Dict[str, Any]]) -> None:
     """Insert multiple objects into Weaviate using batch API.
     
@@ -27,58 +86,60 @@ async def weaviate_batch_insert(objects: List[Dict[str, Any]]) -> None:
     
     payload = {"objects": objects}
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.post(
-            f"{Config.WEAVIATE_URL}/v1/batch/objects",
-            json=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        data = response.json() if response.text else {}
-        
-        # Weaviate may respond with "objects" or "results" depending on version
-        items = []
-        if isinstance(data, dict):
-            if isinstance(data.get("objects"), list):
-                items = data["objects"]
-            elif isinstance(data.get("results"), list):
-                items = data["results"]
-        elif isinstance(data, list):
-            # Sometimes Weaviate returns a list directly
-            items = data
-        
-        # Check for item-level errors
-        item_errors = []
-        success_count = 0
-        for idx, item in enumerate(items):
-            result = (item or {}).get("result") or {}
-            status = (result or {}).get("status")
-            errors = (result or {}).get("errors")
-            
-            if status and str(status).upper() not in ("SUCCESS", "OK"):
-                item_errors.append({"index": idx, "status": status, "errors": errors, "item": item})
-            elif errors:
-                item_errors.append({"index": idx, "status": status, "errors": errors, "item": item})
-            else:
-                success_count += 1
-        
-        if success_count > 0:
-            print(f"[Weaviate] ✅ Successfully inserted {success_count}/{len(items)} objects")
-        
-        # Check for top-level errors
-        top_errors = data.get("errors") if isinstance(data, dict) else None
+    client = get_weaviate_http_client()
+    response = await client.post(
+        f"{Config.WEAVIATE_URL}/v1/batch/objects",
+        json=payload,
+        headers=headers,
+        timeout=_timeout(Config.WEAVIATE_BATCH_TIMEOUT_SECONDS),
+    )
+    response.raise_for_status()
+    
+    data = response.json() if response.text else {}
+    
+    # Weaviate may respond with "objects" or "results" depending on version
+    items = []
+    if isinstance(data, dict):
+        if isinstance(data.get("objects"), list):
+            items = data["objects"]
+        elif isinstance(data.get("results"), list):
+            items = data["results"]
+    elif isinstance(data, list):
+        # Sometimes Weaviate returns a list directly
+        items = data
+    
+    # Check for item-level errors
+    item_errors = []
+    success_count = 0
+    for idx, item in enumerate(items):
+        result = (item or {}).get("result") or {}
+        status = (result or {}).get("status")
+        errors = (result or {}).get("errors")
         
-        if top_errors or item_errors:
-            raise RuntimeError(
-                "Weaviate batch insert had errors:\n"
-                + json.dumps(
-                    {"top_errors": top_errors, "item_errors": item_errors[:5]},
-                    indent=2
-                )
+        if status and str(status).upper() not in ("SUCCESS", "OK"):
+            item_errors.append({"index": idx, "status": status, "errors": errors, "item": item})
+        elif errors:
+            item_errors.append({"index": idx, "status": status, "errors": errors, "item": item})
+        else:
+            success_count += 1
+    
+    if success_count > 0:
+        print(f"[Weaviate] ✅ Successfully inserted {success_count}/{len(items)} objects")
+    
+    # Check for top-level errors
+    top_errors = data.get("errors") if isinstance(data, dict) else None
+    
+    if top_errors or item_errors:
+        raise RuntimeError(
+            "Weaviate batch insert had errors:\n"
+            + json.dumps(
+                {"top_errors": top_errors, "item_errors": item_errors[:5]},
+                indent=2
             )
+        )
 
 
+@track_weaviate("upsert")
 async def weaviate_upsert_object(
     class_name: str,
     object_id: str,
@@ -103,68 +164,229 @@ async def weaviate_upsert_object(
         "properties": properties
     }
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        # Try CREATE first
-        response = await client.post(
-            f"{Config.WEAVIATE_URL}/v1/objects",
+    client = get_weaviate_http_client()
+    # Try CREATE first
+    response = await client.post(
+        f"{Config.WEAVIATE_URL}/v1/objects",
+        json=payload,
+        headers=headers,
+    )
+    
+    if response.status_code in (200, 201):
+        return
+    
+    # If object exists (409), UPDATE instead
+    if response.status_code in (409, 422): # 422 for some Weaviate versions
+        update_response = await client.put(
+            f"{Config.WEAVIATE_URL}/v1/objects/{class_name}/{object_id}",
             json=payload,
             headers=headers,
         )
+        if update_response.status_code >= 300:
+            raise RuntimeError(
+                f"Weaviate UPDATE failed ({class_name}/{object_id}): "
+                f"HTTP {update_response.status_code} {update_response.text}"
+            )
+        return
+    
+    # Any other status is a failure
+    raise RuntimeError(
+        f"Weaviate CREATE failed ({class_name}/{object_id}): "
+        f"HTTP {response.status_code} {response.text}"
+    )
+
+
+@track_weaviate("get")
+async def weaviate_get_object(class_name: str, object_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a single object by class and UUID.
+    
+    Args:
+        class_name: Weaviate class name
+        object_id: UUID for the object
         
-        if response.status_code in (200, 201):
-            return
+    Returns:
+        The object (with `properties`), or None if it does not exist
         
-        # If object exists (409), UPDATE instead
-        if response.status_code in (409, 422): # 422 for some Weaviate versions
-            update_response = await client.put(
-                f"{Config.WEAVIATE_URL}/v1/objects/{class_name}/{object_id}",
-                json=payload,
-                headers=headers,
-            )
-            if update_response.status_code >= 300:
-                raise RuntimeError(
-                    f"Weaviate UPDATE failed ({class_name}/{object_id}): "
-                    f"HTTP {update_response.status_code} {update_response.text}"
-                )
-            return
+    Raises:
+        httpx.HTTPStatusError: If the lookup fails for another reason
+    """
+    client = get_weaviate_http_client()
+    response = await client.get(f"{Config.WEAVIATE_URL}/v1/objects/{class_name}/{object_id}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+@track_weaviate("patch")
+async def weaviate_patch_object(
+    class_name: str,
+    object_id: str,
+    properties: Dict[str, Any]
+) -> None:
+    """Merge properties into an existing object, leaving other fields and vectors intact.
+    
+    Args:
+        class_name: Weaviate class name
+        object_id: UUID for the object
+        properties: Properties to merge
         
-        # Any other status is a failure
+    Raises:
+        RuntimeError: If the update fails
+    """
+    client = get_weaviate_http_client()
+    response = await client.patch(
+        f"{Config.WEAVIATE_URL}/v1/objects/{class_name}/{object_id}",
+        json={"class": class_name, "id": object_id, "properties": properties},
+        headers={"Content-Type": "application/json"},
+    )
+    if response.status_code >= 300:
+        raise RuntimeError(
+            f"Weaviate PATCH failed ({class_name}/{object_id}): "
+            f"HTTP {response.status_code} {response.text}"
+        )
+
+
+@track_weaviate("patch_many")
+async def weaviate_patch_objects(
+    class_name: str,
+    updates: List[Tuple[str, Dict[str, Any]]],
+    concurrency: int = 8,
+) -> None:
+    """Merge properties into several existing objects with bounded concurrency.
+    
+    Args:
+        class_name: Weaviate class name
+        updates: (object UUID, properties) pairs
+        concurrency: Maximum PATCH requests in flight
+        
+    Raises:
+        RuntimeError: If any update fails
+    """
+    if not updates:
+        return
+    
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    
+    async def patch(object_id: str, properties: Dict[str, Any]) -> None:
+        async with semaphore:
+            await weaviate_patch_object(class_name, object_id, properties)
+    
+    await asyncio.gather(*(patch(object_id, properties) for object_id, properties in updates))
+
+
+async def _chunk_graphql(client: httpx.AsyncClient, query: str, testimony_uuid: str) -> Dict[str, Any]:
+    """Run a GraphQL query about a testimony's chunks and return its `data`."""
+    response = await client.post(
+        f"{Config.WEAVIATE_URL}/v1/graphql",
+        json={"query": query},
+        headers={"Content-Type": "application/json"},
+    )
+    if response.status_code >= 300:
         raise RuntimeError(
-            f"Weaviate CREATE failed ({class_name}/{object_id}): "
+            f"Weaviate chunk listing failed ({testimony_uuid}): "
             f"HTTP {response.status_code} {response.text}"
         )
+    
+    data = response.json() if response.text else {}
+    if data.get("errors"):
+        raise RuntimeError(
+            f"Weaviate chunk listing failed ({testimony_uuid}): {json.dumps(data['errors'])}"
+        )
+    return data.get("data") or {}
 
 
-async def weaviate_delete_chunks_by_story(testimony_uuid: str) -> Dict[str, Any]:
-    """Delete all chunks associated with a specific testimony.
+@track_weaviate("list_chunks")
+async def weaviate_list_chunk_hashes(testimony_uuid: str, page_size: int = 1000) -> Dict[str, str]:
+    """Return `{chunk uuid: content_hash}` for every chunk stored for a testimony.
+    
+    Filters on `theirstory_id` in Weaviate and pages with `limit`/`offset`.
+    Offset paging stops at Weaviate's `QUERY_MAXIMUM_RESULTS`, so the chunks
+    are counted with an `Aggregate` query first and the listing fails rather
+    than returning a truncated result. Chunks written before content hashes
+    existed map to an empty string.
     
     Args:
         testimony_uuid: UUID of the testimony
+        page_size: Objects fetched per GraphQL page
         
     Returns:
-        Response data from Weaviate
+        Mapping of chunk UUID to its stored content hash
         
     Raises:
-        httpx.HTTPStatusError: If delete operation fails
+        RuntimeError: If a query fails or the testimony has more chunks than
+            `WEAVIATE_QUERY_MAXIMUM_RESULTS`
     """
-    body = {
-        "match": {
-            "class": "Chunks",
-            "where": {
-                "path": ["theirstory_id"],
-                "operator": "Equal",
-                "valueString": testimony_uuid,
-            },
-        }
-    }
+    where = f'where: {{path: ["theirstory_id"], operator: Equal, valueText: {json.dumps(testimony_uuid)}}}'
+    client = get_weaviate_http_client()
     
-    async with httpx.AsyncClient(timeout=60) as client:
+    data = await _chunk_graphql(client, f"{{ Aggregate {{ Chunks({where}) {{ meta {{ count }} }} }} }}", testimony_uuid)
+    groups = (data.get("Aggregate") or {}).get("Chunks") or []
+    total = int((((groups[0] if groups else {}) or {}).get("meta") or {}).get("count") or 0)
+    if total > Config.WEAVIATE_QUERY_MAXIMUM_RESULTS:
+        raise RuntimeError(
+            f"Testimony {testimony_uuid} has {total} stored chunks, more than "
+            f"WEAVIATE_QUERY_MAXIMUM_RESULTS ({Config.WEAVIATE_QUERY_MAXIMUM_RESULTS}) can list"
+        )
+    
+    hashes: Dict[str, str] = {}
+    offset = 0
+    while offset < total:
+        query = (
+            f"{{ Get {{ Chunks({where}, limit: {int(page_size)}, offset: {offset}) "
+            "{ content_hash _additional { id } } } }"
+        )
+        data = await _chunk_graphql(client, query, testimony_uuid)
+        page = (data.get("Get") or {}).get("Chunks") or []
+        for item in page:
+            object_id = ((item or {}).get("_additional") or {}).get("id")
+            if object_id:
+                hashes[object_id] = item.get("content_hash") or ""
+        
+        if len(page) < page_size:
+            break
+        offset += len(page)
+    return hashes
+
+
+@track_weaviate("delete_objects")
+async def weaviate_delete_objects(class_name: str, object_ids: List[str], batch_size: int = 500) -> int:
+    """Delete objects by UUID using the batch delete API.
+    
+    Args:
+        class_name: Weaviate class name
+        object_ids: UUIDs to delete
+        batch_size: UUIDs per delete request
+        
+    Returns:
+        Number of objects Weaviate reported as deleted
+        
+    Raises:
+        httpx.HTTPStatusError: If a delete request fails
+    """
+    deleted = 0
+    
+    client = get_weaviate_http_client()
+    for start in range(0, len(object_ids), batch_size):
+        body = {
+            "match": {
+                "class": class_name,
+                "where": {
+                    "path": ["id"],
+                    "operator": "ContainsAny",
+                    "valueTextArray": object_ids[start:start + batch_size],
+                },
+            }
+        }
         response = await client.request(
             method="DELETE",
             url=f"{Config.WEAVIATE_URL}/v1/batch/objects",
             json=body,
             headers={"Content-Type": "application/json"},
+            timeout=_timeout(Config.WEAVIATE_BATCH_TIMEOUT_SECONDS),
         )
-        
         response.raise_for_status()
-        return response.json() if response.text else {"ok": True}
+        data = response.json() if response.text else {}
+        deleted += int(((data.get("results") or {}).get("successful")) or 0)
+    
+    return deleted
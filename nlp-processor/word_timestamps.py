@@ -0,0 +1,104 @@
+"""Encodings for the word timings stored on Chunks objects.
+
+Overlapping chunks repeat most of their words, so `CHUNK_WORD_TIMESTAMPS`
+selects how each chunk stores them:
+
+- `full`: `word_timestamps` as a list of `{text, start, end}` objects
+- `range`: `word_index_start`/`word_index_end`, a half-open range into the
+  testimony's words (sections -> paragraphs -> words, flattened in order)
+- `packed`: `word_timestamps_packed`, a JSON string with the word texts,
+  delta-coded start times and durations in milliseconds
+
+Compact modes store an empty `word_timestamps` so patched chunks drop the
+old list. The frontend decodes all three with `decodeChunkWordTimestamps`
+(`app/utils/chunkWordTimestamps.ts`).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+WORD_TIMESTAMP_MODES: Tuple[str, ...] = ("full", "range", "packed")
+PACKED_VERSION = 1
+
+
+def pack_word_timestamps(texts: Sequence[str], starts: Sequence[float], ends: Sequence[float]) -> str:
+    """Pack word timings into a compact JSON string.
+
+    Times are rounded to milliseconds. `s` holds the first start and then
+    the difference to the previous start; `d` holds each word's duration.
+
+    Args:
+        texts: Word texts
+        starts: Word start times in seconds
+        ends: Word end times in seconds
+
+    Returns:
+        JSON string `{"v": 1, "w": [...], "s": [...], "d": [...]}`
+    """
+    start_ms = [round(start * 1000) for start in starts]
+    deltas = [b - a for a, b in zip([0] + start_ms, start_ms)]
+    durations = [round(end * 1000) - start for start, end in zip(start_ms, ends)]
+    return json.dumps(
+        {"v": PACKED_VERSION, "w": list(texts), "s": deltas, "d": durations},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def unpack_word_timestamps(packed: str) -> List[Dict[str, Any]]:
+    """Decode `pack_word_timestamps` output into `{text, start, end}` dicts.
+
+    Raises:
+        ValueError: If the packed version is not supported
+    """
+    data = json.loads(packed)
+    if data.get("v") != PACKED_VERSION:
+        raise ValueError(f"Unsupported packed word timestamps version: {data.get('v')}")
+    words: List[Dict[str, Any]] = []
+    start_ms = 0
+    for text, delta, duration in zip(data["w"], data["s"], data["d"]):
+        start_ms += delta
+        words.append({"text": text, "start": start_ms / 1000, "end": (start_ms + duration) / 1000})
+    return words
+
+
+def encode_word_timing(
+    mode: str,
+    texts: Sequence[str],
+    starts: Sequence[float],
+    ends: Sequence[float],
+    word_index_start: int,
+) -> Dict[str, Any]:
+    """Return the Chunks properties that store a chunk's word timings in `mode`.
+
+    Args:
+        mode: One of `WORD_TIMESTAMP_MODES`
+        texts: Chunk word texts
+        starts: Chunk word start times in seconds
+        ends: Chunk word end times in seconds
+        word_index_start: Position of the chunk's first word in the testimony
+
+    Returns:
+        Property name to value mapping for the chunk object
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode == "full":
+        return {
+            "word_timestamps": [
+                {"text": text, "start": start, "end": end}
+                for text, start, end in zip(texts, starts, ends)
+            ]
+        }
+    if mode == "range":
+        return {
+            "word_timestamps": [],
+            "word_index_start": int(word_index_start),
+            "word_index_end": int(word_index_start) + len(texts),
+        }
+    if mode == "packed":
+        return {"word_timestamps": [], "word_timestamps_packed": pack_word_timestamps(texts, starts, ends)}
+    raise ValueError(f"Unknown word timestamp mode '{mode}'; expected one of {', '.join(WORD_TIMESTAMP_MODES)}")
@@ -22,6 +22,7 @@ const NLP_URL = buildNlpUrl();
 const INTERVIEWS_DIR = process.env.INTERVIEWS_DIR ?? './json/interviews';
 const RESET_WEAVIATE_DATA = process.env.RESET_WEAVIATE_DATA === 'true';
 const SKIP_IMPORTED_INTERVIEWS = process.env.SKIP_IMPORTED_INTERVIEWS !== 'false';
+const FORCE_REPROCESS = process.env.FORCE_REPROCESS === 'true';
 const IGNORED_INTERVIEW_FILENAME = 'example-minimum-interview.json';
 const IGNORED_COLLECTION_FOLDERS = new Set(['example-collection']);
 const COLLECTION_META_JSON_FILES = new Set(['collection.json', 'collection.config.json']);
@@ -520,7 +521,7 @@ async function processInterviewFileThroughNlp(job: InterviewImportJob): Promise<
   const raw = await loadJson<any>(job.filePath);
   const body = wrapAsProcessRequest(raw, job);
 
-  const url = `${NLP_URL}/process-story?write_to_weaviate=true&run_ner=true`;
+  const url = `${NLP_URL}/process-story?write_to_weaviate=true&run_ner=true&force=${FORCE_REPROCESS}`;
 
   const res = await fetch(url, {
     method: 'POST',
@@ -539,6 +540,10 @@ async function processInterviewFileThroughNlp(job: InterviewImportJob): Promise<
 
   try {
     const parsed = JSON.parse(text);
+    if (parsed?.skipped) {
+      console.log(`[weaviate-import] NLP unchanged, skipped: ${job.filePath} collection=${job.collection.id}`);
+      return;
+    }
     const chunks = parsed?.counts?.chunks;
     console.log(`[weaviate-import] NLP OK: ${job.filePath} collection=${job.collection.id} chunks=${chunks ?? 'unknown'}`);
   } catch {
@@ -572,6 +577,7 @@ async function main(): Promise<void> {
   console.log(`[weaviate-import] INTERVIEWS_DIR=${INTERVIEWS_DIR}`);
   console.log(`[weaviate-import] RESET_WEAVIATE_DATA=${RESET_WEAVIATE_DATA}`);
   console.log(`[weaviate-import] SKIP_IMPORTED_INTERVIEWS=${SKIP_IMPORTED_INTERVIEWS}`);
+  console.log(`[weaviate-import] FORCE_REPROCESS=${FORCE_REPROCESS}`);
 
   await waitForReady();
   if (RESET_WEAVIATE_DATA) {
@@ -23,6 +23,7 @@ export type Testimonies = {
   video_url: string;
   isAudioFile: boolean;
   hasChunks: any;
+  content_fingerprint: string;
 }
 
 export type Chunks = {
@@ -43,12 +44,16 @@ export type Chunks = {
   section_id: number;
   para_id: number;
   chunk_id: number;
+  content_hash: string;
   recording_date: string;
   transcription: string;
   speaker: string;
   interviewers: any;
   is_interviewer: boolean;
   word_timestamps: any;
+  word_index_start?: number;
+  word_index_end?: number;
+  word_timestamps_packed?: string;
   ner_data: any;
   ner_labels: any;
   ner_text: any;